@@ -1,7 +1,9 @@
 # backend/app/api/candidates.py
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, UploadFile, File, Query, status
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 
 # Import models, schemas, and dependencies
@@ -13,20 +15,120 @@ from app.database.models import (
 )
 from app.database.models.workflow_feedback import ApplicationStageLog
 from app.schemas import candidate_schema
-from app.api.dependencies import get_db, get_current_active_user
-from app.services import gemini_service, resume_parser_service
+from app.core import config
+from app.api.dependencies import get_db, get_read_db, get_current_active_user, ai_quota, ai_call_slot, idempotent, IdempotencyHandle
+from app.services import gemini_service, resume_parser_service, candidate_search_service, match_matrix_service, skill_service
+from app.services import candidate_dedup_service, insights_service
+from app.services.skill_index_service import skill_index
+from app.services import digest_service
 
 router = APIRouter(
     prefix="/candidates",
     tags=["Candidates & Applications"],
 )
 
+@router.get("/search", response_model=List[candidate_schema.CandidateSearchResult])
+def search_candidates(
+    q: str = Query(..., min_length=1, max_length=200),
+    min_experience: Optional[float] = None,
+    max_experience: Optional[float] = None,
+    max_notice_period: Optional[int] = None,
+    skip: int = 0,
+    limit: int = Query(20, le=100),
+    db: Session = Depends(get_read_db),
+    current_user: user_model.User = Depends(get_current_active_user)
+):
+    """
+    Searches the talent pool by name, skills and resume summary, best matches first.
+    Supports "quoted phrases" and filters on experience (years) and notice period (days).
+    """
+    return candidate_search_service.search_candidates(
+        db,
+        q=q,
+        min_experience=min_experience,
+        max_experience=max_experience,
+        max_notice_period=max_notice_period,
+        skip=skip,
+        limit=limit
+    )
+
+
+@router.get("/{candidate_id}/matches", response_model=List[candidate_schema.JobMatch])
+def read_best_jobs_for_candidate(
+    candidate_id: int,
+    limit: int = 20,
+    db: Session = Depends(get_read_db),
+    current_user: user_model.User = Depends(get_current_active_user)
+):
+    """
+    Jobs whose required skills this candidate covers best, read from the precomputed match matrix.
+    """
+    return match_matrix_service.best_jobs_for_candidate(candidate_id, db, limit=limit)
+
+
+@router.get("/{candidate_id}/duplicates", response_model=List[candidate_schema.DuplicateCandidate])
+def read_candidate_duplicates(
+    candidate_id: int,
+    db: Session = Depends(get_read_db),
+    current_user: user_model.User = Depends(get_current_active_user)
+):
+    """
+    Other candidates that look like the same person, most certain first.
+    """
+    candidate = db.query(
+        candidate_model.Candidate.FullName, candidate_model.Candidate.Email, candidate_model.Candidate.Phone
+    ).filter(candidate_model.Candidate.CandidateID == candidate_id).first()
+    if not candidate:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Candidate not found")
+    return candidate_dedup_service.find_duplicates(
+        db, candidate.FullName, candidate.Email, candidate.Phone, exclude_candidate_id=candidate_id
+    )
+
+
+@router.post("/{candidate_id}/merge/{duplicate_id}", response_model=candidate_schema.Candidate)
+def merge_duplicate_candidate(
+    candidate_id: int,
+    duplicate_id: int,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: user_model.User = Depends(get_current_active_user)
+):
+    """
+    Merges candidate `duplicate_id` into `candidate_id`: skills, applications and
+    their history move over, and the duplicate is deleted.
+    """
+    if current_user.Role not in ["Admin", "HR"]:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Permission denied.")
+    if candidate_id == duplicate_id:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="A candidate cannot be merged into itself.")
+    duplicate = db.query(candidate_model.Candidate).filter(candidate_model.Candidate.CandidateID == duplicate_id).first()
+    if not duplicate or not db.query(candidate_model.Candidate.CandidateID).filter(candidate_model.Candidate.CandidateID == candidate_id).first():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Candidate not found")
+
+    # Kept with the merge record, when the pair also passes the automatic rules.
+    match = next((
+        match for match in candidate_dedup_service.find_duplicates(db, duplicate.FullName, duplicate.Email, duplicate.Phone)
+        if match.CandidateID == candidate_id
+    ), None)
+    survivor = candidate_dedup_service.merge_candidates(
+        db, candidate_id, duplicate_id, current_user.UserID, candidate_dedup_service.SOURCE_MANUAL, match
+    )
+    db.commit()
+    db.refresh(survivor)
+    background_tasks.add_task(candidate_dedup_service.refresh_after_merge_in_background, candidate_id, [duplicate_id])
+    return survivor
+
+
 @router.post("/apply/{job_id}", response_model=candidate_schema.JobApplication, status_code=status.HTTP_201_CREATED)
-async def upload_resume_and_create_application(
+def upload_resume_and_create_application(
     job_id: int,
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
-    current_user: user_model.User = Depends(get_current_active_user)
+    current_user: user_model.User = Depends(get_current_active_user),
+    # Order matters: a replayed or waiting retry must be settled before any AI quota is spent.
+    idempotency: Optional[IdempotencyHandle] = Depends(idempotent("apply")),
+    ai_slot: None = Depends(ai_quota("analyze_resume"))
 ):
     """
     Handles the entire candidate application workflow for a single resume:
@@ -35,7 +137,13 @@ async def upload_resume_and_create_application(
     3. Creates or updates the candidate profile.
     4. Creates or updates skills in the main skills table.
     5. Links extracted skills to the candidate.
-    6. Creates a job application record.
+    6. Creates a job application record, or updates the candidate's existing one for this job.
+
+    Clients may send an Idempotency-Key header; a retry with the same key gets
+    the stored result instead of a second parse, AI call and application.
+
+    Sync on purpose: parsing, the AI call and the queries block, so they run in
+    the threadpool instead of on the event loop.
     """
     if current_user.Role not in ["Admin", "HR"]:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Permission denied.")
@@ -45,7 +153,7 @@ async def upload_resume_and_create_application(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
 
     try:
-        resume_content = await file.read()
+        resume_content = file.file.read()
         resume_text = resume_parser_service.extract_text(resume_content, file.filename)
         ai_analysis = gemini_service.analyze_resume_with_job_desc(resume_text=resume_text, job_description=db_job.Description)
     except Exception as e:
@@ -54,15 +162,24 @@ async def upload_resume_and_create_application(
     candidate_email = ai_analysis.get("extracted_email")
     if not candidate_email:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Could not extract email from resume.")
+    candidate_name = ai_analysis.get("extracted_name", "N/A")
+    candidate_phone = ai_analysis.get("extracted_phone") or None
 
     db_candidate = db.query(candidate_model.Candidate).filter(candidate_model.Candidate.Email == candidate_email).first()
+    duplicate_of = None
+    if not db_candidate and config.DEDUP_ON_INGEST:
+        # The same person under another email: the resume goes to the candidate on file.
+        existing = candidate_dedup_service.resolve_existing(db, candidate_name, candidate_email, candidate_phone)
+        if existing:
+            db_candidate, duplicate_of = existing
 
     try:
         # Step 1: Create or update candidate profile
         if not db_candidate:
             db_candidate = candidate_model.Candidate(
-                FullName=ai_analysis.get("extracted_name", "N/A"),
+                FullName=candidate_name,
                 Email=candidate_email,
+                Phone=candidate_phone,
                 ResumeSummary=ai_analysis.get("resume_summary"),
                 TechnicalSkillsSummary=ai_analysis.get("technical_skills_summary"),
                 CreatedBy=current_user.UserID
@@ -72,53 +189,73 @@ async def upload_resume_and_create_application(
         else:
             db_candidate.ResumeSummary = ai_analysis.get("resume_summary")
             db_candidate.TechnicalSkillsSummary = ai_analysis.get("technical_skills_summary")
+            db_candidate.Phone = db_candidate.Phone or candidate_phone
             db_candidate.UpdatedAt = datetime.utcnow()
             db_candidate.UpdatedBy = current_user.UserID
+            if duplicate_of is not None and duplicate_of.Reason != candidate_dedup_service.REASON_KNOWN_EMAIL:
+                candidate_dedup_service.record_alias(
+                    db, db_candidate.CandidateID, candidate_name, candidate_email, candidate_phone,
+                    duplicate_of, current_user.UserID
+                )
 
         # Step 2: Process and link extracted skills
         extracted_skills = ai_analysis.get("extracted_skills", [])
+        linked_skill_ids = None
         if extracted_skills:
+            linked_skill_ids = set()
             # Clear existing skills for this candidate before adding new ones
             db.query(skill_model.CandidateSkill).filter(
                 skill_model.CandidateSkill.CandidateID == db_candidate.CandidateID
             ).delete(synchronize_session=False)
             
-            # Use a set to handle duplicate skills from the resume
-            for skill_name in set(skill.strip().title() for skill in extracted_skills if skill.strip()):
-                # Find skill in DB (case-insensitive)
-                db_skill = db.query(skill_model.Skill).filter(skill_model.Skill.SkillName.ilike(skill_name)).first()
-                
-                # If skill doesn't exist in our main skill table, create it
-                if not db_skill:
-                    db_skill = skill_model.Skill(SkillName=skill_name, CreatedBy=current_user.UserID)
-                    db.add(db_skill)
-                    db.flush() # Flush to get the new SkillID
-                
+            # Find or create all extracted skills in one go (duplicates and case are handled there)
+            for db_skill in skill_service.get_or_create_skills(db, extracted_skills, current_user.UserID):
                 # Link the candidate to the skill
                 candidate_skill_link = skill_model.CandidateSkill(
                     CandidateID=db_candidate.CandidateID,
                     SkillID=db_skill.SkillID
                 )
                 db.add(candidate_skill_link)
+                linked_skill_ids.add(db_skill.SkillID)
 
-        # Step 3: Create Job Application
+        # Step 3: Create Job Application (or refresh the scores of an existing one; its stage is kept)
         match_score = ai_analysis.get("match_score", 0.0)
         initial_stage = "Applied" if float(match_score) >= 50.0 else "Not a Fit"
-        
-        new_application = candidate_model.JobApplication(
-            CandidateID=db_candidate.CandidateID,
-            JobID=job_id,
-            MatchScore=match_score,
-            ScoreDetails=ai_analysis.get("score_details", {}),
-            Stage=initial_stage,
-            CreatedBy=current_user.UserID
-        )
-        db.add(new_application)
-        
+
+        new_application = db.query(candidate_model.JobApplication).filter(
+            candidate_model.JobApplication.CandidateID == db_candidate.CandidateID,
+            candidate_model.JobApplication.JobID == job_id
+        ).first()
+        if new_application:
+            new_application.MatchScore = match_score
+            new_application.ScoreDetails = ai_analysis.get("score_details", {})
+            new_application.UpdatedAt = datetime.utcnow()
+            new_application.UpdatedBy = current_user.UserID
+        else:
+            new_application = candidate_model.JobApplication(
+                CandidateID=db_candidate.CandidateID,
+                JobID=job_id,
+                MatchScore=match_score,
+                ScoreDetails=ai_analysis.get("score_details", {}),
+                Stage=initial_stage,
+                CreatedBy=current_user.UserID
+            )
+            db.add(new_application)
+
         db.commit()
         db.refresh(db_candidate)
         db.refresh(new_application)
+        if linked_skill_ids is not None:
+            # The match matrix is skill-only, so a resume without new skills leaves it as is.
+            skill_index.set_candidate_skills(db_candidate.CandidateID, linked_skill_ids)
+            background_tasks.add_task(match_matrix_service.rescore_candidate_in_background, db_candidate.CandidateID)
+        if idempotency:
+            idempotency.save(status.HTTP_201_CREATED, jsonable_encoder(candidate_schema.JobApplication.model_validate(new_application)))
         return new_application
+    except IntegrityError:
+        # A concurrent upload for the same candidate or job application committed first.
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="A concurrent upload created this candidate or application first. Please retry.")
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Database transaction failed: {e}")
@@ -130,25 +267,33 @@ def get_candidate_insights(
     db: Session = Depends(get_db),
     current_user: user_model.User = Depends(get_current_active_user)
 ):
-    application = db.query(candidate_model.JobApplication).filter(candidate_model.JobApplication.ApplicationID == application_id).first()
-    if not application:
+    row = insights_service.load_application(db, application_id)
+    if not row:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Application not found")
-
-    candidate = db.query(candidate_model.Candidate).filter(candidate_model.Candidate.CandidateID == application.CandidateID).first()
-    job = db.query(job_model.JobPosting).filter(job_model.JobPosting.JobID == application.JobID).first()
-
-    if not candidate or not job:
+    if row.CandidateID is None or row.JobID is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Associated candidate or job not found")
 
-    if not candidate.ResumeSummary or not job.Description:
+    if not row.ResumeSummary or not row.Description:
         raise HTTPException(status_code=400, detail="Resume summary or job description is missing for analysis.")
 
+    # Stored insights are served as they are, without touching the AI quota.
+    inputs = insights_service.insight_inputs(row.ResumeSummary, row.Description)
+    insights = insights_service.current_insights(row.ApplicationInsight, inputs)
+    if insights is not None:
+        return insights
+
+    # Nothing more to read here: give the connection back to the pool for the AI call.
+    db.close()
     try:
-        insights = gemini_service.get_ai_insights(
-            resume_text=candidate.ResumeSummary,
-            job_description=job.Description
+        return insights_service.generate_insights(
+            application_id,
+            row.ResumeSummary,
+            row.Description,
+            inputs,
+            ai_slot=lambda: ai_call_slot("insights", current_user.UserID),
         )
-        return insights
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to get AI insights: {e}")
 
@@ -167,6 +312,17 @@ def update_application_stage(
     if not application:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Application not found")
 
+    if application.Stage != stage_update.stage:
+        stage_log = ApplicationStageLog(
+            ApplicationID=application.ApplicationID,
+            Status=stage_update.stage,
+            AssignorUserID=current_user.UserID
+        )
+        db.add(stage_log)
+        db.flush()
+        # Interested users hear about it in their next digest email, not one email per change.
+        digest_service.record_stage_log(db, stage_log)
+
     application.Stage = stage_update.stage
     application.UpdatedAt = datetime.utcnow()
     application.UpdatedBy = current_user.UserID
@@ -176,6 +332,45 @@ def update_application_stage(
     return application
 
 
+@router.post("/application/{application_id}/assign", response_model=candidate_schema.ApplicationStageLog, status_code=status.HTTP_201_CREATED)
+def assign_application_stage(
+    application_id: int,
+    assignment: candidate_schema.AssignStage,
+    db: Session = Depends(get_db),
+    current_user: user_model.User = Depends(get_current_active_user)
+):
+    """
+    Assigns a user (e.g. an interviewer) to the application's current stage.
+    """
+    if current_user.Role not in ["Admin", "HR"]:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="You do not have permission.")
+
+    application = db.query(candidate_model.JobApplication).filter(candidate_model.JobApplication.ApplicationID == application_id).first()
+    if not application:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Application not found")
+    assignee = db.query(user_model.User).filter(user_model.User.UserID == assignment.AssigneeUserID).first()
+    if not assignee or not assignee.IsActive:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Assignee not found or inactive")
+
+    stage_log = ApplicationStageLog(
+        ApplicationID=application.ApplicationID,
+        WorkflowID=assignment.WorkflowID,
+        Status=application.Stage,
+        AssigneeUserID=assignee.UserID,
+        AssignorUserID=current_user.UserID,
+        ScheduledAt=assignment.ScheduledAt,
+        Notes=assignment.Notes
+    )
+    db.add(stage_log)
+    db.flush()
+    # The assignee hears about it in their next digest email.
+    digest_service.record_stage_log(db, stage_log, stage_changed=False)
+
+    db.commit()
+    db.refresh(stage_log)
+    return stage_log
+
+
 @router.get("/application/{application_id}/history", response_model=List[candidate_schema.ApplicationStageLog])
 def read_candidate_application_history(
     application_id: int, 
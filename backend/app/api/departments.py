@@ -7,7 +7,7 @@ from typing import List
 from app.database.models import portfolio_department as models
 from app.database.models import user as user_model
 from app.schemas import department_schema
-from app.api.dependencies import get_db, get_current_active_user
+from app.api.dependencies import get_db, get_read_db, get_current_active_user, conditional_get
 
 router = APIRouter(
     prefix="/departments",
@@ -35,7 +35,7 @@ def create_department(
     db.refresh(db_dept)
     return db_dept
 
-@router.get("/", response_model=List[department_schema.Department])
-def read_departments(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+@router.get("/", response_model=List[department_schema.Department], dependencies=[Depends(conditional_get("Departments"))])
+def read_departments(skip: int = 0, limit: int = 100, db: Session = Depends(get_read_db)):
     departments = db.query(models.Department).offset(skip).limit(limit).all()
     return departments
\ No newline at end of file
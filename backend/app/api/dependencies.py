@@ -1,20 +1,35 @@
 # backend/app/api/dependencies.py
-from fastapi import Depends, HTTPException, status
+import asyncio
+import time
+from contextlib import contextmanager
+from typing import Any
+
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError
+from starlette.datastructures import UploadFile
 from sqlalchemy.orm import Session
 
 # Direct, safe imports
-from app.database.session import SessionLocal
-from app.core import security
+from app.database.session import SessionLocal, ReadSessionLocal
+from app.core import config, security
+from app.core.ai_quota import ai_quotas, QuotaExceeded, QueueFull, QueueTimeout
 from app.database.models.user import User
 from app.schemas.user_schema import TokenData
+from app.services import idempotency_service, table_version_service
 
 # This tells FastAPI that the URL to get a token is '/users/login/token'.
 # NOTE: Our actual token URL is `/users/login/verify-otp`, but this `tokenUrl`
 # is mainly for documentation purposes in OpenAPI/Swagger UI.
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/users/login/verify-otp")
 
+# Read-your-writes: a client that just wrote something carries this cookie
+# (set by the middleware in main.py) or sends this header, and its reads are
+# served by the primary instead of a possibly lagging replica.
+PIN_PRIMARY_COOKIE = "pin_primary"
+PIN_PRIMARY_HEADER = "X-Read-Primary"
+
 
 def get_db():
     """
@@ -27,6 +42,30 @@ def get_db():
         db.close()
 
 
+def should_read_from_primary(request: Request) -> bool:
+    """
+    True when this request has to see the primary's latest state.
+    """
+    if request.cookies.get(PIN_PRIMARY_COOKIE):
+        return True
+    return request.headers.get(PIN_PRIMARY_HEADER, "").lower() in ("1", "true", "yes")
+
+
+def get_read_db(request: Request):
+    """
+    A dependency that provides a read-only database session for GET endpoints.
+    It is served by the read replica, unless the request is pinned to the primary.
+    """
+    if should_read_from_primary(request):
+        db = SessionLocal()
+    else:
+        db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
 def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
     """
     The core security dependency. It decodes the JWT and returns the user from the DB.
@@ -57,6 +96,40 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     return user
 
 
+def get_streaming_user(token: str = Depends(oauth2_scheme)) -> User:
+    """
+    get_current_active_user for long-lived streaming responses. get_db would keep
+    its session, and a pooled connection, open until the stream ends; this one
+    authenticates with a short session of its own and releases it at once.
+    """
+    db = SessionLocal()
+    try:
+        user = get_current_user(token, db)
+        db.expunge(user)
+    finally:
+        db.close()
+    return get_current_active_user(user)
+
+
+def is_admin_request(request: Request) -> bool:
+    """
+    True when the request's bearer token belongs to an active admin. For
+    middleware, where the dependencies above are not available.
+    """
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    payload = security.decode_access_token(token)
+    if not payload or not payload.get("sub"):
+        return False
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.Email == payload["sub"]).first()
+        return user is not None and user.IsActive and user.Role == "Admin"
+    finally:
+        db.close()
+
+
 def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
     """
     A dependency that builds upon get_current_user to ensure the user is active.
@@ -64,4 +137,166 @@ def get_current_active_user(current_user: User = Depends(get_current_user)) -> U
     """
     if not current_user.IsActive:
         raise HTTPException(status_code=400, detail="Inactive user")
-    return current_user
\ No newline at end of file
+    return current_user
+
+
+def reference_data_cache_control() -> str:
+    if config.REFERENCE_DATA_MAX_AGE_SECONDS > 0:
+        return f"private, max-age={config.REFERENCE_DATA_MAX_AGE_SECONDS}"
+    return "private, no-cache"
+
+
+def conditional_get(*tables: str):
+    """
+    Route dependency for slowly changing reference data built from `tables`.
+
+    Computes the ETag from the tables' version counters and answers a matching
+    If-None-Match with 304 before the endpoint runs its query. Otherwise the ETag
+    is left on request.state for the middleware in main.py to put on the response.
+    The user is authenticated first, so a 304 is never served to an anonymous client.
+    """
+    def check_etag(
+        request: Request,
+        db: Session = Depends(get_read_db),
+        current_user: User = Depends(get_current_active_user)
+    ) -> None:
+        etag = table_version_service.etag_for(db, tables)
+        if_none_match = request.headers.get("if-none-match", "")
+        if if_none_match.strip() == "*" or etag in (value.strip() for value in if_none_match.split(",")):
+            raise HTTPException(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers={"ETag": etag, "Cache-Control": reference_data_cache_control()}
+            )
+        request.state.etag = etag
+
+    return check_etag
+
+
+@contextmanager
+def ai_call_slot(route: str, user_id: int):
+    """
+    Enforces the user's and the route's AI quotas, then holds one of the shared
+    AI call slots until the block exits. For endpoints that call the AI only
+    some of the time; the others use ai_quota() below.
+    """
+    try:
+        ai_quotas.check(route, user_id)
+    except QuotaExceeded as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"AI {e.scope} quota exceeded. Please try again later.",
+            headers={"Retry-After": str(max(1, round(e.retry_after)))}
+        )
+    try:
+        ai_quotas.acquire_slot(route, user_id)
+    except (QueueTimeout, QueueFull):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="The AI service is busy. Please try again shortly.",
+            headers={"Retry-After": str(max(1, round(config.AI_QUEUE_TIMEOUT_SECONDS)))}
+        )
+    try:
+        yield
+    finally:
+        ai_quotas.release_slot()
+
+
+def ai_quota(route: str):
+    """
+    Route dependency for AI-backed endpoints: enforces the user's and the route's
+    quotas, then holds one of the shared AI call slots for the rest of the request.
+    """
+    def guard(current_user: User = Depends(get_current_active_user)):
+        with ai_call_slot(route, current_user.UserID):
+            yield
+
+    return guard
+
+
+class IdempotentReplay(Exception):
+    """
+    Raised by the idempotent() dependency when a request is a retry of one that
+    already succeeded; the handler in main.py answers with the stored response.
+    """
+    def __init__(self, status_code: int, body: Any):
+        self.status_code = status_code
+        self.body = body
+
+
+class IdempotencyHandle:
+    """
+    The claim on an Idempotency-Key. The endpoint calls save() with its response
+    once the work is committed; an unsaved claim is released when the request ends.
+    """
+    def __init__(self, user_id: int, key: str):
+        self.user_id = user_id
+        self.key = key
+        self.saved = False
+
+    def save(self, status_code: int, body: Any) -> None:
+        idempotency_service.complete(self.user_id, self.key, status_code, body)
+        self.saved = True
+
+
+async def _fingerprint(request: Request) -> str:
+    # Starlette caches the parsed form, so this reads the same upload the endpoint gets.
+    parts = [request.method.encode(), request.url.path.encode(), request.url.query.encode()]
+    if request.headers.get("content-type", "").startswith(("multipart/form-data", "application/x-www-form-urlencoded")):
+        form = await request.form()
+        for name, value in sorted(form.multi_items(), key=lambda item: item[0]):
+            parts.append(name.encode())
+            if isinstance(value, UploadFile):
+                parts.append(await value.read())
+                await value.seek(0)
+            else:
+                parts.append(value.encode())
+    else:
+        parts.append(await request.body())
+    return idempotency_service.request_hash(parts)
+
+
+def idempotent(scope: str):
+    """
+    Route dependency honouring an optional Idempotency-Key header. Yields an
+    IdempotencyHandle, or None when the client sent no key.
+
+    Declare it before ai_quota() so a replay, or a retry waiting on the original
+    request, never spends AI quota.
+    """
+    async def claim(request: Request, current_user: User = Depends(get_current_active_user)):
+        key = request.headers.get("idempotency-key")
+        if not key:
+            yield None
+            return
+        if len(key) > 255:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Idempotency-Key is too long (255 characters at most).")
+
+        fingerprint = await _fingerprint(request)
+        deadline = time.monotonic() + config.IDEMPOTENCY_WAIT_SECONDS
+        while True:
+            try:
+                result = await run_in_threadpool(idempotency_service.begin, current_user.UserID, key, scope, fingerprint)
+            except idempotency_service.KeyReused:
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail="This Idempotency-Key was already used for a different request."
+                )
+            if result.state == idempotency_service.REPLAY:
+                raise IdempotentReplay(result.response_status, result.response_body)
+            if result.state == idempotency_service.STARTED:
+                break
+            if time.monotonic() >= deadline:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="A request with this Idempotency-Key is still being processed. Retry later."
+                )
+            await asyncio.sleep(config.IDEMPOTENCY_POLL_SECONDS)
+
+        handle = IdempotencyHandle(current_user.UserID, key)
+        try:
+            yield handle
+        finally:
+            if not handle.saved:
+                await run_in_threadpool(idempotency_service.release, current_user.UserID, key)
+
+    return claim
@@ -0,0 +1,61 @@
+# backend/app/api/diagnostics.py
+
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy.orm import Session
+from typing import Dict, List
+
+from app.core import profiling
+from app.database.models import user as user_model
+from app.schemas import diagnostics_schema
+from app.services.talent_rediscovery_service import rediscovery_worker
+from app.api.dependencies import get_db, get_current_active_user
+
+router = APIRouter(
+    prefix="/diagnostics",
+    tags=["Diagnostics"],
+)
+
+
+def require_admin(current_user: user_model.User = Depends(get_current_active_user)) -> user_model.User:
+    if current_user.Role != "Admin":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required.")
+    return current_user
+
+
+@router.get("/profiles", response_model=List[diagnostics_schema.ProfileSummary], dependencies=[Depends(require_admin)])
+def list_request_profiles():
+    """
+    Stored request profiles, newest first. Send "X-Profile: 1" as an admin to profile a request.
+    """
+    return profiling.list_profiles()
+
+
+@router.get("/profiles/{profile_id}", response_model=diagnostics_schema.Profile, dependencies=[Depends(require_admin)])
+def read_request_profile(profile_id: str):
+    profile = profiling.load_profile(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return profile
+
+
+@router.get("/profiles/{profile_id}/collapsed", dependencies=[Depends(require_admin)])
+def download_request_profile(profile_id: str):
+    """
+    The sampled stacks in collapsed format, for speedscope or flamegraph.pl.
+    """
+    profile = profiling.load_profile(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return Response(
+        content=profile["collapsed"] + "\n",
+        media_type="text/plain",
+        headers={"Content-Disposition": f"attachment; filename=profile_{profile_id}.folded"}
+    )
+
+
+@router.get("/rediscovery/stats", response_model=Dict[str, int], dependencies=[Depends(require_admin)])
+def get_rediscovery_stats(db: Session = Depends(get_db)):
+    """
+    Queue depth of rediscovery runs, and this worker's throughput.
+    """
+    return rediscovery_worker.stats(db)
@@ -1,7 +1,12 @@
 # backend/app/api/jobs.py
 
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from sqlalchemy.orm import Session
+import asyncio
+import logging
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, selectinload
 from typing import List, Optional, Dict
 from datetime import datetime
 
@@ -14,8 +19,15 @@ from app.database.models import (
     candidate as candidate_model
 )
 from app.schemas import job_schema, candidate_schema
-from app.api.dependencies import get_db, get_current_active_user
-from app.services import gemini_service, resume_parser_service
+from app.api.dependencies import get_db, get_read_db, get_current_active_user, get_streaming_user, conditional_get, ai_quota
+from app.core import config
+from app.core.responses import fast_json
+from app.database.session import SessionLocal
+from app.services import gemini_service, resume_parser_service, match_matrix_service, skill_service, talent_rediscovery_service
+from app.services.skill_index_service import skill_index, get_job_skill_ids
+from app.services import pipeline_events_service
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(
     prefix="/jobs",
@@ -25,6 +37,7 @@ router = APIRouter(
 @router.post("/", response_model=job_schema.Job, status_code=status.HTTP_201_CREATED)
 def create_job(
     job: job_schema.JobCreate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: user_model.User = Depends(get_current_active_user)
 ):
@@ -36,40 +49,36 @@ def create_job(
 
     try:
         job_data = job.model_dump(exclude={"required_skills", "interview_stages"})
-        db_job = job_model.JobPosting(**job_data, CreatedBy=current_user.UserID)
-        db.add(db_job)
-        db.flush()
-
-        if job.required_skills:
-            skill_names = set(s.strip().title() for s in job.required_skills if s.strip())
-            for skill_name in skill_names:
-                db_skill = db.query(skill_model.Skill).filter(skill_model.Skill.SkillName.ilike(skill_name)).first()
-                if not db_skill:
-                    db_skill = skill_model.Skill(SkillName=skill_name, CreatedBy=current_user.UserID)
-                    db.add(db_skill)
-                    db.flush()
-                db_job.required_skills.append(db_skill)
-        
-        if job.interview_stages:
-            for stage_data in job.interview_stages:
-                db_stage = wf_model.InterviewStageTemplate(
-                    JobID=db_job.JobID,
+        # Skills and stages are attached before the job is first flushed, so all of
+        # it is written in one flush, without lazy-loading the empty collections.
+        db_job = job_model.JobPosting(
+            **job_data,
+            CreatedBy=current_user.UserID,
+            required_skills=skill_service.get_or_create_skills(db, job.required_skills, current_user.UserID),
+            interview_stages=[
+                wf_model.InterviewStageTemplate(
                     StageName=stage_data.StageName,
                     InterviewerInfo=stage_data.InterviewerInfo,
                     Sequence=stage_data.Sequence
                 )
-                db.add(db_stage)
+                for stage_data in job.interview_stages
+            ]
+        )
+        db.add(db_job)
+        db.flush()
+        talent_rediscovery_service.queue_run(db, db_job.JobID, talent_rediscovery_service.TRIGGER_JOB_CREATED)
 
         db.commit()
         db.refresh(db_job)
+        background_tasks.add_task(match_matrix_service.rescore_job_in_background, db_job.JobID)
         return db_job
-    except Exception as e:
+    except Exception:
         db.rollback()
-        print(f"Error creating job: {e}")
+        logger.exception("Error creating job")
         raise HTTPException(status_code=500, detail=f"Failed to create job: An internal error occurred.")
 
 
-@router.post("/generate-jd", response_model=Dict[str, str])
+@router.post("/generate-jd", response_model=Dict[str, str], dependencies=[Depends(ai_quota("generate_jd"))])
 def generate_jd_with_ai(
     request: job_schema.JDGenerationRequest,
     current_user: user_model.User = Depends(get_current_active_user)
@@ -91,54 +100,104 @@ def generate_jd_with_ai(
 
 
 @router.post("/parse-jd", response_model=Dict[str, str])
-async def parse_jd_from_file(
+def parse_jd_from_file(
     file: UploadFile = File(...),
     current_user: user_model.User = Depends(get_current_active_user)
 ):
     """
-    Parses a JD from an uploaded file (PDF or DOCX) and returns the text.
+    Parses a JD from an uploaded file (PDF or DOCX) and returns the text. Sync,
+    so the parsing runs in the threadpool instead of on the event loop.
     """
     if current_user.Role not in ["Admin", "HR"]:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Permission denied.")
     
     try:
-        content = await file.read()
+        content = file.file.read()
         text = resume_parser_service.extract_text(content, file.filename)
         return {"description": text}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to parse file: {str(e)}")
 
 
-@router.get("/", response_model=List[job_schema.Job])
+# Job lists and details embed skills and interview stages.
+JOB_TABLES = ("JobPostings", "Skills", "InterviewStageTemplates")
+
+
+@router.get("/", response_model=List[job_schema.Job], dependencies=[Depends(conditional_get(*JOB_TABLES))])
 def read_jobs(
     department_id: Optional[int] = None,
     skip: int = 0, 
     limit: int = 100, 
-    db: Session = Depends(get_db), 
+    db: Session = Depends(get_read_db), 
     current_user: user_model.User = Depends(get_current_active_user)
 ):
     """
     Retrieves a list of jobs. Can be filtered by department_id.
     """
-    query = db.query(job_model.JobPosting)
+    # Eager-load the nested lists in two extra queries instead of two per job.
+    query = db.query(job_model.JobPosting).options(
+        selectinload(job_model.JobPosting.required_skills),
+        selectinload(job_model.JobPosting.interview_stages)
+    )
 
     if department_id is not None:
         query = query.filter(job_model.JobPosting.DepartmentID == department_id)
 
     jobs = query.offset(skip).limit(limit).all()
-    return jobs
+    return fast_json(List[job_schema.Job], jobs)
 
 
-@router.get("/{job_id}", response_model=job_schema.Job)
-def read_job(job_id: int, db: Session = Depends(get_db), current_user: user_model.User = Depends(get_current_active_user)):
-    db_job = db.query(job_model.JobPosting).filter(job_model.JobPosting.JobID == job_id).first()
+@router.get("/{job_id}", response_model=job_schema.Job, dependencies=[Depends(conditional_get(*JOB_TABLES))])
+def read_job(job_id: int, db: Session = Depends(get_read_db), current_user: user_model.User = Depends(get_current_active_user)):
+    db_job = db.query(job_model.JobPosting).options(
+        selectinload(job_model.JobPosting.required_skills),
+        selectinload(job_model.JobPosting.interview_stages)
+    ).filter(job_model.JobPosting.JobID == job_id).first()
     if db_job is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
     return db_job
 
 
+@router.get("/{job_id}/matches", response_model=List[candidate_schema.CandidateMatch])
+def read_top_matches_for_job(
+    job_id: int,
+    limit: int = 50,
+    db: Session = Depends(get_read_db),
+    current_user: user_model.User = Depends(get_current_active_user)
+):
+    """
+    Candidates covering most of a job's required skills, read from the precomputed match matrix.
+    """
+    return match_matrix_service.top_matches_for_job(job_id, db, limit=limit)
+
+
+@router.get("/{job_id}/skill-matches", response_model=List[candidate_schema.SkillMatch])
+def read_skill_matches_for_job(
+    job_id: int,
+    limit: int = 50,
+    db: Session = Depends(get_read_db),
+    current_user: user_model.User = Depends(get_current_active_user)
+):
+    """
+    Ranks the whole talent pool by coverage of the job's required skills,
+    using the in-memory skill index (no AI calls).
+    """
+    db_job = db.query(job_model.JobPosting.JobID).filter(job_model.JobPosting.JobID == job_id).first()
+    if not db_job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+
+    matches = skill_index.top_k(get_job_skill_ids(job_id, db), k=limit)
+    if matches:
+        names = dict(db.query(candidate_model.Candidate.CandidateID, candidate_model.Candidate.FullName).filter(
+            candidate_model.Candidate.CandidateID.in_([m["CandidateID"] for m in matches])
+        ).all())
+        for match in matches:
+            match["FullName"] = names.get(match["CandidateID"])
+    return matches
+
+
 @router.get("/{job_id}/applications", response_model=List[candidate_schema.JobApplication])
-def read_applications_for_job(job_id: int, stage: Optional[str] = None, db: Session = Depends(get_db), current_user: user_model.User = Depends(get_current_active_user)):
+def read_applications_for_job(job_id: int, stage: Optional[str] = None, sort_by: str = "match_score", db: Session = Depends(get_read_db), current_user: user_model.User = Depends(get_current_active_user)):
     db_job = db.query(job_model.JobPosting).filter(job_model.JobPosting.JobID == job_id).first()
     if not db_job:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
@@ -146,4 +205,119 @@ def read_applications_for_job(job_id: int, stage: Optional[str] = None, db: Sess
     if stage:
         query = query.filter(candidate_model.JobApplication.Stage == stage)
     applications = query.order_by(candidate_model.JobApplication.MatchScore.desc()).all()
-    return applications
\ No newline at end of file
+    if sort_by == "skill_coverage":
+        # Local signal from the skill index; AI MatchScore order is kept for ties.
+        job_skill_ids = get_job_skill_ids(job_id, db)
+        applications.sort(key=lambda a: skill_index.score(a.CandidateID, job_skill_ids) or 0.0, reverse=True)
+    return fast_json(List[candidate_schema.JobApplication], applications)
+
+
+def _job_exists(job_id: int) -> bool:
+    db = SessionLocal()
+    try:
+        return db.query(job_model.JobPosting.JobID).filter(job_model.JobPosting.JobID == job_id).first() is not None
+    finally:
+        db.close()
+
+
+@router.get("/{job_id}/applications/events")
+async def stream_application_events(job_id: int, current_user: user_model.User = Depends(get_streaming_user)):
+    """
+    Server-sent events for the pipeline of a job. After "ready", fetch
+    GET /jobs/{job_id}/applications once and apply the application.* events to
+    it; refetch on "resync". Holds no database connection while open.
+    """
+    if not await run_in_threadpool(_job_exists, job_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    broker = pipeline_events_service.broker
+    try:
+        # Subscribed before "ready", so nothing committed after the client's fetch is missed.
+        queue = broker.subscribe(job_id)
+    except pipeline_events_service.TooManyWatchers:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many open pipeline streams, try again later",
+            headers={"Retry-After": "30"},
+        )
+
+    async def events():
+        try:
+            yield "retry: 3000\n\n" + pipeline_events_service.format_sse("ready", "{}")
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), config.PIPELINE_EVENTS_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                # Whatever else is already queued goes out in the same write.
+                while not queue.empty():
+                    message += queue.get_nowait()
+                yield message
+        finally:
+            broker.unsubscribe(job_id, queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/{job_id}/rediscovery", response_model=candidate_schema.RediscoveryResults)
+def read_rediscovery_results(
+    job_id: int,
+    min_score: float = talent_rediscovery_service.MATCH_THRESHOLD,
+    limit: int = 50,
+    db: Session = Depends(get_read_db),
+    current_user: user_model.User = Depends(get_current_active_user)
+):
+    """
+    Past candidates who fit this job, as scored by the background rediscovery runs.
+    """
+    db_job = db.query(job_model.JobPosting.JobID, job_model.JobPosting.JobTitle).filter(job_model.JobPosting.JobID == job_id).first()
+    if not db_job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return {
+        "JobID": db_job.JobID,
+        "JobTitle": db_job.JobTitle,
+        "latest_run": talent_rediscovery_service.latest_run(db, job_id),
+        "matches": talent_rediscovery_service.get_results(db, job_id, min_score=min_score, limit=limit),
+    }
+
+
+@router.get("/{job_id}/rediscovery/status", response_model=candidate_schema.RediscoveryRun)
+def read_rediscovery_status(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: user_model.User = Depends(get_current_active_user)
+):
+    """
+    Progress of the job's latest rediscovery run, for polling. Read from the
+    primary, so progress never appears to go backwards.
+    """
+    run = talent_rediscovery_service.latest_run(db, job_id)
+    if run is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No rediscovery run for this job")
+    return run
+
+
+@router.post("/{job_id}/rediscovery", response_model=candidate_schema.RediscoveryRun, status_code=status.HTTP_202_ACCEPTED)
+def queue_rediscovery(
+    job_id: int,
+    full: bool = False,
+    db: Session = Depends(get_db),
+    current_user: user_model.User = Depends(get_current_active_user)
+):
+    """
+    Queues a fresh rediscovery run, e.g. after many new candidates were added.
+    Only new and changed candidates are scored, unless `full` is set.
+    """
+    if current_user.Role not in ["Admin", "HR"]:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Permission denied.")
+    db_job = db.query(job_model.JobPosting.JobID).filter(job_model.JobPosting.JobID == job_id).first()
+    if not db_job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    run = talent_rediscovery_service.queue_run(db, job_id, talent_rediscovery_service.TRIGGER_MANUAL, full_rescore=full)
+    db.commit()
+    db.refresh(run)
+    return run
@@ -0,0 +1,61 @@
+# backend/app/api/notifications.py
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from typing import Dict, Optional
+
+from app.database.models import user as user_model
+from app.schemas import notification_schema
+from app.services import email_service, digest_service
+from app.api.dependencies import get_db, get_current_active_user
+
+router = APIRouter(
+    prefix="/notifications",
+    tags=["Notifications"],
+)
+
+
+@router.get("/outbox/stats", response_model=Dict[str, Optional[float]])
+def get_email_outbox_stats(
+    db: Session = Depends(get_db),
+    current_user: user_model.User = Depends(get_current_active_user)
+):
+    """
+    Email outbox queue depth and send latency.
+    Authorization: Only 'Admin' users can access this.
+    """
+    if current_user.Role != "Admin":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required.")
+    return email_service.get_outbox_stats(db)
+
+
+@router.get("/digests/stats", response_model=Dict[str, Optional[float]])
+def get_stage_digest_stats(
+    db: Session = Depends(get_db),
+    current_user: user_model.User = Depends(get_current_active_user)
+):
+    """
+    Throughput of the stage-change digest pipeline.
+    Authorization: Only 'Admin' users can access this.
+    """
+    if current_user.Role != "Admin":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required.")
+    return digest_service.digest_worker.stats(db)
+
+
+@router.get("/deliveries/{outbox_id}", response_model=notification_schema.EmailDelivery)
+def get_email_delivery(
+    outbox_id: int,
+    db: Session = Depends(get_db),
+    current_user: user_model.User = Depends(get_current_active_user)
+):
+    """
+    Delivery state of any queued email (welcome, role update, ...).
+    Authorization: Only 'Admin' users can access this.
+    """
+    if current_user.Role != "Admin":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required.")
+    delivery = email_service.get_delivery(db, outbox_id)
+    if not delivery:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Email delivery not found.")
+    return delivery
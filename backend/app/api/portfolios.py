@@ -9,7 +9,7 @@ from datetime import datetime
 from app.database.models import portfolio_department as portfolio_model
 from app.database.models import user as user_model
 from app.schemas import portfolio_schema
-from app.api.dependencies import get_db, get_current_active_user
+from app.api.dependencies import get_db, get_read_db, get_current_active_user, conditional_get
 
 router = APIRouter(
     prefix="/portfolios",
@@ -35,8 +35,8 @@ def create_portfolio(
     db.refresh(db_portfolio)
     return db_portfolio
 
-@router.get("/", response_model=List[portfolio_schema.Portfolio])
-def read_portfolios(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+@router.get("/", response_model=List[portfolio_schema.Portfolio], dependencies=[Depends(conditional_get("Portfolios", "Departments"))])
+def read_portfolios(skip: int = 0, limit: int = 100, db: Session = Depends(get_read_db)):
     """
     Retrieve a list of all portfolios, with their associated departments.
     """
@@ -47,8 +47,8 @@ def read_portfolios(skip: int = 0, limit: int = 100, db: Session = Depends(get_d
     ).offset(skip).limit(limit).all()
     return portfolios
 
-@router.get("/{portfolio_id}", response_model=portfolio_schema.Portfolio)
-def read_portfolio(portfolio_id: int, db: Session = Depends(get_db)):
+@router.get("/{portfolio_id}", response_model=portfolio_schema.Portfolio, dependencies=[Depends(conditional_get("Portfolios", "Departments"))])
+def read_portfolio(portfolio_id: int, db: Session = Depends(get_read_db)):
     """
     Retrieve a single portfolio by its ID, with its associated departments.
     """
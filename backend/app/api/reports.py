@@ -8,7 +8,8 @@ from typing import List, Dict
 import io
 import csv
 
-from app.api.dependencies import get_db, get_current_active_user
+from app.api.dependencies import get_read_db, get_current_active_user
+from app.core import cache, config
 from app.schemas import report_schema
 from app.database.models import job as job_model
 from app.database.models import candidate as candidate_model
@@ -24,12 +25,17 @@ router = APIRouter(
 # --- THIS IS THE NEW ENDPOINT FOR THE DASHBOARD ---
 @router.get("/dashboard-stats", response_model=Dict[str, int])
 def get_dashboard_stats(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: user_model.User = Depends(get_current_active_user)
 ):
     """
     Provides high-level statistics for the main dashboard.
+    Cached for DASHBOARD_STATS_CACHE_SECONDS, shared by all workers with the sqlite cache.
     """
+    return cache.get_or_set("dashboard_stats", "all", config.DASHBOARD_STATS_CACHE_SECONDS, lambda: _dashboard_stats(db))
+
+
+def _dashboard_stats(db: Session) -> Dict[str, int]:
     total_jobs = db.query(func.count(job_model.JobPosting.JobID)).scalar()
     total_candidates = db.query(func.count(candidate_model.Candidate.CandidateID)).scalar()
     
@@ -56,12 +62,12 @@ class JobStatusSummary(report_schema.BaseModel):
     count: int
 
 @router.get("/summary", response_model=report_schema.OverallStats)
-def get_overall_summary_stats(db: Session = Depends(get_db)):
+def get_overall_summary_stats(db: Session = Depends(get_read_db)):
     # ... your existing code for this function ...
     pass
 
 @router.get("/jobs-by-status", response_model=List[JobStatusSummary])
-def get_jobs_by_status(db: Session = Depends(get_db)):
+def get_jobs_by_status(db: Session = Depends(get_read_db)):
     results = db.query(
         job_model.JobPosting.Status.label("status"),
         func.count(job_model.JobPosting.JobID).label("count")
@@ -69,7 +75,7 @@ def get_jobs_by_status(db: Session = Depends(get_db)):
     return results
 
 @router.get("/jobs/download-csv")
-def download_job_report_csv(db: Session = Depends(get_db)):
+def download_job_report_csv(db: Session = Depends(get_read_db)):
     output = io.StringIO()
     writer = csv.writer(output)
     header = ["JobID", "JobTitle", "Status", "DepartmentID", "PortfolioID", "CreatedAt"]
@@ -7,7 +7,8 @@ from typing import List, Optional
 from app.database.models import skill as skill_model
 from app.database.models import user as user_model
 from app.schemas import skill_schema
-from app.api.dependencies import get_db, get_current_active_user
+from app.api.dependencies import get_db, get_read_db, get_current_active_user, conditional_get
+from app.core.responses import fast_json
 
 router = APIRouter(
     prefix="/skills",
@@ -48,10 +49,10 @@ def create_skill(
     db.refresh(db_skill)
     return db_skill
 
-@router.get("/", response_model=List[skill_schema.Skill])
+@router.get("/", response_model=List[skill_schema.Skill], dependencies=[Depends(conditional_get("Skills"))])
 def read_skills(
     q: Optional[str] = None, 
-    db: Session = Depends(get_db), 
+    db: Session = Depends(get_read_db), 
     current_user: user_model.User = Depends(get_current_active_user)
 ):
     """
@@ -63,4 +64,4 @@ def read_skills(
         query = query.filter(skill_model.Skill.SkillName.ilike(f"%{q}%"))
     
     skills = query.order_by(skill_model.Skill.SkillName).all()
-    return skills
\ No newline at end of file
+    return fast_json(List[skill_schema.Skill], skills)
\ No newline at end of file
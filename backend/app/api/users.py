@@ -6,8 +6,8 @@ from typing import List
 
 # Import all necessary modules from your application
 from app.database.models import user as user_model
-from app.schemas import user_schema
-from app.services import notification_service
+from app.schemas import user_schema, notification_schema
+from app.services import notification_service, email_service
 from app.core import security
 from app.api.dependencies import get_db, get_current_active_user
 
@@ -28,7 +28,7 @@ def create_user(
     current_user: user_model.User = Depends(get_current_active_user)
 ):
     """
-    Creates a new user and sends them a welcome email.
+    Creates a new user and queues a welcome email for them.
     Authorization: Only 'Admin' users can perform this action.
     """
     if current_user.Role != "Admin":
@@ -43,15 +43,18 @@ def create_user(
     
     db_user = user_model.User(**user.model_dump())
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    db.flush()
 
+    # Queued in the same transaction; delivery happens in the background.
     notification_service.send_welcome_email(
+        db,
         recipient_email=db_user.Email,
         user_name=db_user.UserName,
         user_role=db_user.Role
     )
 
+    db.commit()
+    db.refresh(db_user)
     return db_user
 
 
@@ -73,6 +76,46 @@ def read_users(
     users = db.query(user_model.User).order_by(user_model.User.UserID).all()
     return users
 
+
+@router.patch("/roles", response_model=List[user_schema.User])
+def update_user_roles(
+    role_update: user_schema.UserRolesUpdate,
+    db: Session = Depends(get_db),
+    current_user: user_model.User = Depends(get_current_active_user)
+):
+    """
+    Gives several users the same role, e.g. a new batch of interviewers, and
+    queues a role update email to each user whose role changed.
+    Authorization: Only 'Admin' users can perform this action.
+    """
+    if current_user.Role != "Admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Operation not permitted. Admin access required."
+        )
+
+    users = db.query(user_model.User).filter(
+        user_model.User.UserID.in_(role_update.user_ids)
+    ).order_by(user_model.User.UserID).all()
+    missing = set(role_update.user_ids) - {user.UserID for user in users}
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Users not found: {', '.join(str(user_id) for user_id in sorted(missing))}"
+        )
+
+    changed = [user for user in users if user.Role != role_update.role]
+    for user in changed:
+        user.Role = role_update.role
+    # One template render and one outbox flush for all of them.
+    notification_service.send_role_update_emails(db, [
+        {"email": user.Email, "user_name": user.UserName or user.Email, "new_role": user.Role}
+        for user in changed
+    ])
+
+    db.commit()
+    return users
+
 # ... (baaki ke admin functions same rahenge)
 
 
@@ -80,10 +123,12 @@ def read_users(
 # PASSWORDLESS OTP LOGIN FLOW
 # ====================================================================
 
-@router.post("/login/request-otp", status_code=status.HTTP_200_OK)
+@router.post("/login/request-otp", response_model=user_schema.OtpRequestAccepted, status_code=status.HTTP_200_OK)
 def request_login_otp(otp_request: user_schema.OtpRequest, db: Session = Depends(get_db)):
     """
     Step 1 of Passwordless Login: User provides an email to receive an OTP.
+    The email is queued and sent in the background; poll /login/otp-status
+    with the returned delivery_id to find out whether it was delivered.
     """
     # <-- YAHAN CHANGE KIYA GAYA HAI -->
     # .email se .Email (Capital E) kiya gaya hai
@@ -100,13 +145,26 @@ def request_login_otp(otp_request: user_schema.OtpRequest, db: Session = Depends
     
     user.OtpCode = otp
     user.OtpExpiry = expiry_time
-    db.commit()
 
-    success = notification_service.send_otp_email(user.Email, otp)
-    if not success:
+    delivery = notification_service.send_otp_email(db, user.Email, otp)
+    if delivery is None:
+        db.rollback()
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to send OTP email.")
+    db.commit()
+
+    return {"message": f"An OTP is being sent to {otp_request.email}.", "delivery_id": delivery.OutboxID}
 
-    return {"message": f"An OTP has been sent to {otp_request.email}."}
+
+@router.get("/login/otp-status", response_model=notification_schema.OtpDeliveryStatus)
+def get_otp_delivery_status(delivery_id: int, email: str, db: Session = Depends(get_db)):
+    """
+    Delivery state of an OTP email: Pending, Sent or Failed.
+    The email must match the one the OTP was requested for.
+    """
+    delivery = email_service.get_delivery(db, delivery_id)
+    if not delivery or delivery.Kind != "otp" or delivery.Recipient.lower() != email.lower():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="OTP delivery not found.")
+    return {"delivery_id": delivery.OutboxID, "status": delivery.Status, "attempts": delivery.Attempts}
 
 
 @router.post("/login/verify-otp", response_model=user_schema.Token)
@@ -6,7 +6,7 @@ from typing import List
 
 from app.database.models import workflow_feedback as wf_model, user as user_model
 from app.schemas import workflow_schema
-from app.api.dependencies import get_db, get_current_active_user
+from app.api.dependencies import get_read_db, get_current_active_user
 
 router = APIRouter(
     prefix="/workflows",
@@ -16,7 +16,7 @@ router = APIRouter(
 @router.get("/job/{job_id}/stages", response_model=List[workflow_schema.StageTemplate])
 def get_stages_for_job(
     job_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: user_model.User = Depends(get_current_active_user)
 ):
     """
@@ -0,0 +1,238 @@
+# app/core/ai_quota.py
+"""
+Quotas and fair queuing for the AI-backed routes.
+
+Every AI request passes two checks:
+
+1. Sliding-window quotas: AI_USER_QUOTAS per user and route, AI_ROUTE_QUOTAS
+   per route for everyone together. Over quota is answered with 429.
+2. A cap on concurrent AI calls (AI_MAX_CONCURRENT_CALLS). Requests beyond it
+   wait in a queue served round-robin by user, so one user's burst queues
+   behind everyone else's next request instead of in front of it. A request
+   that waits longer than AI_QUEUE_TIMEOUT_SECONDS is turned away with 503,
+   and so is one that arrives while AI_MAX_QUEUED_CALLS requests are waiting.
+
+The AI routes are sync, and must stay so: an async route would make its AI call
+on the event loop and hold up every request of the worker, streams included.
+So every admitted or waiting request holds a thread of
+the server's threadpool (40 by default). The queue cap keeps a burst from
+taking all of them, which would stall every other sync route of the worker.
+
+State is kept per worker process, so with several workers the effective limits
+are multiplied by the worker count; set them accordingly.
+"""
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Dict, Hashable, Optional, Tuple
+
+from app.core import config, metrics
+
+
+def parse_quotas(spec: str) -> Dict[str, Tuple[int, float]]:
+    """
+    Parses "route=limit/seconds,..." into {route: (limit, seconds)}.
+    """
+    quotas = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        route, _, rule = item.partition("=")
+        limit, _, seconds = rule.partition("/")
+        quotas[route.strip()] = (int(limit), float(seconds or 60))
+    return quotas
+
+
+class SlidingWindow:
+    """
+    Sliding-window log: the timestamps of the requests inside the window, per key.
+    """
+    def __init__(self, limit: int, seconds: float):
+        self.limit = limit
+        self.seconds = seconds
+        self._hits: Dict[Hashable, Deque[float]] = {}
+
+    def _window(self, key: Hashable, now: float) -> Deque[float]:
+        hits = self._hits.setdefault(key, deque())
+        while hits and hits[0] <= now - self.seconds:
+            hits.popleft()
+        return hits
+
+    def retry_after(self, key: Hashable, now: float) -> Optional[float]:
+        """
+        None if a request fits in the window now, else the seconds until one will.
+        """
+        hits = self._window(key, now)
+        if len(hits) < self.limit:
+            return None
+        return hits[0] + self.seconds - now
+
+    def record(self, key: Hashable, now: float) -> None:
+        self._window(key, now).append(now)
+
+    def usage(self, key: Hashable, now: float) -> float:
+        return len(self._window(key, now)) / self.limit if self.limit else 1.0
+
+    def forget_idle(self, now: float) -> None:
+        for key in [key for key, hits in self._hits.items() if not hits or hits[-1] <= now - self.seconds]:
+            del self._hits[key]
+
+
+class QuotaExceeded(Exception):
+    def __init__(self, scope: str, retry_after: float):
+        super().__init__(f"AI {scope} quota exceeded")
+        self.scope = scope
+        self.retry_after = retry_after
+
+
+class QueueTimeout(Exception):
+    pass
+
+
+class QueueFull(Exception):
+    pass
+
+
+class _Ticket:
+    __slots__ = ("granted",)
+
+    def __init__(self):
+        self.granted = False
+
+
+class FairGate:
+    """
+    Admits at most `capacity` holders at a time. Up to `max_waiting` waiters are
+    queued per user and a freed slot goes to the next user in round-robin order.
+    """
+    def __init__(self, capacity: int, max_waiting: int):
+        self.capacity = capacity
+        self.max_waiting = max_waiting
+        self._active = 0
+        self._condition = threading.Condition()
+        self._queues: "OrderedDict[Hashable, Deque[_Ticket]]" = OrderedDict()
+        self._waiting = 0
+
+    @property
+    def waiting(self) -> int:
+        return self._waiting
+
+    def acquire(self, user: Hashable, timeout: float) -> bool:
+        """
+        True once admitted, False after waiting `timeout` seconds in vain. Raises
+        QueueFull, without waiting, when `max_waiting` others are already queued.
+        """
+        with self._condition:
+            if self._active < self.capacity and not self._waiting:
+                self._active += 1
+                return True
+            if self._waiting >= self.max_waiting:
+                raise QueueFull()
+            ticket = _Ticket()
+            self._queues.setdefault(user, deque()).append(ticket)
+            self._waiting += 1
+            self._publish()
+            deadline = time.monotonic() + timeout
+            while not ticket.granted:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            if ticket.granted:
+                return True
+            # Timed out: leave the queue. A granted ticket was already removed.
+            user_queue = self._queues[user]
+            user_queue.remove(ticket)
+            if not user_queue:
+                del self._queues[user]
+            self._waiting -= 1
+            self._publish()
+            return False
+
+    def release(self) -> None:
+        with self._condition:
+            if not self._queues:
+                self._active -= 1
+                return
+            # The slot passes straight to the user at the head of the rotation,
+            # who then goes to the back of it.
+            user, user_queue = next(iter(self._queues.items()))
+            user_queue.popleft().granted = True
+            if user_queue:
+                self._queues.move_to_end(user)
+            else:
+                del self._queues[user]
+            self._waiting -= 1
+            self._publish()
+            self._condition.notify_all()
+
+    def _publish(self) -> None:
+        metrics.AI_QUEUE_DEPTH.set(value=self._waiting)
+
+
+class AIQuotas:
+    # Windows of users that have gone quiet are dropped this often.
+    CLEANUP_EVERY_SECONDS = 300
+
+    def __init__(self, user_quotas: Dict[str, Tuple[int, float]], route_quotas: Dict[str, Tuple[int, float]],
+                 max_concurrent: int, max_queued: int, queue_timeout: float):
+        self.user_windows = {route: SlidingWindow(*quota) for route, quota in user_quotas.items()}
+        self.route_windows = {route: SlidingWindow(*quota) for route, quota in route_quotas.items()}
+        self.gate = FairGate(max_concurrent, max_queued)
+        self.queue_timeout = queue_timeout
+        self._lock = threading.Lock()
+        self._last_cleanup = time.monotonic()
+
+    def check(self, route: str, user_id: int) -> None:
+        """
+        Counts one request against the route's quotas, or raises QuotaExceeded.
+        """
+        now = time.monotonic()
+        user_window = self.user_windows.get(route)
+        route_window = self.route_windows.get(route)
+        with self._lock:
+            if now - self._last_cleanup > self.CLEANUP_EVERY_SECONDS:
+                for window in self.user_windows.values():
+                    window.forget_idle(now)
+                self._last_cleanup = now
+            for scope, window, key in (("user", user_window, user_id), ("route", route_window, None)):
+                if window is None:
+                    continue
+                retry_after = window.retry_after(key, now)
+                if retry_after is not None:
+                    metrics.AI_QUOTA_REQUESTS.inc(route, f"rejected_{scope}")
+                    raise QuotaExceeded(scope, retry_after)
+            if user_window is not None:
+                user_window.record(user_id, now)
+            if route_window is not None:
+                route_window.record(None, now)
+                metrics.AI_QUOTA_USAGE.set(route, value=route_window.usage(None, now))
+
+    def acquire_slot(self, route: str, user_id: int) -> None:
+        """
+        Waits for a concurrent-call slot in fair order, or raises QueueTimeout
+        (or QueueFull).
+        """
+        started = time.perf_counter()
+        try:
+            admitted = self.gate.acquire(user_id, self.queue_timeout)
+        except QueueFull:
+            metrics.AI_QUOTA_REQUESTS.inc(route, "rejected_queue_full")
+            raise
+        metrics.AI_QUEUE_WAIT.observe(time.perf_counter() - started, route)
+        if not admitted:
+            metrics.AI_QUOTA_REQUESTS.inc(route, "queue_timeout")
+            raise QueueTimeout()
+        metrics.AI_QUOTA_REQUESTS.inc(route, "admitted")
+
+    def release_slot(self) -> None:
+        self.gate.release()
+
+
+ai_quotas = AIQuotas(
+    parse_quotas(config.AI_USER_QUOTAS),
+    parse_quotas(config.AI_ROUTE_QUOTAS),
+    config.AI_MAX_CONCURRENT_CALLS,
+    config.AI_MAX_QUEUED_CALLS,
+    config.AI_QUEUE_TIMEOUT_SECONDS,
+)
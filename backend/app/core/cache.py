@@ -0,0 +1,174 @@
+# app/core/cache.py
+"""
+Pluggable key/value cache with per-entry TTLs.
+
+Two backends, chosen by CACHE_BACKEND:
+
+- "memory": an LRU dict in this process. Fastest, but every worker warms and
+  holds its own copy, so the hit rate drops as workers are added.
+- "sqlite": one SQLite file shared by all workers on the host (WAL mode, so
+  readers never block each other). Point CACHE_SQLITE_PATH at /dev/shm to keep
+  it in shared memory.
+
+Values must be JSON-serializable so the backends are interchangeable. A cache
+failure is logged and treated as a miss; it never fails the request.
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Tuple
+
+from app.core import config, metrics
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class InProcessCache:
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteCache:
+    # Expired rows are pruned, and the size cap enforced, every this many writes.
+    PRUNE_EVERY = 256
+
+    def __init__(self, path: str, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._writes = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread, reopened in a forked worker: SQLite
+        # connections must not cross a fork.
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL) WITHOUT ROWID"
+            )
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            row = self._connection().execute(
+                "SELECT value FROM cache_entries WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        except sqlite3.Error:
+            logger.warning("Cache read failed for %s", key, exc_info=True)
+            return default
+        return default if row is None else json.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        try:
+            connection = self._connection()
+            connection.execute(
+                "INSERT OR REPLACE INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value, default=str), time.time() + ttl)
+            )
+            self._writes += 1
+            if self._writes % self.PRUNE_EVERY == 0:
+                self._prune(connection)
+        except sqlite3.Error:
+            logger.warning("Cache write failed for %s", key, exc_info=True)
+
+    def _prune(self, connection: sqlite3.Connection) -> None:
+        connection.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (time.time(),))
+        # Over the cap, drop the entries closest to expiry.
+        connection.execute(
+            "DELETE FROM cache_entries WHERE key IN ("
+            "SELECT key FROM cache_entries ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+
+    def delete(self, key: str) -> None:
+        try:
+            self._connection().execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+        except sqlite3.Error:
+            logger.warning("Cache delete failed for %s", key, exc_info=True)
+
+    def clear(self) -> None:
+        try:
+            self._connection().execute("DELETE FROM cache_entries")
+        except sqlite3.Error:
+            logger.warning("Cache clear failed", exc_info=True)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """
+    Returns the process-wide cache for the configured backend.
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                if config.CACHE_BACKEND == "sqlite":
+                    _cache = SQLiteCache(config.CACHE_SQLITE_PATH, config.CACHE_MAX_ENTRIES)
+                else:
+                    _cache = InProcessCache(config.CACHE_MAX_ENTRIES)
+    return _cache
+
+
+def get_or_set(namespace: str, key: str, ttl: float, factory: Callable[[], Any]) -> Any:
+    """
+    Returns the cached value of `namespace:key`, computing and storing it with
+    `factory` on a miss. Hits and misses are counted per namespace.
+    """
+    cache = get_cache()
+    full_key = f"{namespace}:{key}"
+    value = cache.get(full_key, _MISSING)
+    if value is not _MISSING:
+        metrics.CACHE_REQUESTS.inc(namespace, "hit")
+        return value
+    metrics.CACHE_REQUESTS.inc(namespace, "miss")
+    value = factory()
+    cache.set(full_key, value, ttl)
+    return value
+
+
+def invalidate(namespace: str, key: str) -> None:
+    get_cache().delete(f"{namespace}:{key}")
@@ -1,5 +1,6 @@
 # app/core/config.py
 import os
+import tempfile
 from dotenv import load_dotenv
 
 # --- THIS MUST BE AT THE TOP ---
@@ -9,7 +10,13 @@ load_dotenv()
 # -----------------------------
 
 # Now, read the variables from the loaded environment
+APP_ENV = os.getenv("APP_ENV", "production") # "development" enables extra diagnostics
 DATABASE_URL = os.getenv("DATABASE_URL")
+# Optional read replica. When unset, reads go to the primary DATABASE_URL.
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
+# After a write, the client is pinned to the primary for this many seconds
+# so it always reads its own writes, even if the replica is lagging.
+REPLICA_PIN_SECONDS = int(os.getenv("REPLICA_PIN_SECONDS", 5))
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
 # --- Security Variables ---
@@ -23,4 +30,130 @@ SMTP_PORT = int(os.getenv("SMTP_PORT", 587))
 EMAIL_SENDER_ADDRESS = os.getenv("EMAIL_SENDER_ADDRESS")
 EMAIL_SENDER_NAME = os.getenv("EMAIL_SENDER_NAME")
 EMAIL_HOST_USER = os.getenv("EMAIL_HOST_USER")
-EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD")
\ No newline at end of file
+EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD")
+# Set to "false" to talk plain SMTP, e.g. to a local debugging sink
+# (python -m aiosmtpd -n -l localhost:1025). Login is skipped when no user is set.
+SMTP_USE_TLS = os.getenv("SMTP_USE_TLS", "true").lower() == "true"
+
+# --- Email Outbox Variables ---
+EMAIL_OUTBOX_SENDER_ENABLED = os.getenv("EMAIL_OUTBOX_SENDER_ENABLED", "true").lower() == "true"
+EMAIL_POOL_SIZE = int(os.getenv("EMAIL_POOL_SIZE", 2)) # Authenticated SMTP connections kept open
+EMAIL_POOL_IDLE_SECONDS = int(os.getenv("EMAIL_POOL_IDLE_SECONDS", 60)) # Idle connections older than this are reopened
+EMAIL_BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", 50)) # Messages sent per connection checkout
+EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", 5))
+EMAIL_RETRY_BASE_SECONDS = int(os.getenv("EMAIL_RETRY_BASE_SECONDS", 30)) # Doubles after every failed attempt
+EMAIL_SENDER_POLL_SECONDS = int(os.getenv("EMAIL_SENDER_POLL_SECONDS", 5))
+EMAIL_OUTBOX_RETENTION_DAYS = int(os.getenv("EMAIL_OUTBOX_RETENTION_DAYS", 30)) # Sent rows are deleted after this
+
+# --- Email Template Variables ---
+# Compiled Jinja templates are cached here so new workers skip the compile step.
+EMAIL_TEMPLATE_CACHE_DIR = os.getenv("EMAIL_TEMPLATE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "staffing_tool_jinja_cache"))
+# Re-check template files for changes on every render. Only useful while editing templates.
+EMAIL_TEMPLATE_AUTO_RELOAD = os.getenv("EMAIL_TEMPLATE_AUTO_RELOAD", "false").lower() == "true"
+
+# --- Stage Change Digest Variables ---
+DIGEST_ENABLED = os.getenv("DIGEST_ENABLED", "true").lower() == "true"
+DIGEST_WINDOW_SECONDS = int(os.getenv("DIGEST_WINDOW_SECONDS", 900)) # Changes are collected this long before a digest goes out
+DIGEST_POLL_SECONDS = int(os.getenv("DIGEST_POLL_SECONDS", 60))
+DIGEST_MAX_RECIPIENTS_PER_CYCLE = int(os.getenv("DIGEST_MAX_RECIPIENTS_PER_CYCLE", 100))
+DIGEST_MAX_EVENTS_PER_EMAIL = int(os.getenv("DIGEST_MAX_EVENTS_PER_EMAIL", 25)) # The rest is summarised as "and N more"
+# Backpressure: no new digests are queued while the email outbox holds more than this many pending messages.
+DIGEST_OUTBOX_BACKPRESSURE_LIMIT = int(os.getenv("DIGEST_OUTBOX_BACKPRESSURE_LIMIT", 1000))
+
+# --- Talent Rediscovery Variables ---
+REDISCOVERY_WORKER_ENABLED = os.getenv("REDISCOVERY_WORKER_ENABLED", "true").lower() == "true"
+REDISCOVERY_POLL_SECONDS = int(os.getenv("REDISCOVERY_POLL_SECONDS", 5)) # Queue check interval when idle
+# A Running run whose worker has not reported progress for this long is queued again.
+REDISCOVERY_STALE_SECONDS = int(os.getenv("REDISCOVERY_STALE_SECONDS", 600))
+# How often a worker reports progress on its run, also while it waits for AI slots. Keep it well under the above.
+REDISCOVERY_HEARTBEAT_SECONDS = int(os.getenv("REDISCOVERY_HEARTBEAT_SECONDS", 60))
+
+# --- Skill Index Variables ---
+# How often each worker checks whether CandidateSkills changed in another process
+# (one version lookup) and, if so, reloads its in-memory skill index. 0 disables it.
+SKILL_INDEX_REFRESH_SECONDS = int(os.getenv("SKILL_INDEX_REFRESH_SECONDS", 60))
+
+# --- Candidate Deduplication Variables ---
+# Check each uploaded resume against the pool and attach it to the existing candidate it duplicates.
+DEDUP_ON_INGEST = os.getenv("DEDUP_ON_INGEST", "true").lower() == "true"
+# Names at least this similar (difflib ratio, 0-1) count as the same person when phone or email local part agrees.
+DEDUP_NAME_SIMILARITY = float(os.getenv("DEDUP_NAME_SIMILARITY", 0.85))
+# Blocks with more candidates than this (very common names) are not compared.
+DEDUP_MAX_BLOCK_SIZE = int(os.getenv("DEDUP_MAX_BLOCK_SIZE", 200))
+
+# --- Live Pipeline Update Variables ---
+PIPELINE_EVENTS_MAX_WATCHERS = int(os.getenv("PIPELINE_EVENTS_MAX_WATCHERS", 1000)) # Open event streams per worker process
+# Events buffered per watcher. A watcher that falls further behind is told to refetch the list instead.
+PIPELINE_EVENTS_QUEUE_SIZE = int(os.getenv("PIPELINE_EVENTS_QUEUE_SIZE", 100))
+PIPELINE_EVENTS_KEEPALIVE_SECONDS = int(os.getenv("PIPELINE_EVENTS_KEEPALIVE_SECONDS", 15)) # Keeps idle proxies from closing the stream
+
+# --- Query Budget Variables ---
+# "off" or "warn" (log requests over their query budget and send X-DB-Query-Count). Budgets are enforced in tests.
+QUERY_BUDGET_MODE = os.getenv("QUERY_BUDGET_MODE", "warn" if APP_ENV == "development" else "off").lower()
+
+# --- Logging Variables ---
+LOG_LEVEL = os.getenv("LOG_LEVEL", "DEBUG" if APP_ENV == "development" else "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text" if APP_ENV == "development" else "json").lower() # "json" or "text"
+# Per-item debug lines in hot loops (e.g. one per candidate) are only logged for every Nth item.
+LOG_DEBUG_SAMPLE_EVERY = int(os.getenv("LOG_DEBUG_SAMPLE_EVERY", 100))
+# --- AI Backend Variables ---
+# "gemini", or "fake" for load tests and local runs: canned, deterministic
+# responses after AI_FAKE_LATENCY_SECONDS, without calling the Gemini API.
+AI_BACKEND = os.getenv("AI_BACKEND", "gemini").lower()
+AI_FAKE_LATENCY_SECONDS = float(os.getenv("AI_FAKE_LATENCY_SECONDS", 0.8))
+
+# --- AI Quota Variables ---
+# "route=requests/seconds" sliding windows, per user and per route (all users).
+# Routes: generate_jd, analyze_resume, insights. Limits apply per worker process.
+AI_USER_QUOTAS = os.getenv("AI_USER_QUOTAS", "generate_jd=10/60,analyze_resume=60/60,insights=30/60")
+AI_ROUTE_QUOTAS = os.getenv("AI_ROUTE_QUOTAS", "generate_jd=60/60,analyze_resume=600/60,insights=300/60")
+# Concurrent AI calls; the excess waits in a per-user round-robin queue.
+AI_MAX_CONCURRENT_CALLS = int(os.getenv("AI_MAX_CONCURRENT_CALLS", 8))
+AI_QUEUE_TIMEOUT_SECONDS = float(os.getenv("AI_QUEUE_TIMEOUT_SECONDS", 30))
+# Requests waiting beyond this are turned away at once. Each one waits on a threadpool
+# thread, so keep AI_MAX_CONCURRENT_CALLS + AI_MAX_QUEUED_CALLS well below its 40 threads.
+AI_MAX_QUEUED_CALLS = int(os.getenv("AI_MAX_QUEUED_CALLS", 16))
+
+# --- Idempotency Variables ---
+IDEMPOTENCY_KEY_TTL_HOURS = int(os.getenv("IDEMPOTENCY_KEY_TTL_HOURS", 24)) # How long a stored response is replayed
+# A retry waits this long for the original request to finish before getting 409.
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", 60))
+IDEMPOTENCY_POLL_SECONDS = float(os.getenv("IDEMPOTENCY_POLL_SECONDS", 0.5))
+# An unfinished claim older than this is assumed abandoned and can be taken over.
+IDEMPOTENCY_LOCK_SECONDS = int(os.getenv("IDEMPOTENCY_LOCK_SECONDS", 300))
+
+# --- Startup Variables ---
+# Heavy dependencies (Gemini SDK, PDF/DOCX parsers, Jinja) are imported on first use.
+# Warm-up loads them ahead of the first request: "background" (right after startup,
+# without delaying it), "sync" (before the worker accepts traffic) or "off".
+STARTUP_WARMUP = os.getenv("STARTUP_WARMUP", "background").lower()
+
+# --- Response Compression Variables ---
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", 1024)) # Smaller bodies are sent as-is
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", 6))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", 4)) # 0-11; higher is smaller but much slower
+
+# --- Conditional GET Variables ---
+# Cache-Control max-age for reference data served with ETags. At 0 browsers keep
+# the response but revalidate it (If-None-Match) on every use.
+REFERENCE_DATA_MAX_AGE_SECONDS = int(os.getenv("REFERENCE_DATA_MAX_AGE_SECONDS", 0))
+
+# --- Cache Variables ---
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory").lower() # "memory" (per process) or "sqlite" (shared by the host's workers)
+# With several workers on one host, a path under /dev/shm keeps the shared cache in memory.
+CACHE_SQLITE_PATH = os.getenv("CACHE_SQLITE_PATH", os.path.join(tempfile.gettempdir(), "staffing_tool_cache.sqlite3"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", 10000))
+DASHBOARD_STATS_CACHE_SECONDS = int(os.getenv("DASHBOARD_STATS_CACHE_SECONDS", 30))
+
+# --- Server Variables (gunicorn.conf.py) ---
+SERVER_BIND = os.getenv("SERVER_BIND", "0.0.0.0:8000")
+# Async workers: one per core is usually right. Each holds its own DB pool.
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1))
+SERVER_TIMEOUT_SECONDS = int(os.getenv("SERVER_TIMEOUT_SECONDS", 120))
+
+# --- Profiling Variables ---
+# Requests are profiled when an admin sends "X-Profile: 1", or at random at this rate (0 = never).
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", 0))
+PROFILING_INTERVAL_MS = float(os.getenv("PROFILING_INTERVAL_MS", 5))
+PROFILING_OUTPUT_DIR = os.getenv("PROFILING_OUTPUT_DIR", os.path.join(tempfile.gettempdir(), "staffing_tool_profiles"))
+PROFILING_MAX_FILES = int(os.getenv("PROFILING_MAX_FILES", 200))
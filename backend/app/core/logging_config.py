@@ -0,0 +1,140 @@
+# app/core/logging_config.py
+"""
+Structured, leveled logging for the API process.
+
+Log records are handed to a QueueHandler, and a QueueListener thread does the
+formatting and writing, so request and worker threads never block on stdout.
+Every record carries the current request_id and job_id (context variables set
+by the request middleware and by job-scoped work such as rediscovery).
+"""
+import copy
+import itertools
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Optional
+
+from app.core import config
+
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+job_id_var: ContextVar[Optional[int]] = ContextVar("job_id", default=None)
+
+# Attributes every LogRecord has; anything else was passed via `extra=` and is logged as a field.
+_STANDARD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "request_id", "job_id"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class CorrelationFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        record.job_id = job_id_var.get()
+        return True
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    Like QueueHandler, but keeps the traceback separate from the message so the
+    JSON formatter can put it in its own field.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _plain_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_plain_formatter = logging.Formatter()
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if record.request_id:
+            entry["request_id"] = record.request_id
+        if record.job_id is not None:
+            entry["job_id"] = record.job_id
+        for key, value in record.__dict__.items():
+            if key not in _STANDARD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s [req=%(request_id)s job=%(job_id)s] %(message)s")
+
+
+def configure_logging() -> None:
+    """
+    Installs the queue-based handler on the "app" logger. Safe to call more than once.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter() if config.LOG_FORMAT == "json" else TextFormatter())
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = _QueueHandler(log_queue)
+    # Correlation IDs live in context variables, so they must be captured on the
+    # calling thread, before the record crosses the queue.
+    queue_handler.addFilter(CorrelationFilter())
+
+    app_logger = logging.getLogger("app")
+    app_logger.setLevel(config.LOG_LEVEL)
+    app_logger.handlers = [queue_handler]
+    app_logger.propagate = False
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+
+
+def restart_logging_after_fork() -> None:
+    """
+    A forked worker inherits the listener but not its thread; start a fresh one.
+    """
+    global _listener
+    _listener = None
+    configure_logging()
+
+
+def shutdown_logging() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+class SampledDebug:
+    """
+    Per-item debug logging for hot loops: only every Nth call is emitted
+    (LOG_DEBUG_SAMPLE_EVERY), and nothing at all is formatted unless DEBUG is on.
+    """
+
+    def __init__(self, logger: logging.Logger, every: Optional[int] = None):
+        self.logger = logger
+        self.every = max(1, every or config.LOG_DEBUG_SAMPLE_EVERY)
+        self._counter = itertools.count()
+
+    def __call__(self, msg: str, *args, **kwargs) -> None:
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return
+        if next(self._counter) % self.every == 0:
+            self.logger.debug(msg, *args, **kwargs)
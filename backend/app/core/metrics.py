@@ -0,0 +1,222 @@
+# app/core/metrics.py
+"""
+Minimal in-process metrics with Prometheus text exposition.
+
+Recording is a dict lookup plus a few additions under a lock, cheap enough to
+leave on in production. Each worker process keeps its own numbers; Prometheus
+scrapes and aggregates them per instance.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_registry_lock = threading.Lock()
+_registry = []
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+
+
+def _format_labels(names: Sequence[str], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], float] = {}
+        with _registry_lock:
+            _registry.append(self)
+
+    def inc(self, *labelvalues, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value}")
+        return "\n".join(lines)
+
+
+class Gauge(Counter):
+    def set(self, *labelvalues, value: float) -> None:
+        with self._lock:
+            self._values[labelvalues] = value
+
+    def render(self) -> str:
+        return super().render().replace(f"# TYPE {self.name} counter", f"# TYPE {self.name} gauge")
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        # labels -> [bucket counts..., sum, count]
+        self._values: Dict[Tuple[str, ...], list] = {}
+        with _registry_lock:
+            _registry.append(self)
+
+    def observe(self, value: float, *labelvalues) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(labelvalues)
+            if series is None:
+                series = self._values[labelvalues] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, *labelvalues):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labelvalues)
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((labels, list(series)) for labels, series in self._values.items())
+        for labels, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                bucket_labels = _format_labels(self.labelnames, labels, 'le="%s"' % bound)
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            inf_labels = _format_labels(self.labelnames, labels, 'le="+Inf"')
+            plain_labels = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_bucket{inf_labels} {series[-1]}")
+            lines.append(f"{self.name}_sum{plain_labels} {series[-2]}")
+            lines.append(f"{self.name}_count{plain_labels} {series[-1]}")
+        return "\n".join(lines)
+
+
+def render_prometheus() -> str:
+    with _registry_lock:
+        metrics = list(_registry)
+    return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+# ====================================================================
+# APPLICATION METRICS
+# ====================================================================
+
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP requests by route and status code.", ["method", "route", "status"])
+HTTP_LATENCY = Histogram("http_request_duration_seconds", "HTTP request latency by route.", ["method", "route"])
+DB_QUERIES_PER_REQUEST = Histogram("http_request_db_queries", "Database queries issued per HTTP request.", ["method", "route"], buckets=COUNT_BUCKETS)
+DB_TIME_PER_REQUEST = Histogram("http_request_db_seconds", "Time spent in database queries per HTTP request.", ["method", "route"])
+DB_QUERY_LATENCY = Histogram("db_query_duration_seconds", "Latency of individual database queries.")
+AI_CALLS = Counter("ai_calls_total", "Gemini API calls by operation and outcome.", ["operation", "outcome"])
+AI_LATENCY = Histogram("ai_call_duration_seconds", "Gemini API call latency by operation.", ["operation"])
+PARSER_LATENCY = Histogram("resume_parse_duration_seconds", "Resume/JD text extraction time by file type.", ["file_type"])
+AI_QUOTA_REQUESTS = Counter("ai_quota_requests_total", "AI route requests by quota outcome (admitted, rejected_user, rejected_route, rejected_queue_full, queue_timeout).", ["route", "outcome"])
+AI_QUOTA_USAGE = Gauge("ai_quota_route_usage_ratio", "Share of the route-wide AI quota used in the current window.", ["route"])
+AI_QUEUE_DEPTH = Gauge("ai_queue_waiting", "Requests waiting for an AI call slot.")
+AI_QUEUE_WAIT = Histogram("ai_queue_wait_seconds", "Time spent waiting for an AI call slot.", ["route"])
+CACHE_REQUESTS = Counter("cache_requests_total", "Cache lookups by namespace and result (hit/miss).", ["namespace", "result"])
+PIPELINE_WATCHERS = Gauge("pipeline_event_watchers", "Open pipeline event streams in this process.")
+PIPELINE_EVENTS = Counter("pipeline_events_total", "Pipeline events by outcome (delivered, overflow, rejected watcher).", ["outcome"])
+
+
+# ====================================================================
+# PER-REQUEST DATABASE ACCOUNTING
+# ====================================================================
+
+class RequestStats:
+    """Mutable per-request counters, shared with the worker threads serving the request."""
+    __slots__ = ("db_queries", "db_seconds", "profile")
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.profile = None # app.core.profiling.RequestProfile while the request is profiled
+
+
+current_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("current_request_stats", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started_stack = conn.info.get("query_started_at")
+    if not started_stack:
+        return
+    elapsed = time.perf_counter() - started_stack.pop()
+    DB_QUERY_LATENCY.observe(elapsed)
+    stats = current_request_stats.get()
+    if stats is not None:
+        stats.db_queries += 1
+        stats.db_seconds += elapsed
+        if stats.profile is not None:
+            stats.profile.add_phase("db", elapsed)
+
+
+def record_phase(phase: str, seconds: float) -> None:
+    """
+    Adds time to the current request's profile, if it is being profiled.
+    """
+    stats = current_request_stats.get()
+    if stats is not None and stats.profile is not None:
+        stats.profile.add_phase(phase, seconds)
+
+
+@contextmanager
+def phase(name: str):
+    """
+    Times the block as one phase (parse, serialize, ...) of a profiled request; free otherwise.
+    """
+    stats = current_request_stats.get()
+    if stats is None or stats.profile is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.profile.add_phase(name, time.perf_counter() - started)
+
+
+@contextmanager
+def ai_call(operation: str):
+    """
+    Times one Gemini call and counts it as ok/error.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        AI_CALLS.inc(operation, "error")
+        raise
+    else:
+        AI_CALLS.inc(operation, "ok")
+    finally:
+        elapsed = time.perf_counter() - started
+        AI_LATENCY.observe(elapsed, operation)
+        record_phase("ai", elapsed)
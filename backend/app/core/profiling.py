@@ -0,0 +1,250 @@
+# app/core/profiling.py
+"""
+On-demand sampling profiler for single requests.
+
+A request is profiled when an admin sends `X-Profile: 1`, or at random with
+probability PROFILING_SAMPLE_RATE. Unprofiled requests pay one attribute check
+in the DB/AI/parse/serialize hooks, nothing more.
+
+While a profiled request runs, a sampler thread snapshots the stacks of the
+threads working on it every PROFILING_INTERVAL_MS. Those are the event loop
+thread plus every worker thread that runs a DB query, AI call, parse or
+serialization for it (the hooks register the thread), so other threadpool
+threads are left out. The result is stored under PROFILING_OUTPUT_DIR as JSON
+with the time breakdown and the stacks in collapsed ("folded") format, which
+speedscope and flamegraph.pl read directly.
+"""
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from app.core import config, metrics
+
+logger = logging.getLogger(__name__)
+
+PHASES = ("db", "ai", "parse", "serialize")
+_MAX_STACK_DEPTH = 128
+
+
+class RequestProfile:
+    def __init__(self, method: str, path: str):
+        self.profile_id = uuid.uuid4().hex
+        self.method = method
+        self.path = path
+        self.started_at = datetime.now(timezone.utc)
+        self.threads = {threading.get_ident()}
+        self.stacks: Counter = Counter()
+        self.sample_count = 0
+        self.phase_seconds: Dict[str, float] = {phase: 0.0 for phase in PHASES}
+        self.phase_counts: Dict[str, int] = {phase: 0 for phase in PHASES}
+
+    def add_phase(self, phase: str, seconds: float) -> None:
+        # Called on worker threads; the thread is now known to work for this request.
+        self.threads.add(threading.get_ident())
+        self.phase_seconds[phase] += seconds
+        self.phase_counts[phase] += 1
+
+    def breakdown(self, total_seconds: float) -> Dict[str, float]:
+        breakdown = {phase: round(seconds, 6) for phase, seconds in self.phase_seconds.items()}
+        # Endpoint code, framework overhead and anything not instrumented.
+        breakdown["other"] = round(max(0.0, total_seconds - sum(self.phase_seconds.values())), 6)
+        return breakdown
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    marker = "site-packages" + os.sep
+    if marker in filename:
+        filename = filename.split(marker, 1)[1]
+    else:
+        filename = os.path.relpath(filename) if filename.startswith(os.getcwd()) else os.path.basename(filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+def _is_idle(frame) -> bool:
+    """
+    A registered thread that is not working right now: a threadpool worker
+    waiting for its next job, or the event loop waiting in select().
+    """
+    code = frame.f_code
+    if code.co_name == "select" and code.co_filename.endswith("selectors.py"):
+        return True
+    parent = frame.f_back
+    return (
+        code.co_name == "wait" and code.co_filename.endswith("threading.py")
+        and parent is not None and parent.f_code.co_name == "get" and parent.f_code.co_filename.endswith("queue.py")
+    )
+
+
+def _collapse(frame) -> str:
+    labels = []
+    while frame is not None and len(labels) < _MAX_STACK_DEPTH:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class Sampler:
+    """
+    One daemon thread shared by all profiled requests; it only runs while at
+    least one profile is active.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._active: List[RequestProfile] = []
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, profile: RequestProfile) -> None:
+        with self._lock:
+            self._active.append(profile)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+
+    def remove(self, profile: RequestProfile) -> None:
+        with self._lock:
+            if profile in self._active:
+                self._active.remove(profile)
+
+    def _run(self) -> None:
+        interval = config.PROFILING_INTERVAL_MS / 1000
+        own_thread = threading.get_ident()
+        while True:
+            with self._lock:
+                active = list(self._active)
+            if not active:
+                self._wakeup.clear()
+                # Idle: park until the next profiled request instead of polling.
+                if not self._wakeup.wait(timeout=60):
+                    with self._lock:
+                        if not self._active:
+                            self._thread = None
+                            return
+                continue
+            frames = sys._current_frames()
+            for profile in active:
+                for thread_id in list(profile.threads):
+                    frame = frames.get(thread_id)
+                    if frame is not None and thread_id != own_thread and not _is_idle(frame):
+                        profile.stacks[_collapse(frame)] += 1
+                profile.sample_count += 1
+            time.sleep(interval)
+
+
+sampler = Sampler()
+
+
+def should_profile(header_value: Optional[str]) -> bool:
+    """
+    Cheap pre-check: True when the header asks for a profile (the caller must
+    still confirm the user is an admin) or the random sample picks this request.
+    """
+    if header_value and header_value.lower() in ("1", "true", "yes"):
+        return True
+    return config.PROFILING_SAMPLE_RATE > 0 and random.random() < config.PROFILING_SAMPLE_RATE
+
+
+@contextmanager
+def profile_request(method: str, path: str):
+    """
+    Profiles the enclosed request handling and yields the RequestProfile.
+    """
+    profile = RequestProfile(method, path)
+    stats = metrics.current_request_stats.get()
+    if stats is not None:
+        stats.profile = profile
+    sampler.add(profile)
+    try:
+        yield profile
+    finally:
+        sampler.remove(profile)
+        if stats is not None:
+            stats.profile = None
+
+
+def server_timing(profile: RequestProfile, total_seconds: float) -> str:
+    """
+    Server-Timing header value, shown per phase in the browser's network panel.
+    """
+    parts = [f"{phase};dur={seconds * 1000:.1f}" for phase, seconds in profile.breakdown(total_seconds).items()]
+    parts.append(f"total;dur={total_seconds * 1000:.1f}")
+    return ", ".join(parts)
+
+
+def save(profile: RequestProfile, route: str, status_code: int, total_seconds: float) -> None:
+    """
+    Writes the profile to PROFILING_OUTPUT_DIR and prunes the oldest beyond PROFILING_MAX_FILES.
+    """
+    os.makedirs(config.PROFILING_OUTPUT_DIR, exist_ok=True)
+    document = {
+        "id": profile.profile_id,
+        "method": profile.method,
+        "path": profile.path,
+        "route": route,
+        "status_code": status_code,
+        "started_at": profile.started_at.isoformat(),
+        "duration_seconds": round(total_seconds, 6),
+        "breakdown_seconds": profile.breakdown(total_seconds),
+        "phase_calls": dict(profile.phase_counts),
+        "interval_ms": config.PROFILING_INTERVAL_MS,
+        "samples": profile.sample_count,
+        "collapsed": "\n".join(f"{stack} {count}" for stack, count in profile.stacks.most_common()),
+    }
+    path = os.path.join(config.PROFILING_OUTPUT_DIR, f"{profile.profile_id}.json")
+    with open(path, "w") as output:
+        json.dump(document, output)
+
+    files = sorted(
+        (entry for entry in os.scandir(config.PROFILING_OUTPUT_DIR) if entry.name.endswith(".json")),
+        key=lambda entry: entry.stat().st_mtime
+    )
+    for entry in files[:max(0, len(files) - config.PROFILING_MAX_FILES)]:
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass
+    logger.info("Saved profile %s for %s %s (%.3fs)", profile.profile_id, profile.method, route, total_seconds)
+
+
+def list_profiles() -> List[dict]:
+    """
+    Summaries of the stored profiles, newest first.
+    """
+    if not os.path.isdir(config.PROFILING_OUTPUT_DIR):
+        return []
+    summaries = []
+    for entry in os.scandir(config.PROFILING_OUTPUT_DIR):
+        if not entry.name.endswith(".json"):
+            continue
+        try:
+            with open(entry.path) as source:
+                document = json.load(source)
+        except (OSError, ValueError):
+            continue
+        document.pop("collapsed", None)
+        summaries.append(document)
+    return sorted(summaries, key=lambda document: document["started_at"], reverse=True)
+
+
+def load_profile(profile_id: str) -> Optional[dict]:
+    # Profile ids are uuid4 hex; anything else could be a path traversal attempt.
+    if len(profile_id) != 32 or not all(char in "0123456789abcdef" for char in profile_id):
+        return None
+    path = os.path.join(config.PROFILING_OUTPUT_DIR, f"{profile_id}.json")
+    try:
+        with open(path) as source:
+            return json.load(source)
+    except (OSError, ValueError):
+        return None
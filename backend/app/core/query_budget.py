@@ -0,0 +1,108 @@
+# app/core/query_budget.py
+"""
+Query-count budgets, to catch N+1 query regressions early.
+
+Every request's database queries are already counted by app.core.metrics.
+With QUERY_BUDGET_MODE=warn (the default when APP_ENV=development) a request
+that goes over its route's budget is logged, and its response carries the count
+in X-DB-Query-Count. The budgets are enforced by tests/test_query_budgets.py,
+which calls every route below and fails when one goes over. They are not
+enforced at request time: the check runs after the route has returned, when its
+writes are already committed, so failing the request then would only hide a
+change that was made. For checking a block of code directly, count_queries()
+attaches its own listener.
+"""
+import logging
+from contextlib import contextmanager
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core import config
+
+logger = logging.getLogger(__name__)
+
+# Maximum queries per request, by (method, route template). The current user
+# lookup done by the auth dependency counts as one query, and so does the
+# version lookup of routes with ETags (conditional_get).
+QUERY_BUDGETS = {
+    ("GET", "/jobs/"): 5,                          # user, versions, jobs, skills (selectin), stages (selectin)
+    ("GET", "/jobs/{job_id}"): 5,
+    ("GET", "/jobs/{job_id}/applications"): 4,     # user, job, applications, job skills when sorting by coverage
+    ("GET", "/jobs/{job_id}/applications/events"): 2, # user, job; events need no queries
+    ("GET", "/jobs/{job_id}/matches"): 2,
+    ("GET", "/jobs/{job_id}/skill-matches"): 4,
+    ("POST", "/jobs/"): 13,                        # user, skills, new skills, job, skill links, stages, 2 version bumps,
+                                                   # its rediscovery run (2), reload of job, skills, stages
+    ("GET", "/skills/"): 3,
+    ("POST", "/skills/"): 5,                       # user, name check, insert, version bump, reload
+    ("GET", "/portfolios/"): 4,                    # user, versions, portfolios, departments (selectin)
+    ("GET", "/portfolios/{portfolio_id}"): 4,
+    ("GET", "/departments/"): 3,
+    ("GET", "/reports/dashboard-stats"): 5,
+    ("GET", "/candidates/search"): 2,
+    ("GET", "/candidates/{candidate_id}/matches"): 2,
+    ("GET", "/candidates/{candidate_id}/duplicates"): 4, # user, candidate, block sizes, block members
+    ("GET", "/jobs/{job_id}/rediscovery"): 4,      # user, job, latest run, matches
+    ("GET", "/jobs/{job_id}/rediscovery/status"): 2,
+    ("GET", "/candidates/application/{application_id}/insights"): 4, # user, application with inputs and stored insights; re-read and upsert when generating
+    ("POST", "/candidates/apply/{job_id}"): 20,    # incl. the duplicate check of a new email
+    ("POST", "/candidates/{candidate_id}/merge/{duplicate_id}"): 30, # several statements per table the merge moves rows in
+    ("PATCH", "/candidates/application/{application_id}/stage"): 8,
+    ("POST", "/users/login/request-otp"): 4,
+    ("POST", "/users/login/verify-otp"): 3,
+}
+
+# Routes not listed above.
+DEFAULT_QUERY_BUDGET = 20
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def budget_for(method: str, route: str) -> int:
+    return QUERY_BUDGETS.get((method, route), DEFAULT_QUERY_BUDGET)
+
+
+def check_request_budget(method: str, route: str, query_count: int) -> None:
+    """
+    Logs a finished request that went over its budget (QUERY_BUDGET_MODE=warn).
+    """
+    if config.QUERY_BUDGET_MODE == "off":
+        return
+    budget = budget_for(method, route)
+    if query_count > budget:
+        logger.warning("Query budget exceeded: %s %s issued %d queries (budget %d)", method, route, query_count, budget)
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+        self.statements = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+        self.statements.append(statement)
+
+
+@contextmanager
+def count_queries(target=Engine, budget: Optional[int] = None):
+    """
+    Counts the queries executed inside the block, on one engine or (by default) all of them.
+
+        with count_queries(budget=4) as counter:
+            client.get("/jobs/")
+
+    Raises QueryBudgetExceeded on leaving the block if the budget was exceeded.
+    """
+    counter = QueryCounter()
+    event.listen(target, "before_cursor_execute", counter)
+    try:
+        yield counter
+    finally:
+        event.remove(target, "before_cursor_execute", counter)
+    if budget is not None and counter.count > budget:
+        statements = "\n".join(counter.statements)
+        raise QueryBudgetExceeded(f"{counter.count} queries executed (budget {budget}):\n{statements}")
@@ -17,6 +17,14 @@ from app.database.models.candidate import Candidate, JobApplication # Depends on
 # (skill.py se CandidateSkill ko alag se import karne ki zaroorat nahi,
 # kyunki Skill model import hone par woh bhi register ho jaata hai)
 from app.database.models.skill import CandidateSkill, JobRequiredSkill
+from app.database.models.match import JobCandidateMatch
+from app.database.models.email_outbox import EmailOutbox
+from app.database.models.notification_event import StageNotificationEvent # Depends on ApplicationStageLog
+from app.database.models.table_version import TableVersion
+from app.database.models.idempotency_key import IdempotencyKey # Depends on User
+from app.database.models.rediscovery import RediscoveryRun, RediscoveryMatch # Depends on Job, Candidate
+from app.database.models.candidate_dedup import CandidateBlockingKey, CandidateMerge # Depends on Candidate
+from app.database.models.application_insight import ApplicationInsight # Depends on JobApplication
 
 from app.database.models.workflow_feedback import (
     FeedbackTemplate,
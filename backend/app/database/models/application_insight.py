@@ -0,0 +1,20 @@
+# backend/app/database/models/application_insight.py
+
+from sqlalchemy import Column, Integer, String, TIMESTAMP, ForeignKey, JSON, text
+from app.database.base import Base
+
+class ApplicationInsight(Base):
+    """
+    The AI insights of a job application (GET /candidates/application/{id}/insights),
+    with the inputs they were generated from. They are served as stored until
+    one of the inputs changes: the resume summary, the job description, the
+    prompt version or the model (see insights_service).
+    """
+    __tablename__ = "ApplicationInsights"
+    ApplicationID = Column(Integer, ForeignKey("JobApplications.ApplicationID", ondelete="CASCADE"), primary_key=True)
+    Insights = Column(JSON, nullable=False) # summary, strengths, weaknesses, interview_questions
+    SummaryHash = Column(String(64), nullable=False) # sha256 of the candidate's ResumeSummary
+    DescriptionHash = Column(String(64), nullable=False) # sha256 of the job description
+    PromptVersion = Column(String(20), nullable=False)
+    Model = Column(String(100), nullable=False)
+    GeneratedAt = Column(TIMESTAMP, server_default=text('now()'))
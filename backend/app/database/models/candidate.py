@@ -1,8 +1,17 @@
 # backend/app/database/models/candidate.py
 
-from sqlalchemy import Column, Integer, String, TIMESTAMP, Text, ForeignKey, NUMERIC, text, JSON
+from sqlalchemy import Column, Integer, String, TIMESTAMP, Text, ForeignKey, NUMERIC, text, JSON, Computed, Index, UniqueConstraint
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from app.database.base import Base
 
+# Weighted full-text document for candidate search: name matches rank highest,
+# then the skills summary, then the resume summary.
+CANDIDATE_SEARCH_DOCUMENT = (
+    "setweight(to_tsvector('english', coalesce(\"FullName\", '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(\"TechnicalSkillsSummary\", '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(\"ResumeSummary\", '')), 'C')"
+)
+
 class Candidate(Base):
     __tablename__ = "Candidates"
     CandidateID = Column(Integer, primary_key=True, index=True)
@@ -21,6 +30,13 @@ class Candidate(Base):
     UpdatedAt = Column(TIMESTAMP)
     UpdatedBy = Column(Integer, ForeignKey("Users.UserID"))
 
+    # Stored generated column, so PostgreSQL keeps it in sync on every insert/update.
+    SearchVector = Column(TSVECTOR, Computed(CANDIDATE_SEARCH_DOCUMENT, persisted=True))
+
+    __table_args__ = (
+        Index("ix_Candidates_SearchVector", "SearchVector", postgresql_using="gin"),
+    )
+
 # CandidateSkill model yahan se hata diya gaya hai kyunki woh ab skill.py mein hai.
 
 class JobApplication(Base):
@@ -35,4 +51,9 @@ class JobApplication(Base):
     AppliedAt = Column(TIMESTAMP, server_default=text('now()'))
     CreatedBy = Column(Integer, ForeignKey("Users.UserID"))
     UpdatedAt = Column(TIMESTAMP)
-    UpdatedBy = Column(Integer, ForeignKey("Users.UserID"))
\ No newline at end of file
+    UpdatedBy = Column(Integer, ForeignKey("Users.UserID"))
+
+    __table_args__ = (
+        # One application per candidate and job; re-applying updates it.
+        UniqueConstraint("CandidateID", "JobID", name="uq_JobApplications_CandidateID_JobID"),
+    )
\ No newline at end of file
@@ -0,0 +1,38 @@
+# backend/app/database/models/candidate_dedup.py
+
+from sqlalchemy import Column, Integer, String, TIMESTAMP, ForeignKey, NUMERIC, Index, text
+from app.database.base import Base
+
+class CandidateBlockingKey(Base):
+    """
+    Blocking keys for duplicate detection (see candidate_dedup_service). Only
+    candidates that share a key are compared with each other, so finding the
+    duplicates of one candidate reads a few small blocks, not the whole pool.
+    """
+    __tablename__ = "CandidateBlockingKeys"
+    Key = Column(String(255), primary_key=True) # e.g. "email:jdoe", "phone:9876543210", "name:doe john"
+    CandidateID = Column(Integer, ForeignKey("Candidates.CandidateID", ondelete="CASCADE"), primary_key=True)
+
+    __table_args__ = (
+        Index("ix_CandidateBlockingKeys_CandidateID", "CandidateID"),
+    )
+
+class CandidateMerge(Base):
+    """
+    Audit trail of merged duplicates, and the other identities a candidate is
+    known by: a resume that arrives with one of these emails is attached to the
+    surviving candidate. MergedCandidateID is empty when the duplicate was caught
+    at ingest, before a second candidate was ever created.
+    """
+    __tablename__ = "CandidateMerges"
+    MergeID = Column(Integer, primary_key=True, index=True)
+    SurvivorCandidateID = Column(Integer, ForeignKey("Candidates.CandidateID", ondelete="CASCADE"), nullable=False, index=True)
+    MergedCandidateID = Column(Integer) # No foreign key: that candidate row is deleted by the merge
+    FullName = Column(String(255))
+    Email = Column(String(255), index=True)
+    Phone = Column(String(50))
+    Source = Column(String(20), nullable=False) # ingest, sweep, manual
+    Reason = Column(String(50)) # Rule that matched, e.g. same_email, phone_and_name
+    Similarity = Column(NUMERIC) # Name similarity, 0-1
+    MergedAt = Column(TIMESTAMP, server_default=text('now()'))
+    MergedBy = Column(Integer, ForeignKey("Users.UserID"))
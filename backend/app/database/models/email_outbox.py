@@ -0,0 +1,26 @@
+# backend/app/database/models/email_outbox.py
+
+from sqlalchemy import Column, Integer, String, TIMESTAMP, Text, Index, text
+from app.database.base import Base
+
+class EmailOutbox(Base):
+    """
+    Emails waiting to be (or already) delivered by the background outbox sender.
+    """
+    __tablename__ = "EmailOutbox"
+    OutboxID = Column(Integer, primary_key=True, index=True)
+    Kind = Column(String(50), nullable=False) # e.g. "otp", "welcome", "role_update"
+    Priority = Column(Integer, nullable=False, server_default="10") # Lower is sent first; OTPs use 0
+    Recipient = Column(String(255), nullable=False)
+    Subject = Column(String(255), nullable=False)
+    HtmlBody = Column(Text, nullable=False)
+    Status = Column(String(20), nullable=False, server_default="Pending") # Pending, Sent, Failed
+    Attempts = Column(Integer, nullable=False, server_default="0")
+    LastError = Column(Text)
+    NextAttemptAt = Column(TIMESTAMP, server_default=text('now()'))
+    CreatedAt = Column(TIMESTAMP, server_default=text('now()'))
+    SentAt = Column(TIMESTAMP)
+
+    __table_args__ = (
+        Index("ix_EmailOutbox_Status_NextAttemptAt", "Status", "NextAttemptAt"),
+    )
@@ -0,0 +1,25 @@
+# backend/app/database/models/idempotency_key.py
+
+from sqlalchemy import Column, Integer, String, TIMESTAMP, JSON, ForeignKey, Index, text
+from app.database.base import Base
+
+class IdempotencyKey(Base):
+    """
+    Outcome of a request sent with an Idempotency-Key header, so a retry of it
+    gets the stored response instead of running again (see idempotency_service).
+    """
+    __tablename__ = "IdempotencyKeys"
+    UserID = Column(Integer, ForeignKey("Users.UserID"), primary_key=True)
+    Key = Column(String(255), primary_key=True)
+    Scope = Column(String(100), nullable=False) # e.g. "apply"
+    RequestHash = Column(String(64), nullable=False) # SHA-256 of the request, to catch a key reused for another request
+    Status = Column(String(20), nullable=False, server_default="InProgress") # InProgress, Completed
+    ResponseStatus = Column(Integer)
+    ResponseBody = Column(JSON)
+    CreatedAt = Column(TIMESTAMP, server_default=text('now()'))
+    UpdatedAt = Column(TIMESTAMP, server_default=text('now()'))
+    ExpiresAt = Column(TIMESTAMP, nullable=False)
+
+    __table_args__ = (
+        Index("ix_IdempotencyKeys_ExpiresAt", "ExpiresAt"),
+    )
@@ -0,0 +1,24 @@
+# backend/app/database/models/match.py
+
+from sqlalchemy import Column, Integer, TIMESTAMP, ForeignKey, NUMERIC, Index
+from app.database.base import Base
+
+class JobCandidateMatch(Base):
+    """
+    Persisted job x candidate match matrix of required-skill coverage. Rows are only
+    rewritten for the job or candidate whose skills changed, so "top matches for a job" and "best jobs for a candidate"
+    are plain indexed lookups.
+    """
+    __tablename__ = "JobCandidateMatches"
+    JobID = Column(Integer, ForeignKey("JobPostings.JobID", ondelete="CASCADE"), primary_key=True)
+    CandidateID = Column(Integer, ForeignKey("Candidates.CandidateID", ondelete="CASCADE"), primary_key=True)
+    Score = Column(NUMERIC, nullable=False) # 0-100, share of the job's required skills the candidate has
+    MatchedSkills = Column(Integer, nullable=False)
+    RequiredSkills = Column(Integer, nullable=False)
+    ScoreVersion = Column(Integer, nullable=False) # Scoring algorithm version that produced this row
+    ScoredAt = Column(TIMESTAMP, nullable=False)
+
+    __table_args__ = (
+        Index("ix_JobCandidateMatches_Job_Score", "JobID", "Score"),
+        Index("ix_JobCandidateMatches_Candidate_Score", "CandidateID", "Score"),
+    )
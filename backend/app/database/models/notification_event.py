@@ -0,0 +1,24 @@
+# backend/app/database/models/notification_event.py
+
+from sqlalchemy import Column, Integer, String, TIMESTAMP, ForeignKey, Index, text
+from app.database.base import Base
+
+class StageNotificationEvent(Base):
+    """
+    One pipeline change (stage transition or interviewer assignment) waiting to be
+    included in a recipient's digest email. Rows are fanned out per recipient from
+    ApplicationStageLog when the log is written.
+    """
+    __tablename__ = "StageNotificationEvents"
+    EventID = Column(Integer, primary_key=True, index=True)
+    RecipientUserID = Column(Integer, ForeignKey("Users.UserID"), nullable=False)
+    LogID = Column(Integer, ForeignKey("ApplicationStageLog.LogID"), nullable=False)
+    ApplicationID = Column(Integer, ForeignKey("JobApplications.ApplicationID"), nullable=False)
+    EventType = Column(String(50), nullable=False) # "stage_change" or "assignment"
+    Summary = Column(String(500), nullable=False)
+    CreatedAt = Column(TIMESTAMP, server_default=text('now()'))
+    DigestedAt = Column(TIMESTAMP)
+
+    __table_args__ = (
+        Index("ix_StageNotificationEvents_Pending", "DigestedAt", "RecipientUserID", "CreatedAt"),
+    )
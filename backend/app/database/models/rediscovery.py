@@ -0,0 +1,59 @@
+# backend/app/database/models/rediscovery.py
+
+from sqlalchemy import Column, Integer, String, TIMESTAMP, Text, ForeignKey, NUMERIC, Index, Boolean, text
+from app.database.base import Base
+
+class RediscoveryRun(Base):
+    """
+    One talent rediscovery pass of a job over the candidate pool. Runs are queued
+    when a job is created and on request (POST /jobs/{job_id}/rediscovery), and
+    worked off in the background by the rediscovery worker (see
+    talent_rediscovery_service).
+    """
+    __tablename__ = "RediscoveryRuns"
+    RunID = Column(Integer, primary_key=True, index=True)
+    JobID = Column(Integer, ForeignKey("JobPostings.JobID", ondelete="CASCADE"), nullable=False)
+    Status = Column(String(20), nullable=False, server_default="Queued") # Queued, Running, Completed, Failed, Superseded
+    Trigger = Column(String(50), nullable=False) # job_created, manual
+    FullRescore = Column(Boolean, nullable=False, server_default="false") # Ignore stored scores and score everyone again
+    CandidatesTotal = Column(Integer) # Candidates this run has to score
+    CandidatesReused = Column(Integer, nullable=False, server_default="0") # Eligible candidates whose stored score is still current
+    CandidatesProcessed = Column(Integer, nullable=False, server_default="0")
+    MatchesFound = Column(Integer, nullable=False, server_default="0")
+    Error = Column(Text)
+    CreatedAt = Column(TIMESTAMP, server_default=text('now()'))
+    StartedAt = Column(TIMESTAMP)
+    HeartbeatAt = Column(TIMESTAMP) # Advanced after every batch; a stale Running run is requeued
+    FinishedAt = Column(TIMESTAMP)
+
+    __table_args__ = (
+        Index("ix_RediscoveryRuns_Status_RunID", "Status", "RunID"),
+        Index("ix_RediscoveryRuns_JobID_RunID", "JobID", "RunID"),
+    )
+
+class RediscoveryMatch(Base):
+    """
+    AI score of one candidate against one job, from the latest rediscovery run
+    that scored the pair. Every scored candidate is kept, not only the matches,
+    so the threshold can be applied when reading.
+
+    The inputs of the score are recorded with it. A later run rescores the pair
+    only if one of them changed: the prompt version, the model, the job
+    description, or the candidate (UpdatedAt moved past CandidateUpdatedAt).
+    """
+    __tablename__ = "RediscoveryMatches"
+    JobID = Column(Integer, ForeignKey("JobPostings.JobID", ondelete="CASCADE"), primary_key=True)
+    CandidateID = Column(Integer, ForeignKey("Candidates.CandidateID", ondelete="CASCADE"), primary_key=True)
+    RunID = Column(Integer, ForeignKey("RediscoveryRuns.RunID"), nullable=False)
+    MatchScore = Column(NUMERIC, nullable=False)
+    MatchSummary = Column(Text)
+    SkillCoverage = Column(NUMERIC) # Share of the job's required skills, from the skill index
+    PromptVersion = Column(String(20))
+    Model = Column(String(100))
+    DescriptionHash = Column(String(64)) # sha256 of the job description that was scored against
+    CandidateUpdatedAt = Column(TIMESTAMP) # The candidate's UpdatedAt (or CreatedAt) when it was scored
+    ScoredAt = Column(TIMESTAMP, nullable=False)
+
+    __table_args__ = (
+        Index("ix_RediscoveryMatches_Job_Score", "JobID", "MatchScore"),
+    )
@@ -0,0 +1,15 @@
+# backend/app/database/models/table_version.py
+
+from sqlalchemy import Column, BigInteger, String, TIMESTAMP, text
+from app.database.base import Base
+
+class TableVersion(Base):
+    """
+    Change counter per table, bumped in the same transaction as every write to a
+    tracked table (see table_version_service). ETags of reference-data endpoints
+    are built from these counters.
+    """
+    __tablename__ = "TableVersions"
+    TableName = Column(String(100), primary_key=True)
+    Version = Column(BigInteger, nullable=False, default=0)
+    UpdatedAt = Column(TIMESTAMP, server_default=text('now()'))
@@ -1,7 +1,16 @@
 # app/database/session.py
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-from app.core.config import DATABASE_URL
+from app.core.config import DATABASE_URL, DATABASE_REPLICA_URL
 
 engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
\ No newline at end of file
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# --- Read replica ---
+# Heavy read-only endpoints use ReadSessionLocal. Without a replica configured
+# it is bound to the primary engine, so behaviour is unchanged.
+if DATABASE_REPLICA_URL:
+    replica_engine = create_engine(DATABASE_REPLICA_URL)
+else:
+    replica_engine = engine
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
\ No newline at end of file
@@ -1,8 +1,29 @@
 # backend/app/main.py
 
-from fastapi import FastAPI
+import logging
+import threading
+import time
+import uuid
+
+from fastapi import FastAPI, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.core import config, metrics, profiling, query_budget
+from app.core.compression import CompressionMiddleware
+from app.core.logging_config import configure_logging, request_id_var, shutdown_logging
+from app.api.dependencies import PIN_PRIMARY_COOKIE, IdempotentReplay, is_admin_request, reference_data_cache_control
+from app.database.session import SessionLocal
+from app.services.skill_index_service import skill_index, skill_index_refresher
+from app.services.email_service import outbox_sender
+from app.services import gemini_service, notification_service, resume_parser_service
+from app.services.digest_service import digest_worker
+from app.services.talent_rediscovery_service import rediscovery_worker
+from app.services.pipeline_events_service import pipeline_listener
+
+logger = logging.getLogger(__name__)
+
 # Import all your API routers
 from app.api import (
     users, 
@@ -11,9 +32,13 @@ from app.api import (
     departments, 
     portfolios, 
     skills,
-    reports 
+    reports,
+    notifications,
+    diagnostics
 )
 
+configure_logging()
+
 app = FastAPI(
     title="Staffing Tool API",
     description="API for an AI-powered staffing and recruitment tool.",
@@ -36,10 +61,200 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# gzip/brotli for large responses, negotiated per request.
+app.add_middleware(CompressionMiddleware, minimum_size=config.COMPRESSION_MIN_BYTES)
+
+# A retried request whose original already succeeded gets the stored response.
+@app.exception_handler(IdempotentReplay)
+async def replay_idempotent_response(request: Request, exc: IdempotentReplay):
+    return JSONResponse(status_code=exc.status_code, content=exc.body, headers={"Idempotent-Replayed": "true"})
+
+# On-demand profiling (see app.core.profiling). Declared before the metrics
+# middleware so it runs inside it, where the per-request stats already exist.
+@app.middleware("http")
+async def profile_request(request: Request, call_next):
+    header = request.headers.get("X-Profile")
+    if not profiling.should_profile(header):
+        return await call_next(request)
+    if header and not await run_in_threadpool(is_admin_request, request):
+        return await call_next(request)
+
+    with profiling.profile_request(request.method, request.url.path) as profile:
+        started = time.perf_counter()
+        response = await call_next(request)
+        elapsed = time.perf_counter() - started
+    route = request.scope.get("route")
+    route_label = route.path if route is not None else "unmatched"
+    await run_in_threadpool(profiling.save, profile, route_label, response.status_code, elapsed)
+    response.headers["X-Profile-ID"] = profile.profile_id
+    response.headers["Server-Timing"] = profiling.server_timing(profile, elapsed)
+    return response
+
+# Per-route latency, status codes and DB usage for the /metrics endpoint.
+# The route *template* (e.g. /jobs/{job_id}) is used as the label so the
+# number of series stays bounded.
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    stats = metrics.RequestStats()
+    token = metrics.current_request_stats.set(stats)
+    started = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+    finally:
+        elapsed = time.perf_counter() - started
+        metrics.current_request_stats.reset(token)
+        route = request.scope.get("route")
+        route_label = route.path if route is not None else "unmatched"
+        metrics.HTTP_REQUESTS.inc(request.method, route_label, str(status_code))
+        metrics.HTTP_LATENCY.observe(elapsed, request.method, route_label)
+        metrics.DB_QUERIES_PER_REQUEST.observe(stats.db_queries, request.method, route_label)
+        metrics.DB_TIME_PER_REQUEST.observe(stats.db_seconds, request.method, route_label)
+
+    # N+1 guard: warns when a route goes over its query budget (enforced in tests/test_query_budgets.py).
+    query_budget.check_request_budget(request.method, route_label, stats.db_queries)
+    if config.QUERY_BUDGET_MODE != "off":
+        response.headers["X-DB-Query-Count"] = str(stats.db_queries)
+    return response
+
+# Correlation id for log lines: taken from the caller's X-Request-ID header when
+# present (e.g. set by a load balancer), generated otherwise, and echoed back.
+@app.middleware("http")
+async def assign_request_id(request: Request, call_next):
+    request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+    token = request_id_var.set(request_id)
+    try:
+        response = await call_next(request)
+    finally:
+        request_id_var.reset(token)
+    response.headers["X-Request-ID"] = request_id
+    return response
+
+# ETags computed by the conditional_get dependency go on successful responses.
+@app.middleware("http")
+async def attach_etag(request: Request, call_next):
+    response = await call_next(request)
+    etag = getattr(request.state, "etag", None)
+    if etag and response.status_code == 200:
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = reference_data_cache_control()
+    return response
+
+# Read-your-writes for the read replica: after a successful write the client is
+# pinned to the primary for a few seconds (see get_read_db in dependencies.py).
+@app.middleware("http")
+async def pin_writers_to_primary(request: Request, call_next):
+    response = await call_next(request)
+    if (
+        config.DATABASE_REPLICA_URL
+        and request.method not in ("GET", "HEAD", "OPTIONS")
+        and response.status_code < 400
+    ):
+        response.set_cookie(
+            PIN_PRIMARY_COOKIE, "1",
+            max_age=config.REPLICA_PIN_SECONDS,
+            httponly=True,
+            samesite="lax"
+        )
+    return response
+
+@app.on_event("startup")
+def load_skill_index():
+    db = SessionLocal()
+    try:
+        skill_index.load(db)
+    except Exception:
+        # Matching falls back to the AI scores; the API still starts.
+        logger.exception("Could not load the skill index")
+    finally:
+        db.close()
+
+@app.on_event("startup")
+def start_skill_index_refresher():
+    # Picks up skill changes made by the other workers (and retries a failed load).
+    if config.SKILL_INDEX_REFRESH_SECONDS > 0:
+        skill_index_refresher.start()
+
+@app.on_event("shutdown")
+def stop_skill_index_refresher():
+    skill_index_refresher.stop()
+
+# Warm-up hooks: heavy dependencies are imported lazily, so these pay the import
+# cost ahead of the first request instead of on it. See STARTUP_WARMUP.
+WARMUP_HOOKS = [
+    ("email_templates", notification_service.warm_templates),
+    ("gemini_client", gemini_service.warm_up),
+    ("resume_parsers", resume_parser_service.warm_up),
+]
+
+def run_warmup_hooks():
+    for name, hook in WARMUP_HOOKS:
+        started = time.perf_counter()
+        try:
+            hook()
+        except Exception:
+            logger.exception("Warm-up hook %s failed", name)
+            continue
+        logger.info("Warm-up hook %s took %.3fs", name, time.perf_counter() - started)
+
+@app.on_event("startup")
+def start_warmup():
+    if config.STARTUP_WARMUP == "sync":
+        run_warmup_hooks()
+    elif config.STARTUP_WARMUP == "background":
+        threading.Thread(target=run_warmup_hooks, name="startup-warmup", daemon=True).start()
+
+@app.on_event("startup")
+def start_email_outbox_sender():
+    if config.EMAIL_OUTBOX_SENDER_ENABLED:
+        outbox_sender.start()
+
+@app.on_event("shutdown")
+def stop_email_outbox_sender():
+    outbox_sender.stop()
+
+@app.on_event("startup")
+def start_stage_digest_worker():
+    if config.DIGEST_ENABLED:
+        digest_worker.start()
+
+@app.on_event("shutdown")
+def stop_stage_digest_worker():
+    digest_worker.stop()
+
+@app.on_event("startup")
+def start_rediscovery_worker():
+    if config.REDISCOVERY_WORKER_ENABLED:
+        rediscovery_worker.start()
+
+@app.on_event("shutdown")
+def stop_rediscovery_worker():
+    rediscovery_worker.stop()
+
+@app.on_event("startup")
+def start_pipeline_listener():
+    pipeline_listener.start()
+
+@app.on_event("shutdown")
+def stop_pipeline_listener():
+    pipeline_listener.stop()
+
+@app.on_event("shutdown")
+def flush_logs():
+    shutdown_logging()
+
 @app.get("/", tags=["Root"])
 def read_root():
     return {"message": "Welcome to the Staffing Tool API"}
 
+@app.get("/metrics", tags=["Root"], include_in_schema=False)
+def read_metrics():
+    """
+    Prometheus scrape endpoint.
+    """
+    return Response(content=metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
+
 # Include all the API routers from your application
 app.include_router(users.router)
 app.include_router(jobs.router)
@@ -47,4 +262,6 @@ app.include_router(candidates.router)
 app.include_router(departments.router)
 app.include_router(portfolios.router)
 app.include_router(skills.router)
-app.include_router(reports.router) # <--- INCLUDE THE NEW ROUTER HERE
\ No newline at end of file
+app.include_router(reports.router) # <--- INCLUDE THE NEW ROUTER HERE
+app.include_router(notifications.router)
+app.include_router(diagnostics.router)
\ No newline at end of file
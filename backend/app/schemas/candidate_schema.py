@@ -22,6 +22,91 @@ class Candidate(CandidateBase):
     class Config:
         from_attributes = True
 
+class DuplicateCandidate(BaseModel):
+    CandidateID: int
+    FullName: str
+    Email: Optional[str] = None
+    Phone: Optional[str] = None
+    Reason: str # same_email, phone_and_name or email_local_part_and_name
+    Similarity: float # Name similarity, 0-1
+
+    class Config:
+        from_attributes = True
+
+# --- Candidate Search Schemas ---
+class CandidateSearchResult(BaseModel):
+    CandidateID: int
+    FullName: str
+    Email: Optional[str] = None
+    Phone: Optional[str] = None
+    ExperienceYears: Optional[float] = None
+    NoticePeriod: Optional[int] = None
+    ResumeSummary: Optional[str] = None
+    TechnicalSkillsSummary: Optional[str] = None
+    CreatedAt: Optional[datetime] = None
+    rank: float
+
+    class Config:
+        from_attributes = True
+
+# --- Skill Coverage Matching Schemas ---
+class SkillMatch(BaseModel):
+    CandidateID: int
+    FullName: Optional[str] = None
+    matched_skills: int
+    required_skills: int
+    coverage: float
+
+# --- Match Matrix Schemas ---
+class MatchBase(BaseModel):
+    Score: float
+    MatchedSkills: int
+    RequiredSkills: int
+    ScoredAt: datetime
+
+class CandidateMatch(MatchBase):
+    CandidateID: int
+    FullName: str
+
+class JobMatch(MatchBase):
+    JobID: int
+    JobTitle: str
+    Status: Optional[str] = None
+
+# --- Talent Rediscovery Schemas ---
+class RediscoveryRun(BaseModel):
+    RunID: int
+    JobID: int
+    Status: str
+    Trigger: str
+    FullRescore: bool = False
+    CandidatesTotal: Optional[int] = None # To be scored; candidates with a current stored score are reused
+    CandidatesReused: int = 0
+    CandidatesProcessed: int
+    MatchesFound: int
+    Error: Optional[str] = None
+    CreatedAt: Optional[datetime] = None
+    StartedAt: Optional[datetime] = None
+    FinishedAt: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class RediscoveryMatch(BaseModel):
+    CandidateID: int
+    FullName: str
+    Email: Optional[str] = None
+    MatchScore: float
+    SkillCoverage: Optional[float] = None
+    MatchSummary: Optional[str] = None
+    ScoredAt: datetime
+
+class RediscoveryResults(BaseModel):
+    JobID: int
+    JobTitle: str
+    latest_run: Optional[RediscoveryRun] = None # While it runs, its fresh scores replace the previous run's one batch at a time
+    matches: List[RediscoveryMatch]
+
 # --- Job Application Schemas ---
 class JobApplication(BaseModel):
     ApplicationID: int
@@ -37,9 +122,9 @@ class JobApplication(BaseModel):
 
 # --- Stage Assignment Schemas ---
 class AssignStage(BaseModel):
-    WorkflowID: int
+    # The assignor is the user making the request.
+    WorkflowID: Optional[int] = None
     AssigneeUserID: int
-    AssignorUserID: int
     ScheduledAt: Optional[datetime] = None
     Notes: Optional[str] = None
 
@@ -0,0 +1,22 @@
+# backend/app/schemas/diagnostics_schema.py
+
+from pydantic import BaseModel
+from typing import Dict
+from datetime import datetime
+
+class ProfileSummary(BaseModel):
+    """One stored request profile, without its stacks."""
+    id: str
+    method: str
+    path: str
+    route: str
+    status_code: int
+    started_at: datetime
+    duration_seconds: float
+    breakdown_seconds: Dict[str, float] # db, ai, parse, serialize, other
+    phase_calls: Dict[str, int]
+    interval_ms: float
+    samples: int
+
+class Profile(ProfileSummary):
+    collapsed: str # "frame;frame;frame count" lines, as read by speedscope / flamegraph.pl
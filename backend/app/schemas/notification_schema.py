@@ -0,0 +1,25 @@
+# backend/app/schemas/notification_schema.py
+
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+class EmailDelivery(BaseModel):
+    """Delivery state of one queued email, as returned to admins."""
+    OutboxID: int
+    Kind: str
+    Recipient: str
+    Status: str
+    Attempts: int
+    LastError: Optional[str] = None
+    CreatedAt: Optional[datetime] = None
+    SentAt: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class OtpDeliveryStatus(BaseModel):
+    """Public OTP delivery state. Deliberately leaves out recipient and error details."""
+    delivery_id: int
+    status: str
+    attempts: int
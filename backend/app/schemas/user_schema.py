@@ -1,6 +1,6 @@
 # backend/app/schemas/user_schema.py
-from pydantic import BaseModel, EmailStr
-from typing import Optional
+from pydantic import BaseModel, EmailStr, Field
+from typing import List, Optional
 from datetime import datetime
 
 # ====================================================================
@@ -41,6 +41,10 @@ class UserRoleUpdate(BaseModel):
     """The request model for the endpoint that updates a user's role."""
     role: str
 
+class UserRolesUpdate(UserRoleUpdate):
+    """The same role for several users at once (PATCH /users/roles)."""
+    user_ids: List[int] = Field(..., min_length=1, max_length=500)
+
 
 # ====================================================================
 # Schemas for Authentication (Tokens)
@@ -65,6 +69,11 @@ class OtpRequest(BaseModel):
     """The request model when a user asks for an OTP."""
     email: EmailStr
 
+class OtpRequestAccepted(BaseModel):
+    """The response when an OTP has been queued for delivery."""
+    message: str
+    delivery_id: int
+
 class OtpVerify(BaseModel):
     """The request model when a user submits an OTP for verification."""
     email: EmailStr
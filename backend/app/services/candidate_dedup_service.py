@@ -0,0 +1,518 @@
+# app/services/candidate_dedup_service.py
+"""
+Duplicate candidate detection and merging.
+
+Candidates are grouped into blocks by cheap blocking keys: the normalized email
+local part, the last ten digits of the phone number, and last name plus first
+initial (both ways round). Only candidates sharing a block are compared, so
+checking one incoming resume costs a couple of indexed lookups, and a sweep
+over the pool costs comparisons per block rather than per pair of candidates.
+Blocks larger than DEDUP_MAX_BLOCK_SIZE ("name:smith j" in a big pool) carry
+no signal and are skipped.
+
+Within a block the comparison is strict, since a wrong merge is much worse than
+a missed one. Two candidates are the same person if their normalized emails are
+equal, or if their names are similar (difflib ratio >= DEDUP_NAME_SIMILARITY)
+and they share a phone number or an email local part. Emails are only folded
+beyond case where the provider itself ignores the difference (Gmail's dots and
++tags); elsewhere "j.doe" and "jdoe" may well be two people.
+"""
+import difflib
+import logging
+import re
+import unicodedata
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import chain, combinations
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event, func, literal, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session, aliased, attributes
+
+from app.core import config
+from app.database.session import SessionLocal
+from app.database.models.candidate import Candidate, JobApplication
+from app.database.models.candidate_dedup import CandidateBlockingKey, CandidateMerge
+from app.database.models.match import JobCandidateMatch
+from app.database.models.notification_event import StageNotificationEvent
+from app.database.models.rediscovery import RediscoveryMatch
+from app.database.models.skill import CandidateSkill
+from app.database.models.workflow_feedback import ApplicationStageLog, InterviewFeedback
+from app.services import match_matrix_service, pipeline_events_service
+from app.services.skill_index_service import skill_index
+
+logger = logging.getLogger(__name__)
+
+SOURCE_INGEST = "ingest"
+SOURCE_SWEEP = "sweep"
+SOURCE_MANUAL = "manual"
+
+REASON_SAME_EMAIL = "same_email"
+REASON_KNOWN_EMAIL = "known_email" # The email of a candidate merged earlier
+REASON_PHONE_AND_NAME = "phone_and_name"
+REASON_EMAIL_LOCAL_PART_AND_NAME = "email_local_part_and_name"
+_REASON_RANK = {REASON_KNOWN_EMAIL: 0, REASON_SAME_EMAIL: 0, REASON_PHONE_AND_NAME: 1, REASON_EMAIL_LOCAL_PART_AND_NAME: 2}
+
+# Providers that ignore dots and +tags in the local part; mail to any spelling
+# reaches the same mailbox.
+_GMAIL_DOMAINS = frozenset({"gmail.com", "googlemail.com"})
+
+# Role mailboxes say nothing about who sent the resume.
+_GENERIC_LOCAL_PARTS = frozenset({"admin", "careers", "contact", "cv", "hello", "hr", "info", "jobs", "mail", "office", "resume"})
+
+# Profile fields a merge fills from whichever record was updated last.
+_PROFILE_FIELDS = (
+    "Phone", "ResumeLink", "ExperienceYears", "NoticePeriod", "NoticePeriodEndDate",
+    "Source", "ResumeSummary", "TechnicalSkillsSummary",
+)
+_IDENTITY_FIELDS = ("FullName", "Email", "Phone")
+
+
+# ====================================================================
+# NORMALIZATION AND COMPARISON
+# ====================================================================
+
+def _name_tokens(name: Optional[str]) -> List[str]:
+    ascii_name = unicodedata.normalize("NFKD", name or "").encode("ascii", "ignore").decode()
+    return re.findall(r"[a-z]+", ascii_name.lower())
+
+
+def normalize_email(email: Optional[str]) -> Optional[str]:
+    """
+    Lowercased. For Gmail addresses also without dots and a +tag, which Gmail
+    ignores: "John.Doe+jobs@GoogleMail.com" -> "johndoe@gmail.com".
+    """
+    local, _, domain = (email or "").strip().lower().partition("@")
+    if domain in _GMAIL_DOMAINS:
+        local, domain = local.split("+", 1)[0].replace(".", ""), "gmail.com"
+    return f"{local}@{domain}" if local and domain else None
+
+
+def normalize_phone(phone: Optional[str]) -> Optional[str]:
+    # The last ten digits, so "+91 98765-43210" and "098765 43210" agree.
+    digits = re.sub(r"\D", "", phone or "")
+    return digits[-10:] if len(digits) >= 7 else None
+
+
+@dataclass
+class Identity:
+    """
+    The identifying fields of a candidate, normalized for comparison.
+    """
+    name_tokens: List[str]
+    email: Optional[str]
+    phone: Optional[str]
+
+    @classmethod
+    def of(cls, full_name: Optional[str], email: Optional[str], phone: Optional[str]) -> "Identity":
+        return cls(_name_tokens(full_name), normalize_email(email), normalize_phone(phone))
+
+    @property
+    def local_part(self) -> Optional[str]:
+        if not self.email:
+            return None
+        local = self.email.split("@", 1)[0]
+        return local if len(local) >= 3 and local not in _GENERIC_LOCAL_PARTS else None
+
+    def blocking_keys(self) -> Set[str]:
+        keys = set()
+        if self.local_part:
+            keys.add(f"email:{self.local_part}")
+        if self.phone:
+            keys.add(f"phone:{self.phone}")
+        tokens = self.name_tokens
+        if len(tokens) >= 2:
+            first, last = tokens[0], tokens[-1]
+            keys.add(f"name:{last} {first[0]}")
+            keys.add(f"name:{first} {last[0]}")
+        elif tokens:
+            keys.add(f"name:{tokens[0]}")
+        return keys
+
+
+def name_similarity(a: Identity, b: Identity) -> float:
+    # Token order is ignored: "Doe John" and "John Doe" are the same name.
+    return difflib.SequenceMatcher(None, " ".join(sorted(a.name_tokens)), " ".join(sorted(b.name_tokens))).ratio()
+
+
+def compare(a: Identity, b: Identity) -> Optional[Tuple[str, float]]:
+    """
+    (reason, name similarity) if `a` and `b` are the same person, else None.
+    """
+    similarity = name_similarity(a, b)
+    if a.email and a.email == b.email:
+        return REASON_SAME_EMAIL, similarity
+    if similarity < config.DEDUP_NAME_SIMILARITY:
+        return None
+    if a.phone and a.phone == b.phone:
+        return REASON_PHONE_AND_NAME, similarity
+    if a.local_part and a.local_part == b.local_part:
+        return REASON_EMAIL_LOCAL_PART_AND_NAME, similarity
+    return None
+
+
+@dataclass
+class DuplicateMatch:
+    CandidateID: int
+    FullName: str
+    Email: Optional[str]
+    Phone: Optional[str]
+    Reason: str
+    Similarity: float
+
+
+# ====================================================================
+# BLOCKING KEY INDEX
+# ====================================================================
+
+def _insert_keys(connection: Connection, rows: Iterable[dict]) -> None:
+    rows = [dict(row) for row in {(row["Key"], row["CandidateID"]): row for row in rows}.values()]
+    if not rows:
+        return
+    connection.execute(insert(CandidateBlockingKey).values(rows).on_conflict_do_nothing())
+
+
+def _key_rows(candidate_id: int, identity: Identity) -> List[dict]:
+    return [{"Key": key[:255], "CandidateID": candidate_id} for key in identity.blocking_keys()]
+
+
+@event.listens_for(Session, "after_flush")
+def _index_candidates_after_flush(session: Session, flush_context) -> None:
+    """
+    Keeps the blocking keys of new and edited candidates current, in the same
+    transaction. Keys are only ever added here: a stale key costs one extra
+    comparison, while dropping one could lose a merged identity's key.
+    """
+    rows = []
+    for instance in chain(session.new, session.dirty):
+        if not isinstance(instance, Candidate) or instance.CandidateID is None:
+            continue
+        if instance not in session.new and not any(
+            attributes.get_history(instance, name).has_changes() for name in _IDENTITY_FIELDS
+        ):
+            continue
+        rows.extend(_key_rows(instance.CandidateID, Identity.of(instance.FullName, instance.Email, instance.Phone)))
+    if rows:
+        _insert_keys(session.connection(), rows)
+
+
+def rebuild_blocking_keys(db: Session, batch_size: int = 1000) -> int:
+    """
+    Recomputes the keys of the whole pool, e.g. after a bulk import that skipped
+    the ORM. Returns the number of candidates indexed.
+    """
+    db.query(CandidateBlockingKey).delete(synchronize_session=False)
+    db.commit()
+    indexed = 0
+    last_candidate_id = 0
+    while True:
+        batch = db.query(Candidate.CandidateID, Candidate.FullName, Candidate.Email, Candidate.Phone).filter(
+            Candidate.CandidateID > last_candidate_id
+        ).order_by(Candidate.CandidateID).limit(batch_size).all()
+        if not batch:
+            break
+        _insert_keys(db.connection(), chain.from_iterable(
+            _key_rows(row.CandidateID, Identity.of(row.FullName, row.Email, row.Phone)) for row in batch
+        ))
+        db.commit()
+        indexed += len(batch)
+        last_candidate_id = batch[-1].CandidateID
+
+    # Identities merged into a candidate keep pointing at it.
+    aliases = db.query(CandidateMerge.SurvivorCandidateID, CandidateMerge.FullName, CandidateMerge.Email, CandidateMerge.Phone).all()
+    _insert_keys(db.connection(), chain.from_iterable(
+        _key_rows(row.SurvivorCandidateID, Identity.of(row.FullName, row.Email, row.Phone)) for row in aliases
+    ))
+    db.commit()
+    return indexed
+
+
+# ====================================================================
+# ONLINE CHECK
+# ====================================================================
+
+def find_duplicates(db: Session, full_name: Optional[str], email: Optional[str], phone: Optional[str],
+                    exclude_candidate_id: Optional[int] = None) -> List[DuplicateMatch]:
+    """
+    Existing candidates that are the same person as the given identity, most
+    certain first. Two queries: the block sizes, then the members of the usable blocks.
+    """
+    identity = Identity.of(full_name, email, phone)
+    keys = [key[:255] for key in identity.blocking_keys()]
+    if not keys:
+        return []
+    Key = CandidateBlockingKey
+    sizes = db.query(Key.Key, func.count(Key.CandidateID)).filter(Key.Key.in_(keys)).group_by(Key.Key).all()
+    usable = [key for key, size in sizes if size <= config.DEDUP_MAX_BLOCK_SIZE]
+    if not usable:
+        return []
+
+    members = db.query(Candidate.CandidateID, Candidate.FullName, Candidate.Email, Candidate.Phone).join(
+        Key, Key.CandidateID == Candidate.CandidateID
+    ).filter(Key.Key.in_(usable)).distinct().all()
+    matches = []
+    for member in members:
+        if member.CandidateID == exclude_candidate_id:
+            continue
+        result = compare(identity, Identity.of(member.FullName, member.Email, member.Phone))
+        if result is not None:
+            reason, similarity = result
+            matches.append(DuplicateMatch(member.CandidateID, member.FullName, member.Email, member.Phone, reason, round(similarity, 3)))
+    return sorted(matches, key=lambda match: (_REASON_RANK[match.Reason], -match.Similarity, match.CandidateID))
+
+
+def resolve_existing(db: Session, full_name: Optional[str], email: Optional[str],
+                     phone: Optional[str]) -> Optional[Tuple[Candidate, DuplicateMatch]]:
+    """
+    The existing candidate an incoming resume belongs to, when its email is not
+    on file: an identity merged earlier, or the best duplicate in its blocks.
+    """
+    survivor_id = None
+    if email:
+        survivor_id = db.query(CandidateMerge.SurvivorCandidateID).filter(CandidateMerge.Email == email).limit(1).scalar()
+    if survivor_id is not None:
+        candidate = db.get(Candidate, survivor_id)
+        return candidate, DuplicateMatch(candidate.CandidateID, candidate.FullName, candidate.Email, candidate.Phone, REASON_KNOWN_EMAIL, 1.0)
+    matches = find_duplicates(db, full_name, email, phone)
+    if not matches:
+        return None
+    return db.get(Candidate, matches[0].CandidateID), matches[0]
+
+
+def record_alias(db: Session, candidate_id: int, full_name: Optional[str], email: Optional[str], phone: Optional[str],
+                 match: DuplicateMatch, recorded_by: Optional[int]) -> None:
+    """
+    Remembers another identity of a candidate that was caught at ingest, so the
+    next resume with it is matched by a plain email lookup.
+    """
+    db.add(CandidateMerge(
+        SurvivorCandidateID=candidate_id, FullName=full_name, Email=email, Phone=phone,
+        Source=SOURCE_INGEST, Reason=match.Reason, Similarity=match.Similarity, MergedBy=recorded_by
+    ))
+    _insert_keys(db.connection(), _key_rows(candidate_id, Identity.of(full_name, email, phone)))
+    logger.info("Resume attached to existing candidate %s as a duplicate (%s)", candidate_id, match.Reason)
+
+
+# ====================================================================
+# MERGING
+# ====================================================================
+
+def _last_activity(row) -> datetime:
+    return getattr(row, "UpdatedAt", None) or getattr(row, "AppliedAt", None) or getattr(row, "CreatedAt", None) or datetime.min
+
+
+def _merge_applications(db: Session, survivor_id: int, duplicate_id: int) -> None:
+    """
+    Moves the duplicate's applications to the survivor. Where both applied for
+    the same job, the application that moved last is kept and the other one's
+    stage history, feedback and notifications are moved onto it.
+    """
+    duplicate_apps = db.query(JobApplication).filter(JobApplication.CandidateID == duplicate_id).all()
+    if not duplicate_apps:
+        return
+    survivor_apps = {
+        application.JobID: application
+        for application in db.query(JobApplication).filter(
+            JobApplication.CandidateID == survivor_id,
+            JobApplication.JobID.in_([application.JobID for application in duplicate_apps])
+        )
+    }
+    dropped_ids = set()
+    for application in duplicate_apps:
+        other = survivor_apps.get(application.JobID)
+        if other is None:
+            continue
+        kept, dropped = sorted((application, other), key=_last_activity, reverse=True)
+        for model in (ApplicationStageLog, InterviewFeedback, StageNotificationEvent):
+            db.query(model).filter(model.ApplicationID == dropped.ApplicationID).update(
+                {"ApplicationID": kept.ApplicationID}, synchronize_session=False
+            )
+        dropped_ids.add(dropped.ApplicationID)
+        db.delete(dropped)
+    # The deletes must reach the database before the moves: one application per candidate and job.
+    db.flush()
+    for application in duplicate_apps:
+        if application.ApplicationID not in dropped_ids:
+            application.CandidateID = survivor_id
+    db.flush()
+
+
+def merge_candidates(db: Session, survivor_id: int, duplicate_id: int, merged_by: Optional[int],
+                     source: str, match: Optional[DuplicateMatch] = None) -> Candidate:
+    """
+    Folds `duplicate_id` into `survivor_id` in the caller's transaction: profile
+    gaps, skills, applications and blocking keys move over, the duplicate's
+    emails become aliases of the survivor, and the duplicate is deleted. Call
+    refresh_after_merge() once committed.
+    """
+    if survivor_id == duplicate_id:
+        raise ValueError("A candidate cannot be merged into itself.")
+    survivor = db.get(Candidate, survivor_id)
+    duplicate = db.get(Candidate, duplicate_id)
+    if survivor is None or duplicate is None:
+        raise ValueError("Candidate not found.")
+
+    # Profile: the most recently updated record wins, the other one fills its gaps.
+    newer, older = sorted((survivor, duplicate), key=_last_activity, reverse=True)
+    for name in _PROFILE_FIELDS:
+        value = getattr(newer, name)
+        setattr(survivor, name, value if value not in (None, "") else getattr(older, name))
+
+    db.add(CandidateMerge(
+        SurvivorCandidateID=survivor_id, MergedCandidateID=duplicate_id,
+        FullName=duplicate.FullName, Email=duplicate.Email, Phone=duplicate.Phone, Source=source,
+        Reason=match.Reason if match else None, Similarity=match.Similarity if match else None, MergedBy=merged_by
+    ))
+    # Identities merged into the duplicate earlier now belong to the survivor.
+    db.query(CandidateMerge).filter(CandidateMerge.SurvivorCandidateID == duplicate_id).update(
+        {"SurvivorCandidateID": survivor_id}, synchronize_session=False
+    )
+
+    # Skills: the union of both; links the survivor already has are dropped.
+    survivor_skill = aliased(CandidateSkill)
+    survivor_skills = select(survivor_skill.SkillID).where(survivor_skill.CandidateID == survivor_id)
+    db.query(CandidateSkill).filter(
+        CandidateSkill.CandidateID == duplicate_id, CandidateSkill.SkillID.notin_(survivor_skills)
+    ).update({"CandidateID": survivor_id}, synchronize_session=False)
+    db.query(CandidateSkill).filter(CandidateSkill.CandidateID == duplicate_id).delete(synchronize_session=False)
+
+    _merge_applications(db, survivor_id, duplicate_id)
+    # Their stage history and feedback were moved with bulk updates, which the
+    # pipeline's flush hook does not see: tell the job pipelines explicitly.
+    for application_id, job_id in db.query(JobApplication.ApplicationID, JobApplication.JobID).filter(
+        JobApplication.CandidateID == survivor_id
+    ):
+        pipeline_events_service.notify(db, job_id, pipeline_events_service.EVENT_UPDATED, application_id)
+
+    # Derived rows are recomputed for the survivor (refresh_after_merge, the next rediscovery run).
+    db.query(JobCandidateMatch).filter(JobCandidateMatch.CandidateID == duplicate_id).delete(synchronize_session=False)
+    db.query(RediscoveryMatch).filter(RediscoveryMatch.CandidateID == duplicate_id).delete(synchronize_session=False)
+
+    db.execute(insert(CandidateBlockingKey).from_select(
+        ["Key", "CandidateID"],
+        select(CandidateBlockingKey.Key, literal(survivor_id)).where(CandidateBlockingKey.CandidateID == duplicate_id)
+    ).on_conflict_do_nothing())
+    db.query(CandidateBlockingKey).filter(CandidateBlockingKey.CandidateID == duplicate_id).delete(synchronize_session=False)
+
+    survivor.UpdatedAt = datetime.utcnow()
+    survivor.UpdatedBy = merged_by
+    db.delete(duplicate)
+    db.flush()
+    logger.info("Merged candidate %s into %s (%s)", duplicate_id, survivor_id, match.Reason if match else source)
+    return survivor
+
+
+def refresh_after_merge(db: Session, survivor_id: int, duplicate_ids: Iterable[int]) -> None:
+    """
+    Brings this process's skill index and the match matrix up to date after a
+    committed merge. The other workers' indexes reload within
+    SKILL_INDEX_REFRESH_SECONDS (SkillIndexRefresher).
+    """
+    skill_ids = [skill_id for (skill_id,) in db.query(CandidateSkill.SkillID).filter(CandidateSkill.CandidateID == survivor_id)]
+    skill_index.set_candidate_skills(survivor_id, skill_ids)
+    for duplicate_id in duplicate_ids:
+        skill_index.set_candidate_skills(duplicate_id, [])
+    match_matrix_service.rescore_candidate(survivor_id, db)
+
+
+def refresh_after_merge_in_background(survivor_id: int, duplicate_ids: List[int]) -> None:
+    db = SessionLocal()
+    try:
+        refresh_after_merge(db, survivor_id, duplicate_ids)
+    except Exception:
+        db.rollback()
+        logger.exception("Refreshing indexes after merging into candidate %s failed", survivor_id)
+    finally:
+        db.close()
+
+
+# ====================================================================
+# BATCH SWEEP
+# ====================================================================
+
+@dataclass
+class SweepReport:
+    blocks: int = 0
+    oversized_blocks: int = 0
+    comparisons: int = 0
+    duplicate_pairs: int = 0
+    merged: int = 0
+    clusters: List[List[int]] = field(default_factory=list) # Survivor first
+
+
+def sweep(db: Session, merge: bool = False, merged_by: Optional[int] = None, batch_size: int = 500) -> SweepReport:
+    """
+    Finds the duplicates in the whole pool, block by block, and merges each
+    cluster into its oldest candidate when `merge` is set. A cluster is a
+    survivor and the candidates that matched the survivor itself. Matches are
+    not chained: if A matches B and B matches C but not A, C is left alone,
+    since every link in a chain is another chance of a wrong merge.
+    """
+    report = SweepReport()
+    Key = CandidateBlockingKey
+    # For each candidate, the lower CandidateIDs it matched and how.
+    matched: Dict[int, Dict[int, DuplicateMatch]] = {}
+    compared: Set[Tuple[int, int]] = set()
+
+    last_key = ""
+    while True:
+        page = db.query(Key.Key, func.count(Key.CandidateID)).filter(Key.Key > last_key).group_by(Key.Key).having(
+            func.count(Key.CandidateID) > 1
+        ).order_by(Key.Key).limit(batch_size).all()
+        if not page:
+            break
+        last_key = page[-1][0]
+        keys = [key for key, size in page if size <= config.DEDUP_MAX_BLOCK_SIZE]
+        report.blocks += len(page)
+        report.oversized_blocks += len(page) - len(keys)
+        if not keys:
+            continue
+
+        members: Dict[str, List[int]] = {}
+        identities: Dict[int, Tuple[Identity, object]] = {}
+        for row in db.query(Key.Key, Candidate.CandidateID, Candidate.FullName, Candidate.Email, Candidate.Phone).join(
+            Candidate, Candidate.CandidateID == Key.CandidateID
+        ).filter(Key.Key.in_(keys)):
+            members.setdefault(row.Key, []).append(row.CandidateID)
+            if row.CandidateID not in identities:
+                identities[row.CandidateID] = (Identity.of(row.FullName, row.Email, row.Phone), row)
+
+        for candidate_ids in members.values():
+            for a, b in combinations(sorted(candidate_ids), 2):
+                if (a, b) in compared:
+                    continue
+                compared.add((a, b))
+                report.comparisons += 1
+                result = compare(identities[a][0], identities[b][0])
+                if result is None:
+                    continue
+                report.duplicate_pairs += 1
+                reason, similarity = result
+                row = identities[b][1]
+                matched.setdefault(b, {})[a] = DuplicateMatch(b, row.FullName, row.Email, row.Phone, reason, round(similarity, 3))
+
+    # Oldest first, each candidate joins the oldest survivor it matched directly;
+    # one that only matched other duplicates stays a candidate of its own.
+    clusters: Dict[int, List[int]] = {}
+    survivor_of: Dict[int, int] = {}
+    for candidate_id in sorted(matched):
+        survivors = [other_id for other_id in matched[candidate_id] if other_id not in survivor_of]
+        if survivors:
+            survivor_of[candidate_id] = min(survivors)
+            clusters.setdefault(min(survivors), []).append(candidate_id)
+    for survivor_id, duplicate_ids in sorted(clusters.items()):
+        report.clusters.append([survivor_id] + duplicate_ids)
+        if not merge:
+            continue
+        for duplicate_id in duplicate_ids:
+            merge_candidates(db, survivor_id, duplicate_id, merged_by, SOURCE_SWEEP, matched[duplicate_id][survivor_id])
+        db.commit()
+        refresh_after_merge(db, survivor_id, duplicate_ids)
+        report.merged += len(duplicate_ids)
+    logger.info(
+        "Duplicate sweep: %d blocks (%d oversized), %d comparisons, %d clusters, %d merged",
+        report.blocks, report.oversized_blocks, report.comparisons, len(report.clusters), report.merged
+    )
+    return report
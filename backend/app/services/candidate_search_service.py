@@ -0,0 +1,53 @@
+# app/services/candidate_search_service.py
+from typing import List, Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.database.models import candidate as candidate_model
+
+# The same text search configuration used to build Candidate.SearchVector.
+SEARCH_CONFIG = "english"
+
+
+def search_candidates(
+    db: Session,
+    q: str,
+    min_experience: Optional[float] = None,
+    max_experience: Optional[float] = None,
+    max_notice_period: Optional[int] = None,
+    skip: int = 0,
+    limit: int = 20
+) -> List[dict]:
+    """
+    Ranked full-text search over candidate names, skills summaries and resume summaries.
+
+    The query uses web search syntax, so "quoted phrases", OR and -exclusions work
+    as users expect. Matching is served by the GIN index on Candidate.SearchVector.
+    """
+    Candidate = candidate_model.Candidate
+
+    ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    rank = func.ts_rank_cd(Candidate.SearchVector, ts_query).label("rank")
+
+    query = db.query(
+        Candidate.CandidateID,
+        Candidate.FullName,
+        Candidate.Email,
+        Candidate.Phone,
+        Candidate.ExperienceYears,
+        Candidate.NoticePeriod,
+        Candidate.ResumeSummary,
+        Candidate.TechnicalSkillsSummary,
+        Candidate.CreatedAt,
+        rank
+    ).filter(Candidate.SearchVector.op("@@")(ts_query))
+
+    if min_experience is not None:
+        query = query.filter(Candidate.ExperienceYears >= min_experience)
+    if max_experience is not None:
+        query = query.filter(Candidate.ExperienceYears <= max_experience)
+    if max_notice_period is not None:
+        query = query.filter(Candidate.NoticePeriod <= max_notice_period)
+
+    rows = query.order_by(rank.desc(), Candidate.CandidateID).offset(skip).limit(limit).all()
+    return [row._asdict() for row in rows]
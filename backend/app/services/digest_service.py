@@ -0,0 +1,213 @@
+# backend/app/services/digest_service.py
+import logging
+import threading
+import time
+from datetime import timedelta
+from typing import List, Optional, Set
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core import config
+from app.database.session import SessionLocal
+from app.database.models import candidate as candidate_model
+from app.database.models import job as job_model
+from app.database.models import user as user_model
+from app.database.models.workflow_feedback import ApplicationStageLog
+from app.database.models.notification_event import StageNotificationEvent
+from app.database.models.email_outbox import EmailOutbox
+from app.services import email_service, notification_service
+
+logger = logging.getLogger(__name__)
+
+EVENT_STAGE_CHANGE = "stage_change"
+EVENT_ASSIGNMENT = "assignment"
+
+
+def record_stage_log(db: Session, log: ApplicationStageLog, stage_changed: bool = True) -> int:
+    """
+    Fans a freshly written ApplicationStageLog out into per-recipient digest events,
+    in the caller's transaction. Returns how many events were recorded.
+
+    - The assignee of the log is told they were assigned.
+    - The job's owner and whoever added the application hear about the stage change,
+      unless the log only assigns someone to the current stage (`stage_changed=False`).
+    - Nobody is notified about their own action.
+    """
+    application, candidate_name, job_title, job_owner_id = db.query(
+        candidate_model.JobApplication,
+        candidate_model.Candidate.FullName,
+        job_model.JobPosting.JobTitle,
+        job_model.JobPosting.CreatedBy
+    ).join(
+        candidate_model.Candidate, candidate_model.Candidate.CandidateID == candidate_model.JobApplication.CandidateID
+    ).join(
+        job_model.JobPosting, job_model.JobPosting.JobID == candidate_model.JobApplication.JobID
+    ).filter(candidate_model.JobApplication.ApplicationID == log.ApplicationID).one()
+
+    events = []
+    notified: Set[int] = {log.AssignorUserID}
+
+    if log.AssigneeUserID and log.AssigneeUserID not in notified:
+        events.append(StageNotificationEvent(
+            RecipientUserID=log.AssigneeUserID,
+            LogID=log.LogID,
+            ApplicationID=log.ApplicationID,
+            EventType=EVENT_ASSIGNMENT,
+            Summary=f"{candidate_name} ({job_title}) was assigned to you for '{log.Status}'."
+        ))
+        notified.add(log.AssigneeUserID)
+
+    for recipient_id in (job_owner_id, application.CreatedBy) if stage_changed else ():
+        if recipient_id and recipient_id not in notified:
+            events.append(StageNotificationEvent(
+                RecipientUserID=recipient_id,
+                LogID=log.LogID,
+                ApplicationID=log.ApplicationID,
+                EventType=EVENT_STAGE_CHANGE,
+                Summary=f"{candidate_name} ({job_title}) moved to '{log.Status}'."
+            ))
+            notified.add(recipient_id)
+
+    db.add_all(events)
+    digest_worker.count_recorded(len(events))
+    return len(events)
+
+
+class DigestWorker:
+    """
+    Background thread that turns pending StageNotificationEvents into digest emails.
+
+    A recipient's events are held until the oldest one is DIGEST_WINDOW_SECONDS old,
+    then all of them go out as one email through the outbox. Each cycle handles at
+    most DIGEST_MAX_RECIPIENTS_PER_CYCLE recipients, and no digests are queued while
+    the outbox is over DIGEST_OUTBOX_BACKPRESSURE_LIMIT pending messages.
+    """
+
+    def __init__(self):
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stats_lock = threading.Lock()
+        self.events_recorded = 0
+        self.events_digested = 0
+        self.digests_queued = 0
+        self.cycles = 0
+        self.cycles_deferred = 0
+        self.last_cycle_seconds = 0.0
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="stage-digest-worker", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def count_recorded(self, count: int) -> None:
+        with self._stats_lock:
+            self.events_recorded += count
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_cycle()
+            except Exception:
+                logger.exception("Stage digest cycle failed")
+            self._stop.wait(config.DIGEST_POLL_SECONDS)
+
+    def run_cycle(self) -> int:
+        """
+        Queues the digests that are due. Returns how many were queued.
+        """
+        started = time.perf_counter()
+        db = SessionLocal()
+        try:
+            outbox_depth = db.query(func.count(EmailOutbox.OutboxID)).filter(
+                EmailOutbox.Status == email_service.STATUS_PENDING
+            ).scalar() or 0
+            if outbox_depth > config.DIGEST_OUTBOX_BACKPRESSURE_LIMIT:
+                with self._stats_lock:
+                    self.cycles += 1
+                    self.cycles_deferred += 1
+                return 0
+
+            due_recipients = [row.RecipientUserID for row in db.query(
+                StageNotificationEvent.RecipientUserID
+            ).filter(
+                StageNotificationEvent.DigestedAt.is_(None)
+            ).group_by(
+                StageNotificationEvent.RecipientUserID
+            ).having(
+                func.min(StageNotificationEvent.CreatedAt) <= func.now() - timedelta(seconds=config.DIGEST_WINDOW_SECONDS)
+            ).limit(config.DIGEST_MAX_RECIPIENTS_PER_CYCLE).all()]
+
+            queued = 0
+            for recipient_id in due_recipients:
+                if self._queue_digest(db, recipient_id):
+                    queued += 1
+            db.commit()
+
+            with self._stats_lock:
+                self.cycles += 1
+                self.digests_queued += queued
+                self.last_cycle_seconds = time.perf_counter() - started
+            return queued
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _queue_digest(self, db: Session, recipient_id: int) -> bool:
+        # SKIP LOCKED lets workers in other processes run cycles at the same time.
+        events: List[StageNotificationEvent] = db.query(StageNotificationEvent).filter(
+            StageNotificationEvent.RecipientUserID == recipient_id,
+            StageNotificationEvent.DigestedAt.is_(None)
+        ).order_by(StageNotificationEvent.EventID).with_for_update(skip_locked=True).all()
+        if not events:
+            return False
+
+        recipient = db.query(user_model.User).filter(user_model.User.UserID == recipient_id).first()
+        if recipient and recipient.IsActive:
+            shown = events[:config.DIGEST_MAX_EVENTS_PER_EMAIL]
+            html_content = notification_service.get_template("stage_digest_email.html").render(
+                user_name=recipient.UserName or recipient.Email,
+                updates=[event.Summary for event in shown],
+                more_count=len(events) - len(shown)
+            )
+            email_service.enqueue_email(
+                db,
+                recipient_email=recipient.Email,
+                subject=f"{len(events)} update(s) in your hiring pipelines",
+                html_content=html_content,
+                kind="stage_digest"
+            )
+
+        # Inactive or deleted users' events are dropped rather than kept forever.
+        for event in events:
+            event.DigestedAt = func.now()
+        with self._stats_lock:
+            self.events_digested += len(events)
+        return True
+
+    def stats(self, db: Session) -> dict:
+        pending = db.query(func.count(StageNotificationEvent.EventID)).filter(
+            StageNotificationEvent.DigestedAt.is_(None)
+        ).scalar() or 0
+        with self._stats_lock:
+            return {
+                "pending_events": pending,
+                "events_recorded": self.events_recorded,
+                "events_digested": self.events_digested,
+                "digests_queued": self.digests_queued,
+                "cycles": self.cycles,
+                "cycles_deferred_by_backpressure": self.cycles_deferred,
+                "last_cycle_seconds": self.last_cycle_seconds,
+            }
+
+
+digest_worker = DigestWorker()
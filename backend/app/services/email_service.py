@@ -1 +1,401 @@
- 
+# backend/app/services/email_service.py
+import logging
+import smtplib
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import timedelta
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from email.utils import formataddr
+from typing import List, Optional, Tuple
+
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+
+from app.core import config
+from app.database.session import SessionLocal
+from app.database.models.email_outbox import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+STATUS_PENDING = "Pending"
+STATUS_SENT = "Sent"
+STATUS_FAILED = "Failed"
+
+PRIORITY_URGENT = 0 # A user is waiting on it, e.g. a login OTP
+PRIORITY_NORMAL = 10
+
+# Kinds whose subject and body carry a secret (a login code). Their content is
+# blanked as soon as the row is Sent or Failed, so it is never kept at rest.
+SECRET_KINDS = frozenset({"otp"})
+REDACTED_SUBJECT = "[redacted]"
+
+# How often the sender redacts and purges old rows.
+_CLEANUP_INTERVAL_SECONDS = 3600
+
+# Errors that concern a single message; the SMTP connection itself is still usable.
+_MESSAGE_ERRORS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError)
+
+
+def is_email_configured() -> bool:
+    return bool(config.SMTP_SERVER and config.EMAIL_SENDER_ADDRESS)
+
+
+def build_message(recipient_email: str, subject: str, html_content: str) -> MIMEMultipart:
+    message = MIMEMultipart("alternative")
+    message["Subject"] = subject
+    message["From"] = formataddr((config.EMAIL_SENDER_NAME, config.EMAIL_SENDER_ADDRESS))
+    message["To"] = recipient_email
+    message.attach(MIMEText(html_content, "html"))
+    return message
+
+
+# ====================================================================
+# SMTP CONNECTION POOL
+# ====================================================================
+
+class SMTPConnectionPool:
+    """
+    Keeps a few authenticated SMTP connections open so that the TLS handshake and
+    login are paid once per connection instead of once per email.
+    """
+
+    def __init__(self, max_size: int, max_idle_seconds: int):
+        self.max_size = max_size
+        self.max_idle_seconds = max_idle_seconds
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._idle = [] # (connection, returned_at)
+
+    def _open(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(config.SMTP_SERVER, config.SMTP_PORT, timeout=30)
+        if config.SMTP_USE_TLS:
+            server.starttls()
+        if config.EMAIL_HOST_USER and config.EMAIL_HOST_PASSWORD:
+            server.login(config.EMAIL_HOST_USER, config.EMAIL_HOST_PASSWORD)
+        return server
+
+    @staticmethod
+    def _close(server: smtplib.SMTP) -> None:
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+
+    def _checkout(self) -> smtplib.SMTP:
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                server, returned_at = self._idle.pop()
+            if time.monotonic() - returned_at > self.max_idle_seconds:
+                # Servers drop idle sessions; check before reusing a stale one.
+                # A dropped socket raises OSError (e.g. ConnectionResetError) here.
+                try:
+                    if server.noop()[0] == 250:
+                        return server
+                except (smtplib.SMTPException, OSError):
+                    pass
+                self._close(server)
+                continue
+            return server
+        return self._open()
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrows a connection. It is returned to the pool on success and closed on error.
+        """
+        self._slots.acquire()
+        server = None
+        try:
+            server = self._checkout()
+            yield server
+        except Exception:
+            if server is not None:
+                self._close(server)
+                server = None
+            raise
+        finally:
+            if server is not None:
+                with self._lock:
+                    self._idle.append((server, time.monotonic()))
+            self._slots.release()
+
+    def close_all(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for server, _ in idle:
+            self._close(server)
+
+
+smtp_pool = SMTPConnectionPool(config.EMAIL_POOL_SIZE, config.EMAIL_POOL_IDLE_SECONDS)
+
+
+# ====================================================================
+# OUTBOX
+# ====================================================================
+
+def enqueue_email(
+    db: Session,
+    recipient_email: str,
+    subject: str,
+    html_content: str,
+    kind: str,
+    priority: int = PRIORITY_NORMAL
+) -> EmailOutbox:
+    """
+    Adds an email to the outbox as part of the caller's transaction.
+    The background sender is woken up as soon as that transaction commits.
+    """
+    outbox_row = EmailOutbox(
+        Kind=kind,
+        Priority=priority,
+        Recipient=recipient_email,
+        Subject=subject,
+        HtmlBody=html_content,
+        Status=STATUS_PENDING,
+        Attempts=0
+    )
+    db.add(outbox_row)
+    db.flush()
+    event.listen(db, "after_commit", lambda session: outbox_sender.notify(), once=True)
+    return outbox_row
+
+
+def enqueue_bulk(
+    db: Session,
+    messages: List[Tuple[str, str, str]],
+    kind: str,
+    priority: int = PRIORITY_NORMAL
+) -> List[EmailOutbox]:
+    """
+    Queues many (recipient_email, subject, html_content) messages with one flush.
+    """
+    outbox_rows = [
+        EmailOutbox(
+            Kind=kind,
+            Priority=priority,
+            Recipient=recipient_email,
+            Subject=subject,
+            HtmlBody=html_content,
+            Status=STATUS_PENDING,
+            Attempts=0
+        )
+        for recipient_email, subject, html_content in messages
+    ]
+    if outbox_rows:
+        db.add_all(outbox_rows)
+        db.flush()
+        event.listen(db, "after_commit", lambda session: outbox_sender.notify(), once=True)
+    return outbox_rows
+
+
+class OutboxSender:
+    """
+    Background thread that drains the EmailOutbox table.
+
+    Due rows are claimed with SELECT ... FOR UPDATE SKIP LOCKED, so several API
+    workers can each run a sender without sending anything twice. Each batch is
+    sent over one pooled connection; failures are retried with exponential backoff
+    until EMAIL_MAX_ATTEMPTS, after which the row is marked Failed. Sent rows are
+    deleted after EMAIL_OUTBOX_RETENTION_DAYS.
+    """
+
+    def __init__(self, pool: SMTPConnectionPool):
+        self.pool = pool
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stats_lock = threading.Lock()
+        self._send_seconds = deque(maxlen=1000)
+        self.sent_total = 0
+        self.failed_total = 0
+        self.batches_total = 0
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="email-outbox-sender", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout)
+        self.pool.close_all()
+
+    def notify(self) -> None:
+        self._wakeup.set()
+
+    def _run(self) -> None:
+        next_cleanup = time.monotonic()
+        while not self._stop.is_set():
+            # Cleared before looking at the table, so a notify() during the batch is not lost.
+            self._wakeup.clear()
+            try:
+                processed = self.process_batch()
+            except Exception:
+                logger.exception("Email outbox sender failed")
+                processed = 0
+            if time.monotonic() >= next_cleanup:
+                next_cleanup = time.monotonic() + _CLEANUP_INTERVAL_SECONDS
+                try:
+                    self.cleanup()
+                except Exception:
+                    logger.exception("Email outbox cleanup failed")
+            if processed < config.EMAIL_BATCH_SIZE:
+                self._wakeup.wait(config.EMAIL_SENDER_POLL_SECONDS)
+
+    def process_batch(self) -> int:
+        """
+        Sends one batch of due emails. Returns how many rows were processed.
+        """
+        if not is_email_configured():
+            return 0
+
+        db = SessionLocal()
+        try:
+            rows: List[EmailOutbox] = db.query(EmailOutbox).filter(
+                EmailOutbox.Status == STATUS_PENDING,
+                EmailOutbox.NextAttemptAt <= func.now()
+            ).order_by(EmailOutbox.Priority, EmailOutbox.OutboxID).limit(config.EMAIL_BATCH_SIZE).with_for_update(skip_locked=True).all()
+            if not rows:
+                db.rollback()
+                return 0
+
+            remaining = list(rows)
+            message, message_key = None, None
+            try:
+                with self.pool.connection() as server:
+                    while remaining:
+                        row = remaining[0]
+                        # Bulk sends queue the same body many times; build the MIME
+                        # message once and only swap the To header per recipient.
+                        if message_key != (row.Subject, row.HtmlBody):
+                            message = build_message(row.Recipient, row.Subject, row.HtmlBody)
+                            message_key = (row.Subject, row.HtmlBody)
+                        else:
+                            message.replace_header("To", row.Recipient)
+                        started = time.perf_counter()
+                        try:
+                            server.sendmail(config.EMAIL_SENDER_ADDRESS, [row.Recipient], message.as_string())
+                        except _MESSAGE_ERRORS as e:
+                            self._schedule_retry(row, e)
+                        else:
+                            self._mark_sent(row, time.perf_counter() - started)
+                        remaining.pop(0)
+            except Exception as e:
+                # The connection broke; everything not yet sent goes back in the queue.
+                for row in remaining:
+                    self._schedule_retry(row, e)
+
+            db.commit()
+            with self._stats_lock:
+                self.batches_total += 1
+            return len(rows)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def cleanup(self) -> Tuple[int, int]:
+        """
+        Blanks secret content the sender left behind (rows finished before
+        redaction existed) and deletes Sent rows older than the retention period.
+        Returns (redacted, deleted).
+        """
+        db = SessionLocal()
+        try:
+            redacted = db.query(EmailOutbox).filter(
+                EmailOutbox.Kind.in_(SECRET_KINDS),
+                EmailOutbox.Status.in_([STATUS_SENT, STATUS_FAILED]),
+                EmailOutbox.Subject != REDACTED_SUBJECT
+            ).update({"Subject": REDACTED_SUBJECT, "HtmlBody": ""}, synchronize_session=False)
+            deleted = db.query(EmailOutbox).filter(
+                EmailOutbox.Status == STATUS_SENT,
+                EmailOutbox.SentAt < func.now() - timedelta(days=config.EMAIL_OUTBOX_RETENTION_DAYS)
+            ).delete(synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+        if redacted or deleted:
+            logger.info("Email outbox cleanup: %d rows redacted, %d sent rows deleted", redacted, deleted)
+        return redacted, deleted
+
+    @staticmethod
+    def _redact(row: EmailOutbox) -> None:
+        if row.Kind in SECRET_KINDS:
+            row.Subject = REDACTED_SUBJECT
+            row.HtmlBody = ""
+
+    def _mark_sent(self, row: EmailOutbox, send_seconds: float) -> None:
+        row.Status = STATUS_SENT
+        row.Attempts += 1
+        row.SentAt = func.now()
+        row.LastError = None
+        self._redact(row)
+        with self._stats_lock:
+            self.sent_total += 1
+            self._send_seconds.append(send_seconds)
+
+    def _schedule_retry(self, row: EmailOutbox, error: Exception) -> None:
+        row.Attempts += 1
+        row.LastError = str(error)
+        if row.Attempts >= config.EMAIL_MAX_ATTEMPTS:
+            row.Status = STATUS_FAILED
+            self._redact(row)
+            with self._stats_lock:
+                self.failed_total += 1
+            logger.error(
+                "Giving up on %s email to %s after %d attempts: %s",
+                row.Kind, row.Recipient, row.Attempts, error,
+                extra={"outbox_id": row.OutboxID}
+            )
+        else:
+            backoff = config.EMAIL_RETRY_BASE_SECONDS * (2 ** (row.Attempts - 1))
+            row.NextAttemptAt = func.now() + timedelta(seconds=backoff)
+
+    def latency_stats(self) -> dict:
+        with self._stats_lock:
+            samples = sorted(self._send_seconds)
+            stats = {
+                "sent_total": self.sent_total,
+                "failed_total": self.failed_total,
+                "batches_total": self.batches_total,
+            }
+        if samples:
+            stats["send_seconds_p50"] = samples[len(samples) // 2]
+            stats["send_seconds_p95"] = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+            stats["send_seconds_max"] = samples[-1]
+        return stats
+
+
+outbox_sender = OutboxSender(smtp_pool)
+
+
+def get_delivery(db: Session, outbox_id: int) -> Optional[EmailOutbox]:
+    return db.query(EmailOutbox).filter(EmailOutbox.OutboxID == outbox_id).first()
+
+
+def get_outbox_stats(db: Session) -> dict:
+    """
+    Queue depth from the database plus send latency of this process's sender.
+    """
+    queue_depth, oldest_age = db.query(
+        func.count(EmailOutbox.OutboxID),
+        func.extract("epoch", func.now() - func.min(EmailOutbox.CreatedAt))
+    ).filter(EmailOutbox.Status == STATUS_PENDING).one()
+    failed = db.query(func.count(EmailOutbox.OutboxID)).filter(EmailOutbox.Status == STATUS_FAILED).scalar()
+
+    return {
+        "queue_depth": queue_depth or 0,
+        "failed": failed or 0,
+        "oldest_pending_age_seconds": float(oldest_age) if oldest_age is not None else None,
+        **outbox_sender.latency_stats(),
+    }
@@ -0,0 +1,72 @@
+# app/services/fake_ai_service.py
+"""
+Stand-in for the Gemini model, selected with AI_BACKEND=fake.
+
+Answers every prompt with one JSON object holding all the keys our prompts ask
+for, after a fixed delay that mimics the real API. Scores are derived from a
+hash of the prompt, so the same input always gets the same answer.
+"""
+import hashlib
+import json
+import re
+import time
+
+from app.core import config
+
+_EMAIL_PATTERN = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+_PHONE_PATTERN = re.compile(r"\+?\d[\d ()-]{6,}\d")
+_RESUME_MARKER = "--- RESUME TEXT ---"
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeGenerativeModel:
+    def __init__(self, latency_seconds: float):
+        self.latency_seconds = latency_seconds
+
+    def generate_content(self, prompt: str) -> FakeResponse:
+        if self.latency_seconds > 0:
+            time.sleep(self.latency_seconds)
+
+        digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+        score = digest[0] % 101
+
+        # Identity fields come from the resume part of the prompt, as the real model would do.
+        resume_text = prompt.split(_RESUME_MARKER, 1)[-1]
+        email_match = _EMAIL_PATTERN.search(resume_text)
+        phone_match = _PHONE_PATTERN.search(resume_text)
+        name = ""
+        for line in resume_text.splitlines():
+            if line.strip() and not line.strip().startswith("---"):
+                name = line.strip()[:100]
+                break
+
+        payload = {
+            "match_score": score,
+            "score_details": {
+                "skills_match": digest[1] % 101,
+                "experience_match": digest[2] % 101,
+                "education_match": digest[3] % 101,
+            },
+            "resume_summary": "Synthetic summary generated by the fake AI backend.",
+            "technical_skills_summary": "Synthetic skills summary generated by the fake AI backend.",
+            "extracted_email": email_match.group(0) if email_match else "",
+            "extracted_name": name,
+            "extracted_phone": phone_match.group(0) if phone_match else "",
+            "extracted_skills": ["Python", "SQL", "Docker"][: 1 + digest[4] % 3],
+            "job_description": "## About the role\nSynthetic job description generated by the fake AI backend.",
+            "reason": "Synthetic reasoning generated by the fake AI backend.",
+            "match_summary": "Synthetic match summary generated by the fake AI backend.",
+            "summary": "Synthetic insights generated by the fake AI backend.",
+            "strengths": ["Synthetic strength"],
+            "weaknesses": ["Synthetic weakness"],
+            "interview_questions": ["Synthetic interview question?"],
+        }
+        return FakeResponse("```json\n" + json.dumps(payload) + "\n```")
+
+
+def create_model() -> FakeGenerativeModel:
+    return FakeGenerativeModel(config.AI_FAKE_LATENCY_SECONDS)
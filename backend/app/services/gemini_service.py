@@ -1,17 +1,61 @@
 # backend/app/services/gemini_service.py
-import google.generativeai as genai
 import json
+import logging
 import re
+import threading
 from typing import List
 from app.core.config import GEMINI_API_KEY
+from app.core import config, metrics
 
-# Configure the Gemini API client
-try:
-    genai.configure(api_key=GEMINI_API_KEY)
-    model = genai.GenerativeModel('gemini-1.5-flash')
-except Exception as e:
-    print(f"FATAL: Error configuring Gemini AI: {e}")
-    model = None
+logger = logging.getLogger(__name__)
+
+MODEL_NAME = "gemini-1.5-flash"
+
+# The Gemini SDK takes most of a second to import, so it is loaded and the
+# client configured on first use (or by warm_up() at startup), not at import.
+_model = None
+_model_configured = False
+_model_lock = threading.Lock()
+
+def get_model():
+    """
+    Returns the configured model, or None if the client could not be configured.
+    """
+    global _model, _model_configured
+    if _model_configured:
+        return _model
+    with _model_lock:
+        if not _model_configured:
+            try:
+                if config.AI_BACKEND == "fake":
+                    from app.services import fake_ai_service
+                    _model = fake_ai_service.create_model()
+                else:
+                    import google.generativeai as genai
+                    genai.configure(api_key=GEMINI_API_KEY)
+                    _model = genai.GenerativeModel(MODEL_NAME)
+            except Exception as e:
+                logger.critical("Error configuring Gemini AI: %s", e)
+                _model = None
+            _model_configured = True
+    return _model
+
+def model_name() -> str:
+    """
+    Name of the model that answers prompts, recorded with stored AI results.
+    """
+    return "fake" if config.AI_BACKEND == "fake" else MODEL_NAME
+
+def warm_up() -> None:
+    get_model()
+
+def _generate(operation: str, prompt: str):
+    """
+    Sends a prompt to Gemini, recording call count and latency per operation.
+    """
+    model = get_model()
+    with metrics.ai_call(operation):
+        return model.generate_content(prompt)
 
 def _clean_and_parse_json(response_text: str) -> dict:
     """
@@ -33,7 +77,7 @@ def analyze_resume_with_job_desc(resume_text: str, job_description: str) -> dict
     Calls the Gemini API to analyze a resume against a job description
     and returns a structured dictionary including a list of skills.
     """
-    if model is None:
+    if get_model() is None:
         raise ConnectionError("Gemini AI model is not configured. Check your API key and configuration.")
 
     prompt = f"""
@@ -47,6 +91,7 @@ def analyze_resume_with_job_desc(resume_text: str, job_description: str) -> dict
     - "technical_skills_summary": A brief paragraph summarizing the key technologies mentioned in the resume.
     - "extracted_email": The candidate's email address found in the resume. If not found, use an empty string "".
     - "extracted_name": The candidate's full name found in the resume. If not found, use an empty string "".
+    - "extracted_phone": The candidate's phone number found in the resume. If not found, use an empty string "".
     - "extracted_skills": An array of strings listing all technical skills found in the resume (e.g., ["Python", "React", "SQL", "Docker"]).
 
     --- JOB DESCRIPTION ---
@@ -59,7 +104,7 @@ def analyze_resume_with_job_desc(resume_text: str, job_description: str) -> dict
     """
     
     try:
-        response = model.generate_content(prompt)
+        response = _generate("analyze_resume", prompt)
         return _clean_and_parse_json(response.text)
     except Exception as e:
         raise ConnectionError(f"An error occurred with the Gemini API: {e}")
@@ -68,7 +113,7 @@ def generate_job_description(title: str, skills: List[str], experience: str) ->
     """
     Generates a job description using AI based on provided details.
     """
-    if model is None:
+    if get_model() is None:
         raise ConnectionError("Gemini AI model is not configured.")
 
     skills_str = ", ".join(skills)
@@ -94,7 +139,55 @@ def generate_job_description(title: str, skills: List[str], experience: str) ->
     """
     
     try:
-        response = model.generate_content(prompt)
+        response = _generate("generate_jd", prompt)
         return _clean_and_parse_json(response.text)
     except Exception as e:
-        raise ConnectionError(f"An error occurred during JD generation: {e}")
\ No newline at end of file
+        raise ConnectionError(f"An error occurred during JD generation: {e}")
+
+def get_ai_insights(resume_text: str, job_description: str) -> dict:
+    """
+    Asks Gemini for a recruiter's view of a candidate against a job: a summary,
+    strengths, weaknesses and interview questions.
+    """
+    if get_model() is None:
+        raise ConnectionError("Gemini AI model is not configured.")
+
+    prompt = f"""
+    Act as an expert HR technical recruiter preparing a hiring manager for an interview.
+    Assess the candidate below against the job description.
+    Your response must be a single, valid JSON object and nothing else.
+
+    The JSON object must have the following keys:
+    - "summary": A 2-3 sentence assessment of how well the candidate fits the role.
+    - "strengths": An array of 3-5 short strings, the candidate's strengths for this role.
+    - "weaknesses": An array of 2-4 short strings, gaps or risks relative to the job requirements.
+    - "interview_questions": An array of 3-5 interview questions that probe those strengths and gaps.
+
+    --- JOB DESCRIPTION ---
+    {job_description}
+
+    --- RESUME TEXT ---
+    {resume_text}
+
+    --- JSON OUTPUT ---
+    """
+
+    try:
+        response = _generate("insights", prompt)
+        result = _clean_and_parse_json(response.text)
+    except Exception as e:
+        raise ConnectionError(f"An error occurred with the Gemini API: {e}")
+    return {
+        "summary": str(result.get("summary", "")),
+        "strengths": [str(item) for item in result.get("strengths") or []],
+        "weaknesses": [str(item) for item in result.get("weaknesses") or []],
+        "interview_questions": [str(item) for item in result.get("interview_questions") or []],
+    }
+
+def get_text_response(prompt: str, operation: str = "rediscovery") -> str:
+    """
+    Sends a free-form prompt and returns the raw response text; the caller parses it.
+    """
+    if get_model() is None:
+        raise ConnectionError("Gemini AI model is not configured.")
+    return _generate(operation, prompt).text
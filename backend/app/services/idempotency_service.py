@@ -0,0 +1,144 @@
+# backend/app/services/idempotency_service.py
+"""
+Idempotency keys for expensive, non-repeatable requests (resume uploads).
+
+The first request with a key claims it by inserting an InProgress row in its
+own short transaction; the primary key makes the claim atomic across workers.
+When it succeeds its response is stored, and any retry with the same key gets
+that response back without running again. A retry that arrives while the
+first one is still running sees InProgress and waits (see the idempotent()
+dependency). If the first request fails, its claim is released so a retry can
+run; a claim whose owner died is taken over after IDEMPOTENCY_LOCK_SECONDS.
+"""
+import hashlib
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Iterable, Optional
+
+from sqlalchemy.exc import IntegrityError
+
+from app.core import config
+from app.database.session import SessionLocal
+from app.database.models.idempotency_key import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+STATUS_IN_PROGRESS = "InProgress"
+STATUS_COMPLETED = "Completed"
+
+# begin() outcomes
+STARTED = "started"
+REPLAY = "replay"
+IN_PROGRESS = "in_progress"
+
+
+class KeyReused(Exception):
+    """
+    The key was already used for a different request.
+    """
+
+
+@dataclass
+class Claim:
+    state: str
+    response_status: Optional[int] = None
+    response_body: Any = None
+
+
+def request_hash(parts: Iterable[bytes]) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        # Length-prefixed, so ("ab", "c") and ("a", "bc") differ.
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+def begin(user_id: int, key: str, scope: str, fingerprint: str) -> Claim:
+    """
+    Claims `key` for this request, or reports what the earlier request with it did.
+    """
+    now = datetime.utcnow()
+    db = SessionLocal()
+    try:
+        # Expired keys of this user are dropped first, so they can be reused.
+        db.query(IdempotencyKey).filter(
+            IdempotencyKey.UserID == user_id,
+            IdempotencyKey.ExpiresAt <= now
+        ).delete(synchronize_session=False)
+        db.commit()
+        db.add(IdempotencyKey(
+            UserID=user_id, Key=key, Scope=scope, RequestHash=fingerprint,
+            Status=STATUS_IN_PROGRESS, CreatedAt=now, UpdatedAt=now,
+            ExpiresAt=now + timedelta(hours=config.IDEMPOTENCY_KEY_TTL_HOURS)
+        ))
+        try:
+            db.commit()
+            return Claim(STARTED)
+        except IntegrityError:
+            db.rollback()
+
+        existing = db.query(IdempotencyKey).filter(
+            IdempotencyKey.UserID == user_id, IdempotencyKey.Key == key
+        ).first()
+        if existing is None:
+            # Released between our insert and this read; the caller simply retries.
+            return Claim(IN_PROGRESS)
+        if existing.Scope != scope or existing.RequestHash != fingerprint:
+            raise KeyReused()
+        if existing.Status == STATUS_COMPLETED:
+            return Claim(REPLAY, existing.ResponseStatus, existing.ResponseBody)
+
+        stale_before = now - timedelta(seconds=config.IDEMPOTENCY_LOCK_SECONDS)
+        if existing.UpdatedAt is not None and existing.UpdatedAt <= stale_before:
+            # The owner never finished (worker killed mid-request). Compare-and-set
+            # on UpdatedAt, so only one of several waiters takes over.
+            taken = db.query(IdempotencyKey).filter(
+                IdempotencyKey.UserID == user_id,
+                IdempotencyKey.Key == key,
+                IdempotencyKey.Status == STATUS_IN_PROGRESS,
+                IdempotencyKey.UpdatedAt == existing.UpdatedAt
+            ).update({"UpdatedAt": now}, synchronize_session=False)
+            db.commit()
+            if taken:
+                logger.warning("Took over stale idempotency key of user %s", user_id)
+                return Claim(STARTED)
+        return Claim(IN_PROGRESS)
+    finally:
+        db.close()
+
+
+def complete(user_id: int, key: str, response_status: int, response_body: Any) -> None:
+    """
+    Stores the response of the request that holds the claim.
+    """
+    db = SessionLocal()
+    try:
+        db.query(IdempotencyKey).filter(
+            IdempotencyKey.UserID == user_id, IdempotencyKey.Key == key
+        ).update({
+            "Status": STATUS_COMPLETED,
+            "ResponseStatus": response_status,
+            "ResponseBody": response_body,
+            "UpdatedAt": datetime.utcnow(),
+        }, synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def release(user_id: int, key: str) -> None:
+    """
+    Drops an unfinished claim, so a retry runs the request again.
+    """
+    db = SessionLocal()
+    try:
+        db.query(IdempotencyKey).filter(
+            IdempotencyKey.UserID == user_id,
+            IdempotencyKey.Key == key,
+            IdempotencyKey.Status == STATUS_IN_PROGRESS
+        ).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
@@ -0,0 +1,177 @@
+# app/services/insights_service.py
+"""
+AI insights of job applications, generated once and stored.
+
+A stored insight records hashes of the resume summary and the job description
+it was generated from, with the prompt version and the model. It is served as
+long as those still match, and regenerated on the first view after one of them
+changes. Nothing has to be invalidated on write.
+
+Concurrent views of the same application with the same inputs share one AI
+call: the first becomes the leader and generates, the others wait for its
+result (or its error). If the leader was turned away by its own quota or
+concurrency limit, a waiting view tries again itself. This is per process. A leader re-reads the stored
+insight before calling the AI, so a view in another worker that finished first
+is reused, and two workers that race both store the same answer.
+"""
+import hashlib
+import logging
+import threading
+from concurrent.futures import Future
+from contextlib import AbstractContextManager
+from datetime import datetime
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.database.models.application_insight import ApplicationInsight
+from app.database.models.candidate import Candidate, JobApplication
+from app.database.models.job import JobPosting
+from app.database.session import SessionLocal
+from app.services import gemini_service
+
+logger = logging.getLogger(__name__)
+
+# Bump when the insights prompt changes meaningfully; stored insights are then regenerated.
+PROMPT_VERSION = "1"
+
+
+class InsightInputs(NamedTuple):
+    """
+    Everything a stored insight depends on.
+    """
+    prompt_version: str
+    model: str
+    summary_hash: str
+    description_hash: str
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def insight_inputs(resume_summary: str, job_description: str) -> InsightInputs:
+    return InsightInputs(PROMPT_VERSION, gemini_service.model_name(), _sha256(resume_summary), _sha256(job_description))
+
+
+def _stored_inputs(insight: ApplicationInsight) -> InsightInputs:
+    return InsightInputs(insight.PromptVersion, insight.Model, insight.SummaryHash, insight.DescriptionHash)
+
+
+def load_application(db: Session, application_id: int):
+    """
+    The application's resume summary, job description and stored insight, in
+    one query. None if the application does not exist; CandidateID or JobID is
+    None if the candidate or job is missing.
+    """
+    return db.query(
+        JobApplication.ApplicationID,
+        Candidate.CandidateID,
+        Candidate.ResumeSummary,
+        JobPosting.JobID,
+        JobPosting.Description,
+        ApplicationInsight,
+    ).outerjoin(
+        Candidate, Candidate.CandidateID == JobApplication.CandidateID
+    ).outerjoin(
+        JobPosting, JobPosting.JobID == JobApplication.JobID
+    ).outerjoin(
+        ApplicationInsight, ApplicationInsight.ApplicationID == JobApplication.ApplicationID
+    ).filter(JobApplication.ApplicationID == application_id).first()
+
+
+def current_insights(insight: Optional[ApplicationInsight], inputs: InsightInputs) -> Optional[dict]:
+    """
+    The stored insights if they were generated from `inputs`, else None.
+    """
+    if insight is None or _stored_inputs(insight) != inputs:
+        return None
+    return insight.Insights
+
+
+def _store(db: Session, application_id: int, inputs: InsightInputs, insights: dict) -> None:
+    statement = insert(ApplicationInsight).values(
+        ApplicationID=application_id,
+        Insights=insights,
+        SummaryHash=inputs.summary_hash,
+        DescriptionHash=inputs.description_hash,
+        PromptVersion=inputs.prompt_version,
+        Model=inputs.model,
+        GeneratedAt=datetime.utcnow(),
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[ApplicationInsight.ApplicationID],
+        set_={
+            "Insights": statement.excluded.Insights,
+            "SummaryHash": statement.excluded.SummaryHash,
+            "DescriptionHash": statement.excluded.DescriptionHash,
+            "PromptVersion": statement.excluded.PromptVersion,
+            "Model": statement.excluded.Model,
+            "GeneratedAt": statement.excluded.GeneratedAt,
+        }
+    )
+    db.execute(statement)
+    db.commit()
+
+
+# In-flight generations: (ApplicationID, inputs) -> the leader's result.
+_in_flight: Dict[Tuple[int, InsightInputs], Future] = {}
+_in_flight_lock = threading.Lock()
+
+
+def generate_insights(
+    application_id: int,
+    resume_summary: str,
+    job_description: str,
+    inputs: InsightInputs,
+    ai_slot: Callable[[], AbstractContextManager],
+) -> dict:
+    """
+    Generates, stores and returns the insights of an application, or waits for
+    the identical generation already in flight. Only the leader enters
+    `ai_slot()` (the caller's quota and concurrency limit) around the AI call.
+    Uses its own session, so the caller can release theirs first.
+    """
+    key = (application_id, inputs)
+    while True:
+        with _in_flight_lock:
+            future = _in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = _in_flight[key] = Future()
+        if leader:
+            break
+        try:
+            return future.result()
+        except HTTPException:
+            # The leader's 429 or 503 came from its own quota or limit, not this
+            # caller's: try again, as the leader if no one else took over.
+            continue
+
+    try:
+        db = SessionLocal()
+        try:
+            stored = db.query(ApplicationInsight).filter(ApplicationInsight.ApplicationID == application_id).first()
+            insights = current_insights(stored, inputs)
+            if insights is None:
+                with ai_slot():
+                    insights = gemini_service.get_ai_insights(resume_text=resume_summary, job_description=job_description)
+                _store(db, application_id, inputs, insights)
+        finally:
+            db.close()
+    except BaseException as e:
+        _finish(key)
+        future.set_exception(e)
+        raise
+    else:
+        _finish(key)
+        future.set_result(insights)
+        return insights
+
+
+def _finish(key: Tuple[int, InsightInputs]) -> None:
+    # Before the waiters wake up, so one that retries starts a new generation.
+    with _in_flight_lock:
+        del _in_flight[key]
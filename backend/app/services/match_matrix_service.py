@@ -0,0 +1,193 @@
+# app/services/match_matrix_service.py
+import logging
+from datetime import datetime
+from typing import List
+from sqlalchemy import TIMESTAMP, Integer, func, literal, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.logging_config import job_id_var
+from app.database.session import SessionLocal
+from app.database.models import candidate as candidate_model
+from app.database.models import job as job_model
+from app.database.models import skill as skill_model
+from app.database.models.match import JobCandidateMatch
+
+logger = logging.getLogger(__name__)
+
+# The matrix is skill-only: a row's Score is the share of the job's required
+# skills the candidate has. Resume text and job descriptions play no part (the
+# AI MatchScore on JobApplications covers those), so rows are rewritten only when
+# skill links change: a job's required skills, a candidate's skills, or a merge.
+
+# Bump this whenever the scoring below changes; rows written by an older
+# version are ignored by reads until rebuild_match_matrix() rewrites them.
+MATCH_SCORE_VERSION = 1
+
+_MATCH_COLUMNS = ["JobID", "CandidateID", "Score", "MatchedSkills", "RequiredSkills", "ScoreVersion", "ScoredAt"]
+
+
+def _upsert_from_select(db: Session, rows_select) -> None:
+    stmt = insert(JobCandidateMatch).from_select(_MATCH_COLUMNS, rows_select)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["JobID", "CandidateID"],
+        set_={
+            "Score": stmt.excluded.Score,
+            "MatchedSkills": stmt.excluded.MatchedSkills,
+            "RequiredSkills": stmt.excluded.RequiredSkills,
+            "ScoreVersion": stmt.excluded.ScoreVersion,
+            "ScoredAt": stmt.excluded.ScoredAt,
+        }
+    )
+    db.execute(stmt)
+
+
+def rescore_job(job_id: int, db: Session) -> None:
+    """
+    Rewrites the matrix rows of one job (after its required skills changed).
+    Scoring runs entirely inside the database as a single INSERT ... SELECT.
+    """
+    JobRequiredSkill = skill_model.JobRequiredSkill
+    CandidateSkill = skill_model.CandidateSkill
+    scored_at = datetime.utcnow()
+
+    required = db.query(func.count()).select_from(JobRequiredSkill).filter(
+        JobRequiredSkill.c.JobID == job_id
+    ).scalar() or 0
+
+    if required:
+        matched = func.count(CandidateSkill.SkillID)
+        rows_select = select(
+            literal(job_id, Integer),
+            CandidateSkill.CandidateID,
+            matched * 100.0 / required,
+            matched,
+            literal(required, Integer),
+            literal(MATCH_SCORE_VERSION, Integer),
+            literal(scored_at, TIMESTAMP)
+        ).join(
+            JobRequiredSkill, JobRequiredSkill.c.SkillID == CandidateSkill.SkillID
+        ).where(
+            JobRequiredSkill.c.JobID == job_id
+        ).group_by(CandidateSkill.CandidateID)
+        _upsert_from_select(db, rows_select)
+
+    # Anything not rewritten in this pass no longer matches the job.
+    db.query(JobCandidateMatch).filter(
+        JobCandidateMatch.JobID == job_id,
+        JobCandidateMatch.ScoredAt < scored_at
+    ).delete(synchronize_session=False)
+    db.commit()
+
+
+def rescore_candidate(candidate_id: int, db: Session) -> None:
+    """
+    Rewrites the matrix rows of one candidate (after their skills changed).
+    """
+    JobRequiredSkill = skill_model.JobRequiredSkill
+    CandidateSkill = skill_model.CandidateSkill
+    scored_at = datetime.utcnow()
+
+    required_per_job = select(
+        JobRequiredSkill.c.JobID,
+        func.count().label("required")
+    ).group_by(JobRequiredSkill.c.JobID).subquery()
+
+    matched_per_job = select(
+        JobRequiredSkill.c.JobID,
+        func.count().label("matched")
+    ).join(
+        CandidateSkill, CandidateSkill.SkillID == JobRequiredSkill.c.SkillID
+    ).where(
+        CandidateSkill.CandidateID == candidate_id
+    ).group_by(JobRequiredSkill.c.JobID).subquery()
+
+    rows_select = select(
+        matched_per_job.c.JobID,
+        literal(candidate_id, Integer),
+        matched_per_job.c.matched * 100.0 / required_per_job.c.required,
+        matched_per_job.c.matched,
+        required_per_job.c.required,
+        literal(MATCH_SCORE_VERSION, Integer),
+        literal(scored_at, TIMESTAMP)
+    ).join(required_per_job, required_per_job.c.JobID == matched_per_job.c.JobID)
+    _upsert_from_select(db, rows_select)
+
+    db.query(JobCandidateMatch).filter(
+        JobCandidateMatch.CandidateID == candidate_id,
+        JobCandidateMatch.ScoredAt < scored_at
+    ).delete(synchronize_session=False)
+    db.commit()
+
+
+def rebuild_match_matrix(db: Session) -> None:
+    """
+    Rescores every job. Only needed after MATCH_SCORE_VERSION is bumped.
+    """
+    for (job_id,) in db.query(job_model.JobPosting.JobID).order_by(job_model.JobPosting.JobID).all():
+        rescore_job(job_id, db)
+
+
+# --- Background task entry points ---
+# These run after the response is sent (FastAPI BackgroundTasks), so they open
+# their own session instead of reusing the request's one.
+
+def rescore_job_in_background(job_id: int) -> None:
+    token = job_id_var.set(job_id)
+    db = SessionLocal()
+    try:
+        rescore_job(job_id, db)
+    except Exception:
+        db.rollback()
+        logger.exception("Rescoring matches for job %s failed", job_id)
+    finally:
+        db.close()
+        job_id_var.reset(token)
+
+
+def rescore_candidate_in_background(candidate_id: int) -> None:
+    db = SessionLocal()
+    try:
+        rescore_candidate(candidate_id, db)
+    except Exception:
+        db.rollback()
+        logger.exception("Rescoring matches for candidate %s failed", candidate_id)
+    finally:
+        db.close()
+
+
+# --- Reads ---
+
+def top_matches_for_job(job_id: int, db: Session, limit: int = 50) -> List[dict]:
+    rows = db.query(
+        JobCandidateMatch.CandidateID,
+        candidate_model.Candidate.FullName,
+        JobCandidateMatch.Score,
+        JobCandidateMatch.MatchedSkills,
+        JobCandidateMatch.RequiredSkills,
+        JobCandidateMatch.ScoredAt
+    ).join(
+        candidate_model.Candidate, candidate_model.Candidate.CandidateID == JobCandidateMatch.CandidateID
+    ).filter(
+        JobCandidateMatch.JobID == job_id,
+        JobCandidateMatch.ScoreVersion == MATCH_SCORE_VERSION
+    ).order_by(JobCandidateMatch.Score.desc(), JobCandidateMatch.CandidateID).limit(limit).all()
+    return [row._asdict() for row in rows]
+
+
+def best_jobs_for_candidate(candidate_id: int, db: Session, limit: int = 20) -> List[dict]:
+    rows = db.query(
+        JobCandidateMatch.JobID,
+        job_model.JobPosting.JobTitle,
+        job_model.JobPosting.Status,
+        JobCandidateMatch.Score,
+        JobCandidateMatch.MatchedSkills,
+        JobCandidateMatch.RequiredSkills,
+        JobCandidateMatch.ScoredAt
+    ).join(
+        job_model.JobPosting, job_model.JobPosting.JobID == JobCandidateMatch.JobID
+    ).filter(
+        JobCandidateMatch.CandidateID == candidate_id,
+        JobCandidateMatch.ScoreVersion == MATCH_SCORE_VERSION
+    ).order_by(JobCandidateMatch.Score.desc(), JobCandidateMatch.JobID).limit(limit).all()
+    return [row._asdict() for row in rows]
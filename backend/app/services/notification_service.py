@@ -1,97 +1,165 @@
 # backend/app/services/notification_service.py
+import logging
 import os
 import random
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from email.utils import formataddr
-from jinja2 import Environment, FileSystemLoader
+import threading
+from typing import TYPE_CHECKING, Dict, List, Optional
+from sqlalchemy.orm import Session
 
 from app.core import config
+from app.services import email_service
+from app.database.models.email_outbox import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+if TYPE_CHECKING:
+    from jinja2 import Environment, Template
 
 template_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'templates')
-env = Environment(loader=FileSystemLoader(template_dir))
+
+# The Jinja environment is built on first use (or by warm_templates() at startup).
+_env: Optional["Environment"] = None
+_env_lock = threading.Lock()
+
+# Compiled templates by name, filled by warm_templates() or on first render.
+_templates: Dict[str, "Template"] = {}
+
+def get_env() -> "Environment":
+    global _env
+    if _env is None:
+        with _env_lock:
+            if _env is None:
+                from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+                os.makedirs(config.EMAIL_TEMPLATE_CACHE_DIR, exist_ok=True)
+                _env = Environment(
+                    loader=FileSystemLoader(template_dir),
+                    bytecode_cache=FileSystemBytecodeCache(config.EMAIL_TEMPLATE_CACHE_DIR),
+                    auto_reload=config.EMAIL_TEMPLATE_AUTO_RELOAD
+                )
+    return _env
+
+def warm_templates() -> None:
+    """
+    Compiles every email template once (or loads it from the bytecode cache).
+    """
+    env = get_env()
+    for name in env.list_templates(extensions=["html"]):
+        _templates[name] = env.get_template(name)
+
+def get_template(name: str) -> "Template":
+    template = _templates.get(name)
+    if template is None or config.EMAIL_TEMPLATE_AUTO_RELOAD:
+        template = _templates[name] = get_env().get_template(name)
+    return template
+
+def render_bulk(template_name: str, shared: dict, recipients: List[dict], per_recipient_fields: List[str]) -> List[str]:
+    """
+    Renders one template for many recipients.
+
+    The template is rendered a single time with the shared context and a unique
+    marker for each per-recipient field; each recipient's body is then just the
+    static chunks joined with their own values. Per-recipient fields must only be
+    printed ({{ field }}), not used in conditions or filters.
+    """
+    markers = {field: f"\x00{field}\x00" for field in per_recipient_fields}
+    rendered = get_template(template_name).render(**shared, **markers)
+
+    # Split into [static, field, static, field, ..., static].
+    parts = [rendered]
+    for field, marker in markers.items():
+        split_parts = []
+        for part in parts:
+            if isinstance(part, tuple):
+                split_parts.append(part)
+                continue
+            pieces = part.split(marker)
+            for i, piece in enumerate(pieces):
+                if i:
+                    split_parts.append((field,))
+                split_parts.append(piece)
+        parts = split_parts
+
+    bodies = []
+    for recipient in recipients:
+        bodies.append("".join(
+            str(recipient.get(part[0], "")) if isinstance(part, tuple) else part
+            for part in parts
+        ))
+    return bodies
 
 def generate_otp(length: int = 6) -> str:
     return "".join([str(random.randint(0, 9)) for _ in range(length)])
 
-def send_otp_email(recipient_email: str, otp: str) -> bool:
-    if not all([config.SMTP_SERVER, config.EMAIL_SENDER_ADDRESS, config.EMAIL_HOST_USER, config.EMAIL_HOST_PASSWORD]):
-        print("❌ ERROR: Email environment variables are not set. Cannot send OTP email.")
-        return False
+# All emails go through the outbox: these functions render the template and queue
+# the message in the caller's transaction, and the background sender delivers it
+# once that transaction commits. The returned row's OutboxID is the delivery id
+# for status lookups.
+
+def send_otp_email(db: Session, recipient_email: str, otp: str) -> Optional[EmailOutbox]:
+    # The code is in the subject and body; the sender blanks both once the row
+    # is Sent or Failed (email_service.SECRET_KINDS).
+    if not email_service.is_email_configured():
+        logger.error("Email environment variables are not set. Cannot send OTP email.")
+        return None
     
     try:
-        template = env.get_template("otp_email.html")
+        template = get_template("otp_email.html")
         html_content = template.render(otp_code=otp)
-        message = MIMEMultipart("alternative")
-        message["Subject"] = f"Your Staffing Tool Verification Code is {otp}"
-        message["From"] = formataddr((config.EMAIL_SENDER_NAME, config.EMAIL_SENDER_ADDRESS))
-        message["To"] = recipient_email
-        message.attach(MIMEText(html_content, "html"))
-        
-        with smtplib.SMTP(config.SMTP_SERVER, config.SMTP_PORT) as server:
-            server.starttls()
-            server.login(config.EMAIL_HOST_USER, config.EMAIL_HOST_PASSWORD)
-            server.sendmail(config.EMAIL_SENDER_ADDRESS, recipient_email, message.as_string())
-        
-        print(f"✅ OTP email sent successfully to {recipient_email}")
-        return True
+        return email_service.enqueue_email(
+            db,
+            recipient_email=recipient_email,
+            subject=f"Your Staffing Tool Verification Code is {otp}",
+            html_content=html_content,
+            kind="otp",
+            priority=email_service.PRIORITY_URGENT
+        )
     except Exception as e:
-        print(f"❌ FATAL: Failed to send OTP email. Error: {e}")
-        return False
+        logger.exception("Failed to queue OTP email")
+        return None
 
-def send_welcome_email(recipient_email: str, user_name: str, user_role: str) -> bool:
-    if not all([config.SMTP_SERVER, config.EMAIL_SENDER_ADDRESS, config.EMAIL_HOST_USER, config.EMAIL_HOST_PASSWORD]):
-        print("❌ ERROR: Email environment variables are not set. Cannot send welcome email.")
-        return False
+def send_welcome_email(db: Session, recipient_email: str, user_name: str, user_role: str) -> Optional[EmailOutbox]:
+    if not email_service.is_email_configured():
+        logger.error("Email environment variables are not set. Cannot send welcome email.")
+        return None
     
     login_url = "http://localhost:5173/login"
         
     try:
-        template = env.get_template("welcome_email.html")
+        template = get_template("welcome_email.html")
         html_content = template.render(user_name=user_name, user_role=user_role, login_url=login_url)
-        message = MIMEMultipart("alternative")
-        message["Subject"] = "Welcome to the Staffing Tool!"
-        message["From"] = formataddr((config.EMAIL_SENDER_NAME, config.EMAIL_SENDER_ADDRESS))
-        message["To"] = recipient_email
-        message.attach(MIMEText(html_content, "html"))
-
-        with smtplib.SMTP(config.SMTP_SERVER, config.SMTP_PORT) as server:
-            server.starttls()
-            server.login(config.EMAIL_HOST_USER, config.EMAIL_HOST_PASSWORD)
-            server.sendmail(config.EMAIL_SENDER_ADDRESS, recipient_email, message.as_string())
-        
-        print(f"✅ Welcome email sent successfully to {recipient_email}")
-        return True
+        return email_service.enqueue_email(
+            db,
+            recipient_email=recipient_email,
+            subject="Welcome to the Staffing Tool!",
+            html_content=html_content,
+            kind="welcome"
+        )
     except Exception as e:
-        print(f"❌ FATAL: Failed to send welcome email. Error: {e}")
-        return False
+        logger.exception("Failed to queue welcome email")
+        return None
 
-# --- THIS IS THE NEW FUNCTION ---
-def send_role_update_email(recipient_email: str, user_name: str, new_role: str) -> bool:
+def send_role_update_emails(db: Session, recipients: List[dict]) -> List[EmailOutbox]:
     """
-    Renders the role update email template and sends it to the user.
+    Renders the role update email for each recipient (one template render for
+    all of them) and queues the messages in the email outbox.
+    Each recipient is a dict with "email", "user_name" and "new_role".
     """
-    if not all([config.SMTP_SERVER, config.EMAIL_SENDER_ADDRESS, config.EMAIL_HOST_USER, config.EMAIL_HOST_PASSWORD]):
-        print("❌ ERROR: Email environment variables are not set. Cannot send role update email.")
-        return False
-    
-    try:
-        template = env.get_template("role_update_email.html")
-        html_content = template.render(user_name=user_name, new_role=new_role)
-        message = MIMEMultipart("alternative")
-        message["Subject"] = "Your Role on Staffing Tool Has Been Updated"
-        message["From"] = formataddr((config.EMAIL_SENDER_NAME, config.EMAIL_SENDER_ADDRESS))
-        message["To"] = recipient_email
-        message.attach(MIMEText(html_content, "html"))
-
-        with smtplib.SMTP(config.SMTP_SERVER, config.SMTP_PORT) as server:
-            server.starttls()
-            server.login(config.EMAIL_HOST_USER, config.EMAIL_HOST_PASSWORD)
-            server.sendmail(config.EMAIL_SENDER_ADDRESS, recipient_email, message.as_string())
-        
-        print(f"✅ Role update email sent successfully to {recipient_email}")
-        return True
-    except Exception as e:
-        print(f"❌ FATAL: Failed to send role update email. Error: {e}")
-        return False
\ No newline at end of file
+    if not recipients:
+        return []
+    if not email_service.is_email_configured():
+        logger.error("Email environment variables are not set. Cannot send role update emails.")
+        return []
+    bodies = render_bulk(
+        "role_update_email.html",
+        shared={},
+        recipients=recipients,
+        per_recipient_fields=["user_name", "new_role"]
+    )
+    return email_service.enqueue_bulk(
+        db,
+        [
+            (recipient["email"], "Your Role on Staffing Tool Has Been Updated", body)
+            for recipient, body in zip(recipients, bodies)
+        ],
+        kind="role_update"
+    )
@@ -0,0 +1,281 @@
+# app/services/pipeline_events_service.py
+"""
+Live updates of a job's candidate pipeline, for GET /jobs/{job_id}/applications/events.
+
+Every committed change to a JobApplication becomes one small event carrying
+the application as GET /jobs/{job_id}/applications lists it, so a client
+fetches the list once and then applies the deltas.
+
+Delivery, whichever worker made the change: the job id, event type and
+application id are sent with pg_notify() inside the writing transaction. NOTIFY
+is transactional, so only committed changes go out, and ids alone stay far
+below its 8000-byte payload limit. Each worker process holds one LISTEN
+connection (PipelineListener); for the jobs it has watchers of, it loads the
+applications in one query and hands the events to its broker.
+
+ORM flushes are captured automatically. Code that changes applications with
+bulk UPDATE or DELETE statements (e.g. candidate merges) calls notify() itself.
+
+The broker fans an event out to the watchers of its job. Each watcher has a
+bounded queue, and the event is encoded once for all of them, so a busy job
+with hundreds of watchers costs one put per watcher. A watcher whose queue is
+full is not waited for: its queue is replaced by a single "resync" event, and
+the client refetches the list.
+"""
+import asyncio
+import json
+import logging
+import select
+import threading
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import event, func, select as sql_select
+from sqlalchemy.orm import Session, attributes
+
+from app.core import config, metrics
+from app.database.models.candidate import JobApplication
+from app.database.session import SessionLocal, engine
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "pipeline_events"
+
+EVENT_CREATED = "application.created"
+EVENT_STAGE_CHANGED = "application.stage_changed"
+EVENT_UPDATED = "application.updated"
+EVENT_DELETED = "application.deleted"
+EVENT_RESYNC = "resync" # Events were lost; refetch the list
+
+# The fields of candidate_schema.JobApplication, as GET /jobs/{job_id}/applications returns them.
+_APPLICATION_FIELDS = ("ApplicationID", "JobID", "CandidateID", "MatchScore", "ScoreDetails", "Stage", "AppliedAt")
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def format_sse(event_type: str, data: str) -> str:
+    return f"event: {event_type}\ndata: {data}\n\n"
+
+
+class TooManyWatchers(Exception):
+    pass
+
+
+class PipelineBroker:
+    """
+    Per-process fan-out of pipeline events to the open event streams. Watchers
+    live on the event loop; publish() may be called from any thread.
+    """
+    def __init__(self, max_watchers: int, queue_size: int):
+        self.max_watchers = max_watchers
+        self.queue_size = queue_size
+        self._watchers: Dict[int, Set[asyncio.Queue]] = {}
+        self._count = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def watcher_count(self) -> int:
+        return self._count
+
+    def subscribe(self, job_id: int) -> asyncio.Queue:
+        """
+        Registers a watcher of `job_id`. Must be called on the event loop.
+        """
+        if self._count >= self.max_watchers:
+            metrics.PIPELINE_EVENTS.inc("rejected_watcher")
+            raise TooManyWatchers()
+        self._loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._watchers.setdefault(job_id, set()).add(queue)
+        self._count += 1
+        metrics.PIPELINE_WATCHERS.set(value=self._count)
+        return queue
+
+    def is_watched(self, job_id: int) -> bool:
+        return job_id in self._watchers
+
+    def unsubscribe(self, job_id: int, queue: asyncio.Queue) -> None:
+        watchers = self._watchers.get(job_id)
+        if watchers is None or queue not in watchers:
+            return
+        watchers.discard(queue)
+        if not watchers:
+            del self._watchers[job_id]
+        self._count -= 1
+        metrics.PIPELINE_WATCHERS.set(value=self._count)
+
+    def publish(self, job_id: Optional[int], message: str) -> None:
+        """
+        Queues an encoded SSE message for the watchers of `job_id`, or of every
+        job when `job_id` is None. Thread-safe.
+        """
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return # Nobody has subscribed in this process yet.
+        loop.call_soon_threadsafe(self._dispatch, job_id, message)
+
+    def _dispatch(self, job_id: Optional[int], message: str) -> None:
+        if job_id is None:
+            queues = [queue for watchers in self._watchers.values() for queue in watchers]
+        else:
+            queues = list(self._watchers.get(job_id, ()))
+        for queue in queues:
+            try:
+                queue.put_nowait(message)
+                metrics.PIPELINE_EVENTS.inc("delivered")
+            except asyncio.QueueFull:
+                # Too slow to keep up: drop its backlog and have it refetch.
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(format_sse(EVENT_RESYNC, "{}"))
+                metrics.PIPELINE_EVENTS.inc("overflow")
+
+
+broker = PipelineBroker(config.PIPELINE_EVENTS_MAX_WATCHERS, config.PIPELINE_EVENTS_QUEUE_SIZE)
+
+
+def _load_applications(application_ids: Iterable[int]) -> Dict[int, dict]:
+    db = SessionLocal()
+    try:
+        rows = db.query(*(getattr(JobApplication, name) for name in _APPLICATION_FIELDS)).filter(
+            JobApplication.ApplicationID.in_(application_ids)
+        ).all()
+        return {row.ApplicationID: row._asdict() for row in rows}
+    finally:
+        db.close()
+
+
+def _deliver(payloads: List[str]) -> None:
+    """
+    Hands payloads from the database to the broker. Only events of watched jobs
+    are kept, and their applications are loaded in one query.
+    """
+    events = []
+    for payload in payloads:
+        try:
+            job_id, event_type, application_id = json.loads(payload)
+        except (TypeError, ValueError):
+            logger.warning("Ignoring malformed pipeline event: %.200s", payload)
+            continue
+        if broker.is_watched(job_id):
+            events.append((job_id, event_type, application_id))
+    if not events:
+        return
+
+    applications = _load_applications({application_id for _, event_type, application_id in events if event_type != EVENT_DELETED})
+    for job_id, event_type, application_id in events:
+        if event_type == EVENT_DELETED:
+            data = {"ApplicationID": application_id, "JobID": job_id}
+        else:
+            data = applications.get(application_id)
+            if data is None:
+                continue # Deleted since; its own event follows.
+        broker.publish(job_id, format_sse(event_type, json.dumps(data, default=_json_default, separators=(",", ":"))))
+
+
+# ====================================================================
+# CHANGE CAPTURE
+# ====================================================================
+
+def _application_event(session: Session, instance: JobApplication) -> Optional[str]:
+    if instance in session.new:
+        return EVENT_CREATED
+    if instance in session.deleted:
+        return EVENT_DELETED
+    if not session.is_modified(instance):
+        return None
+    if attributes.get_history(instance, "Stage").has_changes():
+        return EVENT_STAGE_CHANGED
+    return EVENT_UPDATED
+
+
+def notify(session: Session, job_id: int, event_type: str, application_id: int) -> None:
+    """
+    Queues an event in the session's transaction. Delivered by PostgreSQL at
+    commit, to the listener of every worker (this one included); identical
+    events of one transaction are delivered once.
+    """
+    payload = json.dumps([job_id, event_type, application_id], separators=(",", ":"))
+    session.connection().execute(sql_select(func.pg_notify(CHANNEL, payload)))
+
+
+@event.listens_for(Session, "after_flush")
+def _capture_after_flush(session: Session, flush_context) -> None:
+    events = []
+    for instance in list(session.new) + list(session.dirty) + list(session.deleted):
+        if not isinstance(instance, JobApplication):
+            continue
+        event_type = _application_event(session, instance)
+        if event_type is not None:
+            events.append((instance.JobID, event_type, instance.ApplicationID))
+    for job_id, event_type, application_id in events:
+        notify(session, job_id, event_type, application_id)
+
+
+# ====================================================================
+# CROSS-PROCESS DELIVERY
+# ====================================================================
+
+class PipelineListener:
+    """
+    Background thread holding this process's LISTEN connection. The
+    connection is detached from the pool, so it never takes a request's slot. After a lost connection every watcher is told to resync,
+    as events may have been missed meanwhile.
+    """
+
+    def __init__(self):
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="pipeline-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        reconnecting = False
+        while not self._stop.is_set():
+            try:
+                self._listen(resync=reconnecting)
+            except Exception:
+                logger.exception("Pipeline event listener failed; reconnecting")
+            reconnecting = True
+            self._stop.wait(1.0)
+
+    def _listen(self, resync: bool) -> None:
+        connection = engine.connect()
+        connection.detach()
+        try:
+            dbapi_connection = connection.connection.dbapi_connection
+            dbapi_connection.autocommit = True
+            with dbapi_connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {CHANNEL}")
+            if resync:
+                broker.publish(None, format_sse(EVENT_RESYNC, "{}"))
+            while not self._stop.is_set():
+                # Wakes up at least once a second to notice stop().
+                if select.select([dbapi_connection], [], [], 1.0) == ([], [], []):
+                    continue
+                dbapi_connection.poll()
+                payloads = [notification.payload for notification in dbapi_connection.notifies]
+                dbapi_connection.notifies.clear()
+                _deliver(payloads)
+        finally:
+            connection.close()
+
+
+pipeline_listener = PipelineListener()
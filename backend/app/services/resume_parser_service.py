@@ -1,10 +1,25 @@
 # app/services/resume_parser_service.py
 
 import io
-import PyPDF2  # For PDF files
-import docx    # For DOCX files
+
+from app.core import metrics
+
+# PyPDF2 (PDF files) and python-docx (DOCX files) are imported on first use,
+# so workers that never parse a resume do not pay for loading them.
+
+def warm_up() -> None:
+    import PyPDF2  # noqa: F401
+    import docx  # noqa: F401
 
 def extract_text(file_content: bytes, filename: str) -> str:
+    """
+    Extracts text from an in-memory resume file, recording parse time per file type.
+    """
+    file_extension = filename.split('.')[-1].lower()
+    with metrics.PARSER_LATENCY.time(file_extension if file_extension in ('pdf', 'docx') else 'other'), metrics.phase("parse"):
+        return _extract_text(file_content, filename)
+
+def _extract_text(file_content: bytes, filename: str) -> str:
     """
     Extracts text from an in-memory resume file (PDF or DOCX).
 
@@ -22,6 +37,7 @@ def extract_text(file_content: bytes, filename: str) -> str:
     file_extension = filename.split('.')[-1].lower()
     
     if file_extension == 'pdf':
+        import PyPDF2
         try:
             # Read the PDF from the in-memory bytes
             pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_content))
@@ -35,6 +51,7 @@ def extract_text(file_content: bytes, filename: str) -> str:
             raise ValueError(f"Error parsing PDF file: {e}")
 
     elif file_extension == 'docx':
+        import docx
         try:
             # Read the DOCX from the in-memory bytes
             doc = docx.Document(io.BytesIO(file_content))
@@ -0,0 +1,276 @@
+# app/services/skill_index_service.py
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core import config
+from app.database.session import SessionLocal
+from app.database.models import skill as skill_model
+from app.services import table_version_service
+
+logger = logging.getLogger(__name__)
+
+_WORD_BITS = 64
+
+# The TableVersions counter bumped by every write to the candidate skill links.
+_VERSION_TABLE = "CandidateSkills"
+
+# Popcount lookup for every possible byte value, used when numpy has no bitwise_count.
+_POPCOUNT_8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _popcount_rows(words: np.ndarray) -> np.ndarray:
+    """
+    Number of set bits in each row of a 2-D uint64 array.
+    """
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words).sum(axis=1, dtype=np.int64)
+    as_bytes = np.ascontiguousarray(words).view(np.uint8)
+    return _POPCOUNT_8[as_bytes].sum(axis=1, dtype=np.int64)
+
+
+class SkillBitmapIndex:
+    """
+    In-memory index holding one skill bitset per candidate.
+
+    Each skill gets a bit position and each candidate a row in a 2-D uint64 array,
+    so the required-skill coverage of every candidate in the pool is computed with
+    a single vectorized AND + popcount over the array.
+
+    The index is per process. It is loaded at startup and kept current by
+    set_candidate_skills() whenever this process links skills to a candidate.
+    Changes made by other processes are picked up by SkillIndexRefresher, which
+    reloads the index when the CandidateSkills version moved past `version`.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._bit_of_skill: Dict[int, int] = {}
+        self._row_of_candidate: Dict[int, int] = {}
+        self._candidate_ids = np.zeros(0, dtype=np.int64)
+        self._bits = np.zeros((0, 1), dtype=np.uint64)
+        self._size = 0
+        self.loaded = False
+        self.version: Optional[int] = None # CandidateSkills version the index was loaded at
+
+    # --- Building the index ---
+
+    def load(self, db: Session, batch_size: int = 10000) -> None:
+        """
+        (Re)builds the whole index from the CandidateSkills table. The new index is
+        built aside and swapped in, so queries are not held up meanwhile.
+        """
+        # Read first: a change committed during the load then shows up as a newer version.
+        version = current_version(db)
+        rows = db.query(
+            skill_model.CandidateSkill.CandidateID,
+            skill_model.CandidateSkill.SkillID
+        ).order_by(skill_model.CandidateSkill.CandidateID).yield_per(batch_size)
+
+        skills_by_candidate: Dict[int, List[int]] = {}
+        for candidate_id, skill_id in rows:
+            skills_by_candidate.setdefault(candidate_id, []).append(skill_id)
+
+        # Assign every skill its bit up front so the array is allocated once at full width.
+        bit_of_skill: Dict[int, int] = {}
+        for skill_ids in skills_by_candidate.values():
+            for skill_id in skill_ids:
+                bit_of_skill.setdefault(skill_id, len(bit_of_skill))
+        words = max(1, (len(bit_of_skill) + _WORD_BITS - 1) // _WORD_BITS)
+        capacity = max(len(skills_by_candidate), 16)
+
+        fresh = SkillBitmapIndex()
+        fresh._bit_of_skill = bit_of_skill
+        fresh._candidate_ids = np.zeros(capacity, dtype=np.int64)
+        fresh._bits = np.zeros((capacity, words), dtype=np.uint64)
+        for candidate_id, skill_ids in skills_by_candidate.items():
+            fresh._set_row(candidate_id, skill_ids)
+
+        with self._lock:
+            self._bit_of_skill = fresh._bit_of_skill
+            self._row_of_candidate = fresh._row_of_candidate
+            self._candidate_ids = fresh._candidate_ids
+            self._bits = fresh._bits
+            self._size = fresh._size
+            self.version = version
+            self.loaded = True
+        logger.info("Skill index loaded: %d candidates, %d skills", len(skills_by_candidate), len(self._bit_of_skill))
+
+    def set_candidate_skills(self, candidate_id: int, skill_ids: Iterable[int]) -> None:
+        """
+        Replaces the skill set of one candidate. Call after the skill links are committed.
+        """
+        with self._lock:
+            self._set_row(candidate_id, list(skill_ids))
+
+    def _bit_for_skill(self, skill_id: int) -> int:
+        bit = self._bit_of_skill.get(skill_id)
+        if bit is None:
+            bit = len(self._bit_of_skill)
+            self._bit_of_skill[skill_id] = bit
+            words_needed = bit // _WORD_BITS + 1
+            if words_needed > self._bits.shape[1]:
+                extra = np.zeros((self._bits.shape[0], words_needed - self._bits.shape[1]), dtype=np.uint64)
+                self._bits = np.hstack([self._bits, extra])
+        return bit
+
+    def _row_for_candidate(self, candidate_id: int) -> int:
+        row = self._row_of_candidate.get(candidate_id)
+        if row is None:
+            if self._size == len(self._candidate_ids):
+                capacity = max(16, 2 * len(self._candidate_ids))
+                ids = np.zeros(capacity, dtype=np.int64)
+                ids[:self._size] = self._candidate_ids[:self._size]
+                bits = np.zeros((capacity, self._bits.shape[1]), dtype=np.uint64)
+                bits[:self._size] = self._bits[:self._size]
+                self._candidate_ids, self._bits = ids, bits
+            row = self._size
+            self._size += 1
+            self._row_of_candidate[candidate_id] = row
+            self._candidate_ids[row] = candidate_id
+        return row
+
+    def _set_row(self, candidate_id: int, skill_ids: List[int]) -> None:
+        bits = [self._bit_for_skill(skill_id) for skill_id in skill_ids]
+        row = self._row_for_candidate(candidate_id)
+        self._bits[row] = 0
+        for bit in bits:
+            self._bits[row, bit // _WORD_BITS] |= np.uint64(1 << (bit % _WORD_BITS))
+
+    def _mask_for(self, skill_ids: Iterable[int]) -> Tuple[np.ndarray, int]:
+        """
+        Bit mask of the given skills, and how many of them there are. Skills that no
+        candidate has are counted as required but can never be matched.
+        """
+        mask = np.zeros(self._bits.shape[1], dtype=np.uint64)
+        required = 0
+        for skill_id in set(skill_ids):
+            required += 1
+            bit = self._bit_of_skill.get(skill_id)
+            if bit is not None:
+                mask[bit // _WORD_BITS] |= np.uint64(1 << (bit % _WORD_BITS))
+        return mask, required
+
+    # --- Queries ---
+
+    def coverage(self, skill_ids: Iterable[int]) -> Tuple[np.ndarray, np.ndarray, int]:
+        """
+        Returns (candidate_ids, matched_counts, required_count) for every indexed candidate.
+        """
+        with self._lock:
+            mask, required = self._mask_for(skill_ids)
+            candidate_ids = self._candidate_ids[:self._size].copy()
+            if required == 0 or self._size == 0:
+                return candidate_ids, np.zeros(self._size, dtype=np.int64), required
+            matched = _popcount_rows(self._bits[:self._size] & mask)
+        return candidate_ids, matched, required
+
+    def top_k(self, skill_ids: Iterable[int], k: int = 50) -> List[dict]:
+        """
+        The k candidates with the highest required-skill coverage, best first.
+        Candidates matching none of the skills are left out.
+        """
+        candidate_ids, matched, required = self.coverage(skill_ids)
+        if required == 0 or len(candidate_ids) == 0:
+            return []
+
+        k = min(k, len(candidate_ids))
+        top = np.argpartition(-matched, k - 1)[:k]
+        # Highest coverage first; ties within the top k go to the lower (older) CandidateID.
+        top = top[np.lexsort((candidate_ids[top], -matched[top]))]
+        return [
+            {
+                "CandidateID": int(candidate_ids[i]),
+                "matched_skills": int(matched[i]),
+                "required_skills": required,
+                "coverage": float(matched[i]) / required,
+            }
+            for i in top if matched[i] > 0
+        ]
+
+    def score(self, candidate_id: int, skill_ids: Iterable[int]) -> Optional[float]:
+        """
+        Required-skill coverage (0.0 - 1.0) of one candidate, or None if the
+        candidate is not in the index or no skills are required.
+        """
+        with self._lock:
+            row = self._row_of_candidate.get(candidate_id)
+            mask, required = self._mask_for(skill_ids)
+            if row is None or required == 0:
+                return None
+            matched = _popcount_rows(self._bits[row:row + 1] & mask)[0]
+        return float(matched) / required
+
+
+def current_version(db: Session) -> int:
+    """
+    The CandidateSkills version, bumped by every committed change to skill links.
+    """
+    return table_version_service.get_versions(db, [_VERSION_TABLE])[_VERSION_TABLE]
+
+
+class SkillIndexRefresher:
+    """
+    Background thread that reloads this process's index once CandidateSkills
+    changed. Checking costs one primary-key lookup every SKILL_INDEX_REFRESH_SECONDS.
+    This process's own writes bump the version too, so a busy pool is reloaded
+    at most once per interval.
+    """
+
+    def __init__(self, index: SkillBitmapIndex):
+        self.index = index
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.reloads = 0
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="skill-index-refresher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while not self._stop.wait(config.SKILL_INDEX_REFRESH_SECONDS):
+            try:
+                self.refresh_if_stale()
+            except Exception:
+                logger.exception("Skill index refresh failed")
+
+    def refresh_if_stale(self) -> bool:
+        """
+        Reloads the index if CandidateSkills changed since it was loaded. Returns
+        whether it did.
+        """
+        db = SessionLocal()
+        try:
+            if self.index.loaded and current_version(db) == self.index.version:
+                return False
+            self.index.load(db)
+            self.reloads += 1
+            return True
+        finally:
+            db.close()
+
+
+def get_job_skill_ids(job_id: int, db: Session) -> List[int]:
+    """
+    SkillIDs required by a job, straight from the association table.
+    """
+    rows = db.query(skill_model.JobRequiredSkill.c.SkillID).filter(
+        skill_model.JobRequiredSkill.c.JobID == job_id
+    ).all()
+    return [row.SkillID for row in rows]
+
+
+# Process-wide index, loaded on application startup (see main.py).
+skill_index = SkillBitmapIndex()
+skill_index_refresher = SkillIndexRefresher(skill_index)
@@ -0,0 +1,34 @@
+# app/services/skill_service.py
+from typing import Iterable, List
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.database.models import skill as skill_model
+
+
+def get_or_create_skills(db: Session, skill_names: Iterable[str], created_by: int) -> List[skill_model.Skill]:
+    """
+    Resolves skill names to Skill rows, creating the missing ones.
+    Names are normalised to Title Case and matched case-insensitively, using one
+    lookup query for the whole list instead of one query per skill.
+    """
+    names = set(name.strip().title() for name in skill_names if name and name.strip())
+    if not names:
+        return []
+
+    existing = db.query(skill_model.Skill).filter(
+        func.lower(skill_model.Skill.SkillName).in_([name.lower() for name in names])
+    ).all()
+    by_lower_name = {skill.SkillName.lower(): skill for skill in existing}
+
+    new_skills = [
+        skill_model.Skill(SkillName=name, CreatedBy=created_by)
+        for name in names if name.lower() not in by_lower_name
+    ]
+    if new_skills:
+        db.add_all(new_skills)
+        db.flush() # Assigns SkillIDs
+    for skill in new_skills:
+        by_lower_name[skill.SkillName.lower()] = skill
+
+    return [by_lower_name[name.lower()] for name in names]
@@ -0,0 +1,87 @@
+# app/services/table_version_service.py
+"""
+Per-table version counters for conditional GETs.
+
+Any ORM write to a tracked table, whether through the unit of work or a bulk
+UPDATE/DELETE/INSERT statement, bumps that table's row in TableVersions inside
+the same transaction, so a version can never be newer than the data it stands
+for. Only slowly changing tables are tracked: every bump takes a row lock on
+the counter until the transaction commits.
+
+Besides the ETags of the reference data, the counters tell each worker's skill
+index when CandidateSkills changed elsewhere (skill_index_service). Those writes
+are a few per resume upload, each in a short transaction.
+"""
+from itertools import chain
+from typing import Dict, Iterable, Sequence
+
+from sqlalchemy import event, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session, ORMExecuteState
+
+from app.database.models.table_version import TableVersion
+
+TRACKED_TABLES = frozenset({
+    "Portfolios",
+    "Departments",
+    "Skills",
+    "JobPostings",
+    "InterviewStageTemplates",
+    "CandidateSkills",
+})
+
+
+def bump_tables(connection: Connection, tables: Iterable[str]) -> None:
+    """
+    Increments the version of each table, creating missing counters.
+    """
+    # Sorted, so concurrent transactions lock the counter rows in the same order.
+    rows = [{"TableName": name, "Version": 1} for name in sorted(set(tables))]
+    if not rows:
+        return
+    statement = insert(TableVersion).values(rows)
+    statement = statement.on_conflict_do_update(
+        index_elements=[TableVersion.TableName],
+        set_={"Version": TableVersion.Version + 1, "UpdatedAt": func.now()}
+    )
+    connection.execute(statement)
+
+
+def get_versions(db: Session, tables: Sequence[str]) -> Dict[str, int]:
+    rows = db.query(TableVersion.TableName, TableVersion.Version).filter(TableVersion.TableName.in_(tables)).all()
+    versions = {name: 0 for name in tables}
+    versions.update({name: version for name, version in rows})
+    return versions
+
+
+def etag_for(db: Session, tables: Sequence[str]) -> str:
+    """
+    Weak ETag for a response built from `tables`: it changes whenever any of them is written.
+    Weak, because the same data may be sent compressed or not.
+    """
+    versions = get_versions(db, tables)
+    return 'W/"' + "-".join(str(versions[name]) for name in tables) + '"'
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_after_flush(session: Session, flush_context) -> None:
+    touched = set()
+    for instance in chain(session.new, session.dirty, session.deleted):
+        table = getattr(instance, "__table__", None)
+        if table is None or table.name not in TRACKED_TABLES:
+            continue
+        if instance in session.dirty and not session.is_modified(instance):
+            continue
+        touched.add(table.name)
+    if touched:
+        bump_tables(session.connection(), touched)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _bump_on_bulk_statement(orm_execute_state: ORMExecuteState) -> None:
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert):
+        return
+    table = getattr(orm_execute_state.statement, "table", None)
+    if table is not None and getattr(table, "name", None) in TRACKED_TABLES:
+        bump_tables(orm_execute_state.session.connection(), [table.name])
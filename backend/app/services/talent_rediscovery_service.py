@@ -1,43 +1,153 @@
 # app/services/talent_rediscovery_service.py
+import hashlib
 import json
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Iterator, List, NamedTuple, Optional, Tuple
+from sqlalchemy import exists, func, or_
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
 # Import your models and the generic AI service
+from app.core import config
+from app.core.ai_quota import ai_quotas, QueueFull
+from app.database.session import SessionLocal
 from app.database.models import candidate as candidate_model
 from app.database.models import job as job_model
+from app.database.models.rediscovery import RediscoveryRun, RediscoveryMatch
 from app.services import gemini_service
+from app.services.skill_index_service import skill_index, get_job_skill_ids
+from app.core.logging_config import SampledDebug, job_id_var
 
-def find_matching_candidates_for_job(job_id: int, db: Session):
-    print(f"\n--- [DEBUG] Starting Talent Rediscovery for Job ID: {job_id} ---")
-    
-    db_job = db.query(job_model.JobPosting).filter(job_model.JobPosting.JobID == job_id).first()
-    if not db_job: return None
-
-    all_candidates = db.query(candidate_model.Candidate).all()
-    print(f"--- [DEBUG] Found {len(all_candidates)} total candidates in the talent pool. ---")
-    
-    matching_candidates = []
-    threshold = 60.0
-
-    for candidate in all_candidates:
-        print(f"\n--- [DEBUG] Processing Candidate ID: {candidate.CandidateID} ({candidate.FullName}) ---")
-
-        # --- NEW GUARDRAIL ---
-        # If the candidate has no resume summary, we can't score them.
-        if not candidate.ResumeSummary or not candidate.ResumeSummary.strip():
-            print(f"  --> SKIPPING: Candidate has no resume summary.")
-            continue
-        # --- END OF GUARDRAIL ---
-
-        existing_application = db.query(candidate_model.JobApplication).filter(
-            candidate_model.JobApplication.CandidateID == candidate.CandidateID,
-            candidate_model.JobApplication.JobID == job_id
-        ).first()
-        if existing_application:
-            print(f"  --> SKIPPING: Candidate has already applied for this job.")
-            continue
-
-        prompt = f"""
+logger = logging.getLogger(__name__)
+
+# How many candidate rows are pulled from the database at a time.
+# Rediscovery memory is bounded by this, not by the size of the talent pool.
+REDISCOVERY_BATCH_SIZE = 500
+
+# Candidates scoring above this are reported as matches.
+MATCH_THRESHOLD = 60.0
+
+# Bump whenever build_prompt() changes in a way that changes the scores: the
+# next run of every job then rescores all of its candidates.
+PROMPT_VERSION = "1"
+
+STATUS_QUEUED = "Queued"
+STATUS_RUNNING = "Running"
+STATUS_COMPLETED = "Completed"
+STATUS_FAILED = "Failed"
+STATUS_SUPERSEDED = "Superseded" # A newer run for the same job was queued while this one ran
+
+TRIGGER_JOB_CREATED = "job_created"
+TRIGGER_MANUAL = "manual"
+
+
+class ClaimLost(Exception):
+    """
+    The run went stale and was requeued (and possibly claimed) elsewhere, so this
+    worker must stop working on it.
+    """
+
+
+def _eligible_candidates(job_id: int, db: Session):
+    """
+    Candidates that can be rediscovered for a job: they have a resume summary and
+    have not applied for it yet (anti-join in SQL).
+    """
+    Candidate = candidate_model.Candidate
+    JobApplication = candidate_model.JobApplication
+
+    already_applied = exists().where(
+        JobApplication.CandidateID == Candidate.CandidateID,
+        JobApplication.JobID == job_id
+    )
+    return db.query(Candidate).filter(
+        Candidate.ResumeSummary.isnot(None),
+        func.trim(Candidate.ResumeSummary) != "",
+        ~already_applied
+    )
+
+
+class ScoringKey(NamedTuple):
+    """
+    Everything besides the candidate that a stored score depends on.
+    """
+    prompt_version: str
+    model: str
+    description_hash: str
+
+
+def scoring_key(job_description: str) -> ScoringKey:
+    return ScoringKey(
+        PROMPT_VERSION,
+        gemini_service.model_name(),
+        hashlib.sha256(job_description.encode("utf-8")).hexdigest()
+    )
+
+
+def _candidate_version():
+    # Candidates that were never updated are versioned by their creation time.
+    Candidate = candidate_model.Candidate
+    return func.coalesce(Candidate.UpdatedAt, Candidate.CreatedAt)
+
+
+def _score_outdated(key: ScoringKey):
+    """
+    Stored scores that were made with another prompt, model or job description,
+    or before the candidate last changed. Needs Candidates in the query.
+    """
+    Match = RediscoveryMatch
+    return or_(
+        Match.PromptVersion.is_distinct_from(key.prompt_version),
+        Match.Model.is_distinct_from(key.model),
+        Match.DescriptionHash.is_distinct_from(key.description_hash),
+        _candidate_version() > Match.CandidateUpdatedAt
+    )
+
+
+def _pending_candidates(job_id: int, db: Session, key: ScoringKey):
+    """
+    Eligible candidates without a current stored score for the job.
+    """
+    Candidate = candidate_model.Candidate
+    Match = RediscoveryMatch
+    return _eligible_candidates(job_id, db).outerjoin(
+        Match, (Match.JobID == job_id) & (Match.CandidateID == Candidate.CandidateID)
+    ).filter(or_(Match.CandidateID.is_(None), _score_outdated(key)))
+
+
+def iter_rediscovery_candidates(job_id: int, db: Session, batch_size: int = REDISCOVERY_BATCH_SIZE,
+                                key: Optional[ScoringKey] = None) -> Iterator[List]:
+    """
+    Streams the candidates that are eligible for rediscovery against a job, in batches.
+    With a scoring key, only those whose stored score is missing or outdated.
+    Only the columns needed for scoring are fetched.
+    """
+    Candidate = candidate_model.Candidate
+    candidates = _eligible_candidates(job_id, db) if key is None else _pending_candidates(job_id, db, key)
+    query = candidates.with_entities(
+        Candidate.CandidateID,
+        Candidate.FullName,
+        Candidate.Email,
+        Candidate.ResumeSummary,
+        _candidate_version().label("Version")
+    ).order_by(Candidate.CandidateID)
+
+    # Keyset pagination: each batch starts after the last CandidateID we saw,
+    # so no batch ever re-reads (or holds on to) the previous ones.
+    last_candidate_id = 0
+    while True:
+        batch = query.filter(Candidate.CandidateID > last_candidate_id).limit(batch_size).all()
+        if not batch:
+            return
+        yield batch
+        last_candidate_id = batch[-1].CandidateID
+
+
+def build_prompt(job_description: str, resume_summary: str) -> str:
+    return f"""
         #-- Role: Expert System --#
         You are a highly precise data extraction system. Your only function is to compare two pieces of text and return a structured JSON object. You must adhere to the output format exactly.
 
@@ -46,8 +156,8 @@ def find_matching_candidates_for_job(job_id: int, db: Session):
         Provide a numerical score and a brief justification.
 
         #-- Input Data --#
-        Job Description: "{db_job.Description}"
-        Candidate Summary: "{candidate.ResumeSummary}"
+        Job Description: "{job_description}"
+        Candidate Summary: "{resume_summary}"
 
         #-- STRICT OUTPUT FORMAT --#
         Your response MUST be a single, valid JSON object and nothing else.
@@ -59,52 +169,368 @@ def find_matching_candidates_for_job(job_id: int, db: Session):
           "match_summary": "<A one-sentence justification for the score>"
         }}
         """
-        
-        ai_response_text = ""
+
+
+def score_candidate(job_description: str, candidate, debug_item=None) -> Optional[Tuple[float, str]]:
+    """
+    Asks the AI how well one candidate fits the job. Returns (score, summary), or
+    None when the call fails or its response cannot be parsed.
+    """
+    ai_response_text = ""
+    try:
+        ai_response_text = gemini_service.get_text_response(build_prompt(job_description, candidate.ResumeSummary))
+
+        # The model sometimes wraps the JSON in prose or markdown; take the outermost object.
+        json_start = ai_response_text.find('{')
+        json_end = ai_response_text.rfind('}')
+        if json_start == -1 or json_end == -1:
+            raise ValueError("No valid JSON object found in AI response")
+        ai_analysis = json.loads(ai_response_text[json_start:json_end + 1])
+
+        score = float(ai_analysis.get("match_score", 0))
+        return score, ai_analysis.get("match_summary", "No summary provided.")
+    except (json.JSONDecodeError, ValueError) as e:
+        logger.warning("Skipping candidate %s: could not parse AI response: %s", candidate.CandidateID, e)
+        if debug_item:
+            debug_item("Raw AI response for candidate %s: %.500s", candidate.CandidateID, ai_response_text)
+    except Exception as e:
+        logger.warning("Skipping candidate %s: AI call failed: %s", candidate.CandidateID, e)
+    return None
+
+
+# ====================================================================
+# QUEUED RUNS AND STORED RESULTS
+# ====================================================================
+
+def queue_run(db: Session, job_id: int, trigger: str, full_rescore: bool = False) -> RediscoveryRun:
+    """
+    Queues a rediscovery run for a job in the caller's transaction, unless one is
+    already waiting (it will see the latest description anyway).
+    """
+    waiting = db.query(RediscoveryRun).filter(
+        RediscoveryRun.JobID == job_id,
+        RediscoveryRun.Status == STATUS_QUEUED
+    ).first()
+    if waiting:
+        if full_rescore:
+            waiting.FullRescore = True
+        return waiting
+    run = RediscoveryRun(
+        JobID=job_id, Status=STATUS_QUEUED, Trigger=trigger, FullRescore=full_rescore,
+        CandidatesProcessed=0, CandidatesReused=0, MatchesFound=0
+    )
+    db.add(run)
+    return run
+
+
+def latest_run(db: Session, job_id: int) -> Optional[RediscoveryRun]:
+    return db.query(RediscoveryRun).filter(RediscoveryRun.JobID == job_id).order_by(RediscoveryRun.RunID.desc()).first()
+
+
+def get_results(db: Session, job_id: int, min_score: float = MATCH_THRESHOLD, limit: int = 50) -> List[dict]:
+    """
+    Stored matches for a job, best first: one indexed range scan, no AI calls.
+    """
+    Match = RediscoveryMatch
+    Candidate = candidate_model.Candidate
+    rows = db.query(
+        Match.CandidateID, Candidate.FullName, Candidate.Email,
+        Match.MatchScore, Match.SkillCoverage, Match.MatchSummary, Match.ScoredAt
+    ).join(
+        Candidate, Candidate.CandidateID == Match.CandidateID
+    ).filter(
+        Match.JobID == job_id,
+        Match.MatchScore > min_score
+    ).order_by(Match.MatchScore.desc(), Match.SkillCoverage.desc(), Match.CandidateID).limit(limit).all()
+    return [row._asdict() for row in rows]
+
+
+def _upsert_matches(db: Session, rows: List[dict]) -> None:
+    if not rows:
+        return
+    statement = insert(RediscoveryMatch).values(rows)
+    statement = statement.on_conflict_do_update(
+        index_elements=[RediscoveryMatch.JobID, RediscoveryMatch.CandidateID],
+        set_={
+            "RunID": statement.excluded.RunID,
+            "MatchScore": statement.excluded.MatchScore,
+            "MatchSummary": statement.excluded.MatchSummary,
+            "SkillCoverage": statement.excluded.SkillCoverage,
+            "PromptVersion": statement.excluded.PromptVersion,
+            "Model": statement.excluded.Model,
+            "DescriptionHash": statement.excluded.DescriptionHash,
+            "CandidateUpdatedAt": statement.excluded.CandidateUpdatedAt,
+            "ScoredAt": statement.excluded.ScoredAt,
+        }
+    )
+    db.execute(statement)
+
+
+class RediscoveryWorker:
+    """
+    Background thread that works off queued RediscoveryRuns, oldest first.
+
+    Runs are incremental: a candidate is scored only if the job has no current
+    stored score for them (see RediscoveryMatch), so a repeat run costs AI calls
+    only for new and changed candidates. A run queued with FullRescore scores
+    everyone again.
+
+    Runs are claimed with SKIP LOCKED, so workers in several processes share the
+    queue. Progress is committed after every REDISCOVERY_BATCH_SIZE candidates and
+    doubles as a heartbeat: a Running run whose heartbeat is older than
+    REDISCOVERY_STALE_SECONDS (its worker died) is queued again. AI calls share the
+    concurrent-call slots of the interactive AI routes, as one more user in the
+    fair queue, so a large run cannot crowd out people waiting on a response.
+    """
+
+    def __init__(self):
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stats_lock = threading.Lock()
+        self.runs_completed = 0
+        self.runs_failed = 0
+        self.candidates_scored = 0
+        self.candidates_reused = 0
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="rediscovery-worker", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                if self.run_next():
+                    continue
+            except Exception:
+                logger.exception("Rediscovery cycle failed")
+            self._stop.wait(config.REDISCOVERY_POLL_SECONDS)
+
+    def claim_next(self) -> Optional[int]:
+        """
+        Marks the oldest queued run as Running and returns its id.
+        """
+        db = SessionLocal()
         try:
-            ai_response_text = gemini_service.get_text_response(prompt)
-            
-            # --- START OF NEW JSON EXTRACTION LOGIC ---
-            # Find the start of the JSON object
-            json_start = ai_response_text.find('{')
-            # Find the end of the JSON object (the last closing brace)
-            json_end = ai_response_text.rfind('}')
-            
-            if json_start != -1 and json_end != -1:
-                # Slice the string to get only the JSON part
-                json_string = ai_response_text[json_start:json_end+1]
-                
-                # Parse the extracted, clean JSON string
-                ai_analysis = json.loads(json_string)
-            else:
-                # If we can't find a JSON object, raise an error
-                raise ValueError("No valid JSON object found in AI response")
-            # --- END OF NEW JSON EXTRACTION LOGIC ---
-            
-            score = float(ai_analysis.get("match_score", 0))
-            print(f"  --> AI Score Received: {score}")
-
-            if score > threshold:
-                print(f"  --> SUCCESS: Score is above threshold ({threshold}). Adding to results.")
-                matching_candidates.append({
+            now = datetime.utcnow()
+            db.query(RediscoveryRun).filter(
+                RediscoveryRun.Status == STATUS_RUNNING,
+                RediscoveryRun.HeartbeatAt < now - timedelta(seconds=config.REDISCOVERY_STALE_SECONDS)
+            ).update({"Status": STATUS_QUEUED}, synchronize_session=False)
+            run = db.query(RediscoveryRun).filter(
+                RediscoveryRun.Status == STATUS_QUEUED
+            ).order_by(RediscoveryRun.RunID).with_for_update(skip_locked=True).first()
+            if run is None:
+                db.commit()
+                return None
+            run.Status = STATUS_RUNNING
+            run.StartedAt = run.HeartbeatAt = now
+            run_id = run.RunID
+            db.commit()
+            return run_id
+        finally:
+            db.close()
+
+    def run_next(self) -> bool:
+        """
+        Claims and executes one run. Returns False when the queue is empty.
+        """
+        run_id = self.claim_next()
+        if run_id is None:
+            return False
+        db = SessionLocal()
+        try:
+            run = db.get(RediscoveryRun, run_id)
+            started_at = run.StartedAt
+            token = job_id_var.set(run.JobID)
+            try:
+                self.execute(db, run)
+            except ClaimLost:
+                db.rollback()
+                logger.warning("Rediscovery run %s was requeued elsewhere; this worker stops working on it", run_id)
+            except Exception as e:
+                db.rollback()
+                logger.exception("Rediscovery run %s failed", run_id)
+                db.query(RediscoveryRun).filter(
+                    RediscoveryRun.RunID == run_id,
+                    RediscoveryRun.StartedAt == started_at,
+                    RediscoveryRun.Status == STATUS_RUNNING
+                ).update({
+                    "Status": STATUS_FAILED, "Error": str(e)[:2000], "FinishedAt": datetime.utcnow()
+                }, synchronize_session=False)
+                db.commit()
+                with self._stats_lock:
+                    self.runs_failed += 1
+            finally:
+                job_id_var.reset(token)
+        finally:
+            db.close()
+        return True
+
+    def _claim_held(self, db: Session, run_id: int, started_at: datetime) -> bool:
+        """
+        Refreshes the heartbeat of the run if this worker still owns it (same
+        StartedAt, still Running). The UPDATE keeps the row locked until the
+        caller commits, so the run cannot be requeued in between.
+        """
+        updated = db.query(RediscoveryRun).filter(
+            RediscoveryRun.RunID == run_id,
+            RediscoveryRun.StartedAt == started_at,
+            RediscoveryRun.Status == STATUS_RUNNING
+        ).update({"HeartbeatAt": datetime.utcnow()}, synchronize_session=False)
+        return updated == 1
+
+    def _commit_as_owner(self, db: Session, run_id: int, started_at: datetime) -> None:
+        """
+        Commits the session's work on the run, or raises ClaimLost (nothing is
+        committed) if another worker took the run over.
+        """
+        if not self._claim_held(db, run_id, started_at):
+            db.rollback()
+            raise ClaimLost()
+        db.commit()
+
+    def _score(self, job_description: str, candidate, debug_item: SampledDebug,
+               heartbeat: Callable[[], None]) -> Optional[Tuple[float, str]]:
+        while True:
+            heartbeat()
+            try:
+                if ai_quotas.gate.acquire("rediscovery-worker", config.AI_QUEUE_TIMEOUT_SECONDS):
+                    break
+            except QueueFull:
+                # Requests are queued up to the cap; this thread can wait outside the queue.
+                self._stop.wait(1.0)
+            if self._stop.is_set():
+                return None
+        try:
+            return score_candidate(job_description, candidate, debug_item)
+        finally:
+            ai_quotas.gate.release()
+
+    def execute(self, db: Session, run: RediscoveryRun) -> None:
+        job = db.get(job_model.JobPosting, run.JobID)
+        if job is None or not job.Description:
+            raise ValueError("The job has no description to match against.")
+        if gemini_service.get_model() is None:
+            raise ConnectionError("Gemini AI model is not configured.")
+
+        logger.info("Starting rediscovery run %s (%s)", run.RunID, run.Trigger)
+        started = time.perf_counter()
+        run_id, started_at = run.RunID, run.StartedAt
+        job_id, description = job.JobID, job.Description
+        key = scoring_key(description)
+        eligible_count = _eligible_candidates(job_id, db).count()
+        run.CandidatesTotal = eligible_count if run.FullRescore else _pending_candidates(job_id, db, key).count()
+        run.CandidatesReused = eligible_count - run.CandidatesTotal
+        self._commit_as_owner(db, run_id, started_at)
+        job_skill_ids = get_job_skill_ids(job_id, db)
+        # One line per candidate is far too much output for a large pool; sample it.
+        debug_item = SampledDebug(logger)
+
+        # A batch of AI calls can take longer than REDISCOVERY_STALE_SECONDS, so
+        # progress is also reported between calls, on a timer.
+        last_heartbeat = time.monotonic()
+
+        def heartbeat() -> None:
+            nonlocal last_heartbeat
+            if time.monotonic() - last_heartbeat >= config.REDISCOVERY_HEARTBEAT_SECONDS:
+                self._commit_as_owner(db, run_id, started_at)
+                last_heartbeat = time.monotonic()
+
+        for batch in iter_rediscovery_candidates(job_id, db, key=None if run.FullRescore else key):
+            # Nothing is held open in the database while the AI calls run.
+            db.commit()
+            rows = []
+            for candidate in batch:
+                result = self._score(description, candidate, debug_item, heartbeat)
+                if self._stop.is_set():
+                    # Shutting down: leave the run to be picked up again.
+                    db.query(RediscoveryRun).filter(
+                        RediscoveryRun.RunID == run_id,
+                        RediscoveryRun.StartedAt == started_at,
+                        RediscoveryRun.Status == STATUS_RUNNING
+                    ).update({"Status": STATUS_QUEUED}, synchronize_session=False)
+                    db.commit()
+                    return
+                if result is None:
+                    continue
+                score, summary = result
+                debug_item("Candidate %s scored %s (threshold %s)", candidate.CandidateID, score, MATCH_THRESHOLD)
+                rows.append({
+                    "JobID": job_id,
                     "CandidateID": candidate.CandidateID,
-                    "FullName": candidate.FullName,
-                    "Email": candidate.Email,
-                    "match_score": score,
-                    "match_summary": ai_analysis.get("match_summary", "No summary provided.")
+                    "RunID": run.RunID,
+                    "MatchScore": score,
+                    "MatchSummary": summary,
+                    "SkillCoverage": skill_index.score(candidate.CandidateID, job_skill_ids),
+                    "PromptVersion": key.prompt_version,
+                    "Model": key.model,
+                    "DescriptionHash": key.description_hash,
+                    "CandidateUpdatedAt": candidate.Version,
+                    "ScoredAt": datetime.utcnow(),
                 })
-            else:
-                print(f"  --> SKIPPING: Score of {score} is not above threshold ({threshold}).")
-
-        except (json.JSONDecodeError, ValueError) as e:
-            print(f"  --> SKIPPING: Could not parse JSON from AI response. Error: {e}")
-            print(f"  --> AI RAW RESPONSE: '{ai_response_text}'")
-            continue
-        except Exception as e:
-            print(f"  --> SKIPPING: AI call failed. Error: {e}")
-            continue
-
-    # ... (rest of the function is the same) ...
-    print(f"\n--- [DEBUG] Finished Processing. Found {len(matching_candidates)} matches. ---")
-    sorted_matches = sorted(matching_candidates, key=lambda x: x['match_score'], reverse=True)
-    return {"job_title": db_job.JobTitle, "matching_candidates": sorted_matches}
\ No newline at end of file
+            _upsert_matches(db, rows)
+            run.CandidatesProcessed += len(batch)
+            run.MatchesFound += sum(1 for row in rows if row["MatchScore"] > MATCH_THRESHOLD)
+            self._commit_as_owner(db, run_id, started_at)
+            last_heartbeat = time.monotonic()
+            with self._stats_lock:
+                self.candidates_scored += len(rows)
+
+            if db.query(exists().where(
+                RediscoveryRun.JobID == job_id,
+                RediscoveryRun.Status == STATUS_QUEUED
+            )).scalar():
+                # A newer run was queued meanwhile (e.g. a manual full rescore); it takes over.
+                run.Status = STATUS_SUPERSEDED
+                run.FinishedAt = datetime.utcnow()
+                self._commit_as_owner(db, run_id, started_at)
+                logger.info("Rediscovery run %s superseded by a newer run", run.RunID)
+                return
+
+        # Drop scores of candidates that are no longer eligible (they applied
+        # meanwhile) and outdated scores this run failed to refresh. The rest
+        # are current, whichever run made them.
+        Candidate = candidate_model.Candidate
+        still_eligible = _eligible_candidates(job_id, db).filter(Candidate.CandidateID == RediscoveryMatch.CandidateID)
+        outdated = exists().where(Candidate.CandidateID == RediscoveryMatch.CandidateID, _score_outdated(key))
+        db.query(RediscoveryMatch).filter(
+            RediscoveryMatch.JobID == job_id,
+            or_(~still_eligible.exists(), outdated)
+        ).delete(synchronize_session=False)
+        # Reused scores count too, so this is the job's total, not this run's finds.
+        run.MatchesFound = db.query(func.count(RediscoveryMatch.CandidateID)).filter(
+            RediscoveryMatch.JobID == job_id,
+            RediscoveryMatch.MatchScore > MATCH_THRESHOLD
+        ).scalar()
+        run.Status = STATUS_COMPLETED
+        run.FinishedAt = datetime.utcnow()
+        self._commit_as_owner(db, run_id, started_at)
+        with self._stats_lock:
+            self.runs_completed += 1
+            self.candidates_reused += run.CandidatesReused
+        logger.info(
+            "Rediscovery run %s finished in %.1fs: %d candidates scored, %d reused, %d matches",
+            run.RunID, time.perf_counter() - started, run.CandidatesProcessed, run.CandidatesReused, run.MatchesFound
+        )
+
+    def stats(self, db: Session) -> dict:
+        queued = db.query(func.count(RediscoveryRun.RunID)).filter(RediscoveryRun.Status == STATUS_QUEUED).scalar() or 0
+        with self._stats_lock:
+            return {
+                "queued_runs": queued,
+                "runs_completed": self.runs_completed,
+                "runs_failed": self.runs_failed,
+                "candidates_scored": self.candidates_scored,
+                "candidates_reused": self.candidates_reused,
+            }
+
+
+rediscovery_worker = RediscoveryWorker()
@@ -0,0 +1,119 @@
+# benchmark_responses.py
+"""
+Compares response serialization and compression for the large list endpoints
+(/jobs/, /jobs/{job_id}/applications, /skills/) on synthetic rows, in-process:
+
+- "classic": validate, jsonable_encoder, json.dumps (FastAPI's usual path)
+- "fast_json": validate and encode inside pydantic-core (app.core.responses)
+
+and the size and cost of gzip / brotli on the result.
+
+    python benchmark_responses.py --rows 2000 --repeat 20
+
+For end-to-end numbers against a running server, use load_test.py with e.g.
+--mix list_jobs=1,pipeline=1 before and after a change.
+"""
+import argparse
+import gzip
+import json
+import statistics
+import time
+from functools import lru_cache
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Callable, List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.core import compression, config
+from app.core.responses import fast_json
+from app.schemas import candidate_schema, job_schema, skill_schema
+
+
+def make_jobs(rows: int) -> list:
+    skills = [SimpleNamespace(SkillID=n, SkillName=f"Skill {n}", SkillCategory="Technical") for n in range(8)]
+    stages = [SimpleNamespace(StageID=n, JobID=1, StageName=f"Round {n}", InterviewerInfo=None, Sequence=n) for n in range(4)]
+    return [
+        SimpleNamespace(
+            JobID=n, JobTitle=f"Software Engineer #{n}", Description="We are looking for an engineer who... " * 40,
+            DepartmentID=1, PortfolioID=1, Status="Open", ExperienceRequired="3-5 years", JobType="Full-time",
+            required_skills=skills, interview_stages=stages, CreatedAt=datetime(2024, 1, 1) + timedelta(hours=n), UpdatedAt=None,
+        )
+        for n in range(rows)
+    ]
+
+
+def make_applications(rows: int) -> list:
+    return [
+        SimpleNamespace(
+            ApplicationID=n, JobID=1, CandidateID=n, MatchScore=50 + n % 50,
+            ScoreDetails={"skills_match": 70.0, "experience_match": 55.0, "education_match": 80.0},
+            Stage="Applied", AppliedAt=datetime(2024, 1, 1) + timedelta(minutes=n),
+        )
+        for n in range(rows)
+    ]
+
+
+def make_skills(rows: int) -> list:
+    return [SimpleNamespace(SkillID=n, SkillName=f"Skill {n}", SkillCategory="Technical") for n in range(rows)]
+
+
+@lru_cache(maxsize=None)
+def classic_adapter(response_type) -> TypeAdapter:
+    return TypeAdapter(response_type)
+
+
+def classic(response_type, content) -> bytes:
+    value = classic_adapter(response_type).validate_python(content, from_attributes=True)
+    data = jsonable_encoder(value)
+    # Same settings as Starlette's JSONResponse.render.
+    return json.dumps(data, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def fast(response_type, content) -> bytes:
+    return fast_json(response_type, content).body
+
+
+def median_ms(function: Callable[[], object], repeat: int) -> float:
+    function()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark response serialization and compression.")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    cases = [
+        ("/jobs/", List[job_schema.Job], make_jobs(args.rows)),
+        ("/jobs/{job_id}/applications", List[candidate_schema.JobApplication], make_applications(args.rows)),
+        ("/skills/", List[skill_schema.Skill], make_skills(args.rows)),
+    ]
+    print(f"{args.rows} rows per response, median of {args.repeat} runs\n")
+    print(f"{'endpoint':<30}{'classic ms':>12}{'fast ms':>10}{'speedup':>9}{'raw KB':>9}{'gzip KB':>9}{'gzip ms':>9}{'br KB':>8}{'br ms':>8}")
+    for name, response_type, content in cases:
+        classic_ms = median_ms(lambda: classic(response_type, content), args.repeat)
+        fast_ms = median_ms(lambda: fast(response_type, content), args.repeat)
+        body = fast(response_type, content)
+        gzip_body = gzip.compress(body, compresslevel=config.COMPRESSION_GZIP_LEVEL)
+        gzip_ms = median_ms(lambda: gzip.compress(body, compresslevel=config.COMPRESSION_GZIP_LEVEL), args.repeat)
+        line = (f"{name:<30}{classic_ms:>12.2f}{fast_ms:>10.2f}{classic_ms / fast_ms:>8.1f}x"
+                f"{len(body) / 1024:>9.0f}{len(gzip_body) / 1024:>9.0f}{gzip_ms:>9.2f}")
+        if compression.brotli is not None:
+            br_body = compression.compress(body, "br")
+            br_ms = median_ms(lambda: compression.compress(body, "br"), args.repeat)
+            line += f"{len(br_body) / 1024:>8.0f}{br_ms:>8.2f}"
+        print(line)
+    if compression.brotli is None:
+        print("\n(brotli is not installed; only gzip was measured)")
+
+
+if __name__ == "__main__":
+    main()
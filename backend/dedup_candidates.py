@@ -0,0 +1,57 @@
+# dedup_candidates.py
+"""
+Finds duplicate candidates across the whole pool and, with --merge, merges
+them (see app/services/candidate_dedup_service.py).
+
+    python dedup_candidates.py                  # report only
+    python dedup_candidates.py --merge
+    python dedup_candidates.py --rebuild-keys   # after a bulk import, e.g. generate_load_data.py
+
+Without --merge nothing is written apart from the blocking keys.
+"""
+import argparse
+import time
+
+from app.database.session import SessionLocal
+
+# Importing init_db registers every model on Base.metadata.
+from app.database import init_db  # noqa: F401
+from app.services import candidate_dedup_service
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Find and merge duplicate candidates.")
+    parser.add_argument("--merge", action="store_true", help="Merge each candidate's direct duplicates into it.")
+    parser.add_argument("--rebuild-keys", action="store_true", help="Recompute the blocking keys of every candidate first.")
+    parser.add_argument("--show", type=int, default=20, help="Clusters to list in the report.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        if args.rebuild_keys:
+            print("--- Rebuilding Blocking Keys ---")
+            print(f"{candidate_dedup_service.rebuild_blocking_keys(db):,} candidates indexed")
+
+        print("--- Sweeping for Duplicates ---")
+        report = candidate_dedup_service.sweep(db, merge=args.merge)
+        print(f"Blocks compared:   {report.blocks - report.oversized_blocks:,} ({report.oversized_blocks:,} too large, skipped)")
+        print(f"Comparisons:       {report.comparisons:,}")
+        print(f"Duplicate pairs:   {report.duplicate_pairs:,}")
+        print(f"Clusters:          {len(report.clusters):,}")
+        for cluster in report.clusters[:args.show]:
+            print(f"  {cluster[0]} <- {', '.join(str(candidate_id) for candidate_id in cluster[1:])}")
+        if args.merge:
+            print(f"Candidates merged: {report.merged:,}")
+        else:
+            print("Nothing merged; run again with --merge.")
+    finally:
+        db.close()
+    print(f"--- Done in {time.perf_counter() - started:,.1f}s ---")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,409 @@
+# generate_load_data.py
+"""
+Fills the database with synthetic data at production-like volumes, for load
+tests and query tuning. seed_db.py is still the way to get a small demo set.
+
+    python generate_load_data.py --scale medium
+    python generate_load_data.py --scale large --reset
+    python generate_load_data.py --candidates 500000 --applications 2000000
+
+Rows are written with multi-row INSERTs in chunks of --chunk-size, each chunk
+in its own transaction, and are generated lazily, so memory stays flat however
+many rows are asked for. Candidates and applications get explicit IDs (the
+PostgreSQL sequences are moved past them at the end), which lets skills and
+stage logs be written without reading millions of IDs back.
+The data is deterministic for a given --seed. Generated users have emails of
+the form loadtest-user-<n>@example.com; load_test.py logs in as them.
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Iterable, Iterator, List, Tuple
+
+from sqlalchemy import func, insert, select, text
+
+from app.database.base import Base
+from app.database.session import engine, SessionLocal
+
+# Importing init_db registers every model on Base.metadata.
+from app.database import init_db  # noqa: F401
+from app.database.models.user import User
+from app.database.models.skill import Skill, CandidateSkill, JobRequiredSkill
+from app.database.models.portfolio_department import Department, Portfolio
+from app.database.models.job import JobPosting
+from app.database.models.candidate import Candidate, JobApplication
+from app.database.models.workflow_feedback import InterviewStageTemplate, ApplicationStageLog
+from app.services import candidate_dedup_service, table_version_service
+
+SCALES = {
+    #          users  portfolios  departments  skills  jobs    candidates  applications  stage logs per application
+    "small":  (50,    5,          20,          2000,   500,    10000,      50000,        4),
+    "medium": (200,   10,         60,          10000,  5000,   200000,     1000000,      6),
+    "large":  (1000,  20,         150,         30000,  20000,  2000000,    5000000,      8),
+}
+
+USER_EMAIL_PREFIX = "loadtest-user-"
+USER_ROLES = ["Admin", "HR", "HR", "HR", "Recruiter", "Interviewer", "Interviewer"]
+
+FIRST_NAMES = [
+    "Aarav", "Aditi", "Alex", "Ananya", "Arjun", "Chen", "Daniel", "Diya", "Elena", "Fatima",
+    "Hiro", "Isha", "James", "Kabir", "Laura", "Maria", "Mohammed", "Neha", "Olivia", "Priya",
+    "Rahul", "Rohan", "Sara", "Sofia", "Tanvi", "Vikram", "Wei", "Yusuf", "Zara", "Noah",
+]
+LAST_NAMES = [
+    "Agarwal", "Brown", "Chopra", "Das", "Fernandes", "Garcia", "Gupta", "Iyer", "Johnson", "Kapoor",
+    "Khan", "Kumar", "Lee", "Mehta", "Miller", "Nair", "Patel", "Rao", "Reddy", "Sharma",
+    "Singh", "Smith", "Tanaka", "Verma", "Wang", "Williams", "Yadav", "Zhang", "Joshi", "Bose",
+]
+BASE_SKILLS = [
+    "Python", "Java", "JavaScript", "TypeScript", "React", "Angular", "Vue", "Node.js", "Django", "FastAPI",
+    "Flask", "Spring Boot", "Go", "Rust", "C++", "C#", ".NET", "SQL", "PostgreSQL", "MySQL",
+    "MongoDB", "Redis", "Kafka", "RabbitMQ", "Docker", "Kubernetes", "Terraform", "AWS", "Azure", "GCP",
+    "Linux", "Git", "CI/CD", "Jenkins", "GraphQL", "REST", "Microservices", "Machine Learning", "Deep Learning", "TensorFlow",
+    "PyTorch", "Pandas", "NumPy", "Spark", "Airflow", "Snowflake", "Tableau", "Power BI", "Selenium", "Figma",
+]
+SKILL_QUALIFIERS = ["Advanced", "Applied", "Enterprise", "Cloud", "Distributed", "Embedded", "Realtime", "Secure", "Data", "Mobile"]
+JOB_TITLES = [
+    "Software Engineer", "Senior Software Engineer", "Backend Engineer", "Frontend Engineer", "Full Stack Developer",
+    "Data Engineer", "Data Scientist", "ML Engineer", "DevOps Engineer", "SRE", "QA Engineer", "Product Designer",
+    "Engineering Manager", "Solutions Architect", "Mobile Developer",
+]
+JOB_STATUSES = ["Open", "Open", "Open", "On Hold", "Closed"]
+JOB_TYPES = ["Full-time", "Full-time", "Contract", "Internship"]
+SOURCES = ["LinkedIn", "Referral", "Naukri", "Careers Page", "Agency"]
+STAGE_NAMES = ["HR Screening", "Technical Round 1", "Technical Round 2", "Manager Round", "HR Round"]
+# Typical path through the pipeline; a history stops early or ends in a rejection.
+PIPELINE = ["Applied", "Shortlisted", "Interview", "Interview", "Interview", "Offer", "Hired"]
+OUTCOMES = ["Proceed", "Proceed", "Hold", "Reject"]
+
+
+def chunked(rows: Iterable[dict], size: int) -> Iterator[List[dict]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class Generator:
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.now = datetime.utcnow()
+
+    # --- helpers ---
+
+    def bulk_insert(self, table, rows: Iterable[dict], label: str) -> None:
+        """
+        Inserts rows chunk by chunk, printing progress and the insert rate.
+        """
+        started = time.perf_counter()
+        written = 0
+        for number, chunk in enumerate(chunked(rows, self.args.chunk_size), start=1):
+            with engine.begin() as conn:
+                conn.execute(insert(table), chunk)
+            written += len(chunk)
+            if number % 20 == 0:
+                print(f"  {label}: {written:,} ({written / (time.perf_counter() - started):,.0f} rows/s)")
+        print(f"  {label}: {written:,} rows in {time.perf_counter() - started:,.1f}s")
+
+    def new_ids(self, id_column, after: int) -> List[int]:
+        with engine.connect() as conn:
+            return list(conn.execute(select(id_column).where(id_column > after).order_by(id_column)).scalars())
+
+    @staticmethod
+    def max_id(id_column) -> int:
+        with engine.connect() as conn:
+            return conn.execute(select(func.coalesce(func.max(id_column), 0))).scalar()
+
+    def past(self, max_days: int) -> datetime:
+        return self.now - timedelta(seconds=self.rng.randrange(max_days * 86400))
+
+    def zipf_weights(self, count: int) -> List[float]:
+        # A few skills are everywhere and most are rare, like in real resumes.
+        cumulative, total = [], 0.0
+        for rank in range(1, count + 1):
+            total += 1.0 / rank
+            cumulative.append(total)
+        return cumulative
+
+    # --- tables ---
+
+    def users(self) -> List[int]:
+        before = self.max_id(User.UserID)
+        rows = (
+            {
+                "UserName": f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}",
+                "Email": f"{USER_EMAIL_PREFIX}{before + n}@example.com",
+                "Role": USER_ROLES[n % len(USER_ROLES)],
+                "IsActive": True,
+            }
+            for n in range(self.args.users)
+        )
+        self.bulk_insert(User.__table__, rows, "users")
+        return self.new_ids(User.UserID, before)
+
+    def portfolios_and_departments(self, user_ids: List[int]) -> Tuple[List[int], List[int]]:
+        before = self.max_id(Portfolio.PortfolioID)
+        rows = (
+            {"PortfolioName": f"Portfolio {n + 1}", "Description": "Generated for load testing.", "CreatedBy": self.rng.choice(user_ids)}
+            for n in range(self.args.portfolios)
+        )
+        self.bulk_insert(Portfolio.__table__, rows, "portfolios")
+        portfolio_ids = self.new_ids(Portfolio.PortfolioID, before)
+
+        before = self.max_id(Department.DepartmentID)
+        rows = (
+            {"DepartmentName": f"Department {n + 1}", "PortfolioID": portfolio_ids[n % len(portfolio_ids)], "CreatedBy": self.rng.choice(user_ids)}
+            for n in range(self.args.departments)
+        )
+        self.bulk_insert(Department.__table__, rows, "departments")
+        return portfolio_ids, self.new_ids(Department.DepartmentID, before)
+
+    def skills(self, user_ids: List[int]) -> List[int]:
+        with engine.connect() as conn:
+            taken = {name.lower() for name in conn.execute(select(Skill.SkillName)).scalars()}
+
+        def names() -> Iterator[str]:
+            yield from BASE_SKILLS
+            for qualifier in SKILL_QUALIFIERS:
+                for base in BASE_SKILLS:
+                    yield f"{qualifier} {base}"
+            n = 1
+            while True:
+                yield f"{BASE_SKILLS[n % len(BASE_SKILLS)]} Module {n}"
+                n += 1
+
+        def rows() -> Iterator[dict]:
+            produced = 0
+            for name in names():
+                if produced >= self.args.skills:
+                    return
+                if name.lower() in taken:
+                    continue
+                produced += 1
+                yield {"SkillName": name, "SkillCategory": "Technical", "CreatedBy": self.rng.choice(user_ids)}
+
+        before = self.max_id(Skill.SkillID)
+        self.bulk_insert(Skill.__table__, rows(), "skills")
+        return self.new_ids(Skill.SkillID, before)
+
+    def jobs(self, user_ids, portfolio_ids, department_ids, skill_ids, skill_weights) -> List[int]:
+        before = self.max_id(JobPosting.JobID)
+        rows = (
+            {
+                "JobTitle": f"{self.rng.choice(JOB_TITLES)} #{n + 1}",
+                "Description": "Generated job description for load testing. " * 20,
+                "DepartmentID": self.rng.choice(department_ids),
+                "PortfolioID": self.rng.choice(portfolio_ids),
+                "Status": self.rng.choice(JOB_STATUSES),
+                "ExperienceRequired": f"{self.rng.randint(0, 5)}-{self.rng.randint(6, 12)} years",
+                "JobType": self.rng.choice(JOB_TYPES),
+                "CreatedAt": self.past(730),
+                "CreatedBy": self.rng.choice(user_ids),
+            }
+            for n in range(self.args.jobs)
+        )
+        self.bulk_insert(JobPosting.__table__, rows, "jobs")
+        job_ids = self.new_ids(JobPosting.JobID, before)
+
+        def required_skills() -> Iterator[dict]:
+            for job_id in job_ids:
+                for skill_id in set(self.rng.choices(skill_ids, cum_weights=skill_weights, k=self.rng.randint(3, 8))):
+                    yield {"JobID": job_id, "SkillID": skill_id}
+
+        self.bulk_insert(JobRequiredSkill, required_skills(), "job required skills")
+
+        stages = (
+            {"JobID": job_id, "StageName": name, "Sequence": sequence, "InterviewerInfo": None}
+            for job_id in job_ids
+            for sequence, name in enumerate(STAGE_NAMES[: self.rng.randint(3, len(STAGE_NAMES))], start=1)
+        )
+        self.bulk_insert(InterviewStageTemplate.__table__, stages, "interview stages")
+        return job_ids
+
+    def candidates(self, user_ids, skill_ids, skill_weights) -> range:
+        before = self.max_id(Candidate.CandidateID)
+        candidate_ids = range(before + 1, before + 1 + self.args.candidates)
+        rows = (
+            {
+                "CandidateID": candidate_id,
+                "FullName": f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}",
+                "Email": f"loadtest-candidate-{candidate_id}@example.com",
+                "Phone": f"+91{self.rng.randrange(10 ** 9, 10 ** 10)}",
+                "ExperienceYears": self.rng.randint(0, 20),
+                "NoticePeriod": self.rng.choice([0, 15, 30, 60, 90]),
+                "Source": self.rng.choice(SOURCES),
+                "ResumeSummary": "Generated candidate with experience across several product teams.",
+                "TechnicalSkillsSummary": ", ".join(self.rng.sample(BASE_SKILLS, 5)),
+                "CreatedAt": self.past(730),
+                "CreatedBy": self.rng.choice(user_ids),
+            }
+            for candidate_id in candidate_ids
+        )
+        self.bulk_insert(Candidate.__table__, rows, "candidates")
+
+        def candidate_skills() -> Iterator[dict]:
+            for candidate_id in candidate_ids:
+                for skill_id in set(self.rng.choices(skill_ids, cum_weights=skill_weights, k=self.rng.randint(4, 15))):
+                    yield {"CandidateID": candidate_id, "SkillID": skill_id, "SkillLevel": self.rng.choice(["Beginner", "Intermediate", "Expert"])}
+
+        self.bulk_insert(CandidateSkill.__table__, candidate_skills(), "candidate skills")
+        return candidate_ids
+
+    def applications(self, user_ids, job_ids, candidate_ids: range) -> None:
+        """
+        Spreads --applications over the candidates, each with a stage-log history.
+        A candidate never applies to the same job twice: their i-th application
+        goes to job (offset + i).
+        """
+        count = self.args.applications
+        if count > len(candidate_ids) * len(job_ids):
+            raise SystemExit("More applications requested than (candidate, job) pairs exist.")
+
+        first_id = self.max_id(JobApplication.ApplicationID) + 1
+        started = time.perf_counter()
+        written_logs = 0
+        for chunk_start in range(0, count, self.args.chunk_size):
+            application_rows, log_rows = [], []
+            for n in range(chunk_start, min(count, chunk_start + self.args.chunk_size)):
+                candidate_index, round_number = n % len(candidate_ids), n // len(candidate_ids)
+                application_id = first_id + n
+                applied_at = self.past(365)
+                history = self.stage_history(application_id, applied_at, user_ids)
+                log_rows.extend(history)
+                application_rows.append({
+                    "ApplicationID": application_id,
+                    "CandidateID": candidate_ids[candidate_index],
+                    "JobID": job_ids[(candidate_index * 2654435761 + round_number) % len(job_ids)],
+                    "MatchScore": self.rng.randint(20, 99),
+                    "ScoreDetails": {"skills_match": self.rng.randint(0, 100), "experience_match": self.rng.randint(0, 100)},
+                    "Stage": history[-1]["Status"] if history else "Applied",
+                    "AppliedAt": applied_at,
+                    "CreatedBy": self.rng.choice(user_ids),
+                })
+            with engine.begin() as conn:
+                conn.execute(insert(JobApplication.__table__), application_rows)
+                if log_rows:
+                    conn.execute(insert(ApplicationStageLog.__table__), log_rows)
+            written = chunk_start + len(application_rows)
+            written_logs += len(log_rows)
+            if (chunk_start // self.args.chunk_size) % 20 == 0 or written == count:
+                elapsed = time.perf_counter() - started
+                print(f"  applications: {written:,}/{count:,}, stage logs: {written_logs:,} ({written / max(elapsed, 1e-9):,.0f} applications/s)")
+
+    def stage_history(self, application_id: int, applied_at: datetime, user_ids: List[int]) -> List[dict]:
+        """
+        Walks one application some way along the pipeline, one log row per step.
+        Lengths are exponentially distributed around --stage-logs, so a few
+        applications have long histories.
+        """
+        mean_length = self.args.stage_logs
+        if not mean_length:
+            return []
+        length = min(int(self.rng.expovariate(1.0 / mean_length)), 4 * mean_length)
+        history = []
+        at = applied_at
+        for step in range(length):
+            at += timedelta(hours=self.rng.randint(4, 240))
+            status = "Rejected" if self.rng.random() < 0.12 else PIPELINE[min(step + 1, len(PIPELINE) - 1)]
+            history.append({
+                "ApplicationID": application_id,
+                "Status": status,
+                "AssigneeUserID": self.rng.choice(user_ids),
+                "AssignorUserID": self.rng.choice(user_ids),
+                "OutcomeRecommendation": self.rng.choice(OUTCOMES),
+                "Notes": "Generated stage change.",
+                "CreatedAt": at,
+            })
+            if status == "Rejected":
+                break
+        return history
+
+    @staticmethod
+    def sync_sequences() -> None:
+        """
+        Explicit IDs do not advance PostgreSQL's serial sequences; move them past the data.
+        """
+        if engine.dialect.name != "postgresql":
+            return
+        with engine.begin() as conn:
+            for table, column in (("Candidates", "CandidateID"), ("JobApplications", "ApplicationID")):
+                conn.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('\"{table}\"', '{column}'), "
+                    f"(SELECT coalesce(max(\"{column}\"), 1) FROM \"{table}\"))"
+                ))
+
+    def run(self) -> None:
+        started = time.perf_counter()
+        if self.args.reset:
+            print("--- Resetting Database ---")
+            Base.metadata.drop_all(bind=engine)
+            Base.metadata.create_all(bind=engine)
+
+        print("--- Generating Data ---")
+        user_ids = self.users()
+        portfolio_ids, department_ids = self.portfolios_and_departments(user_ids)
+        skill_ids = self.skills(user_ids)
+        skill_weights = self.zipf_weights(len(skill_ids))
+        job_ids = self.jobs(user_ids, portfolio_ids, department_ids, skill_ids, skill_weights)
+        candidate_ids = self.candidates(user_ids, skill_ids, skill_weights)
+        self.applications(user_ids, job_ids, candidate_ids)
+        self.sync_sequences()
+        # Core inserts skip the ORM hooks; invalidate the ETags of cached reference data.
+        with engine.begin() as conn:
+            table_version_service.bump_tables(conn, table_version_service.TRACKED_TABLES)
+        # Nor are the generated candidates indexed for duplicate detection yet.
+        print("--- Indexing Candidates for Deduplication ---")
+        db = SessionLocal()
+        try:
+            candidate_dedup_service.rebuild_blocking_keys(db)
+        finally:
+            db.close()
+
+        if self.args.rebuild_matches:
+            from app.services import match_matrix_service
+            print("--- Rebuilding Match Matrix ---")
+            db = SessionLocal()
+            try:
+                match_matrix_service.rebuild_match_matrix(db)
+            finally:
+                db.close()
+
+        with engine.connect() as conn:
+            if engine.dialect.name == "postgresql":
+                # Fresh planner statistics, otherwise the first load test runs against bad plans.
+                conn.execution_options(isolation_level="AUTOCOMMIT").exec_driver_sql("ANALYZE")
+        print(f"--- Done in {time.perf_counter() - started:,.0f}s ---")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate synthetic load-test data.")
+    parser.add_argument("--scale", choices=SCALES, default="small", help="Preset volumes; the options below override it.")
+    parser.add_argument("--users", type=int)
+    parser.add_argument("--portfolios", type=int)
+    parser.add_argument("--departments", type=int)
+    parser.add_argument("--skills", type=int)
+    parser.add_argument("--jobs", type=int)
+    parser.add_argument("--candidates", type=int)
+    parser.add_argument("--applications", type=int)
+    parser.add_argument("--stage-logs", type=int, help="Mean stage-log entries per application.")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="Drop and recreate all tables first. Deletes ALL data.")
+    parser.add_argument("--rebuild-matches", action="store_true", help="Rebuild the job/candidate match matrix afterwards.")
+    args = parser.parse_args()
+
+    names = ["users", "portfolios", "departments", "skills", "jobs", "candidates", "applications", "stage_logs"]
+    for name, preset in zip(names, SCALES[args.scale]):
+        if getattr(args, name) is None:
+            setattr(args, name, preset)
+    return args
+
+
+if __name__ == "__main__":
+    Generator(parse_args()).run()
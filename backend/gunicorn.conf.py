@@ -0,0 +1,47 @@
+# gunicorn.conf.py
+"""
+Production server profile: several uvicorn workers under gunicorn, with the
+app imported once in the master and forked (preload_app), so workers share its
+memory copy-on-write and start in milliseconds.
+
+    gunicorn -c gunicorn.conf.py app.main:app
+
+Per-process state does not survive the fork boundary, so the hooks below give
+each worker its own DB connections and log thread, and the cache defaults to
+the SQLite backend shared by all workers on the host (see app/core/cache.py).
+"""
+import os
+
+os.environ.setdefault("CACHE_BACKEND", "sqlite")
+
+# Imported under another name: gunicorn reads every module-level name as a setting, and "config" is one.
+from app.core import config as app_config  # noqa: E402
+
+bind = app_config.SERVER_BIND
+workers = app_config.WEB_CONCURRENCY
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = app_config.SERVER_TIMEOUT_SECONDS
+graceful_timeout = 30
+keepalive = 5
+accesslog = None  # Requests are already logged and counted by the app's middleware.
+
+
+def when_ready(server):
+    # Runs in the master after the app is loaded and before any worker is
+    # forked: imports done here are shared by every worker. The Gemini client is
+    # left to the workers (STARTUP_WARMUP) because gRPC channels are not fork-safe.
+    from app.services import notification_service, resume_parser_service
+    notification_service.warm_templates()
+    resume_parser_service.warm_up()
+
+
+def post_fork(server, worker):
+    from app.core.logging_config import restart_logging_after_fork
+    from app.database.session import engine, replica_engine
+
+    restart_logging_after_fork()
+    # Pooled connections opened by the master must not be shared with a child;
+    # close=False leaves them to the master instead of closing its sockets.
+    engine.dispose(close=False)
+    replica_engine.dispose(close=False)
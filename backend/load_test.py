@@ -0,0 +1,333 @@
+# load_test.py
+"""
+Scripted load test: a pool of virtual users runs a weighted mix of scenarios
+against a running API and reports throughput and tail latency per scenario.
+
+Start the API against a database filled by generate_load_data.py, with the
+fake AI backend and without actually sending email:
+
+    AI_BACKEND=fake SMTP_SERVER=localhost EMAIL_SENDER_ADDRESS=load@example.com \\
+    EMAIL_OUTBOX_SENDER_ENABLED=false uvicorn app.main:app --workers 4
+
+then, from the same backend folder (same .env, so the same DATABASE_URL and SECRET_KEY):
+
+    python load_test.py --base-url http://localhost:8000 --workers 32 --duration 120
+    python load_test.py --mix pipeline=5,autocomplete=5 --json results.json
+
+The script reads the generated users, jobs and skills from the database, signs
+access tokens for them directly, and for the login scenario reads the OTP back
+from the Users table instead of from an inbox.
+"""
+import argparse
+import http.client
+import io
+import json
+import random
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlencode, urlsplit
+
+import docx
+
+from app.core import security
+from app.database.session import SessionLocal
+# Importing init_db registers every model, so the relationships below resolve.
+from app.database import init_db  # noqa: F401
+from app.database.models.user import User
+from app.database.models.job import JobPosting
+from app.database.models.skill import Skill
+from app.database.models.candidate import Candidate
+
+USER_EMAIL_PREFIX = "loadtest-user-"
+
+# Relative weight of each scenario in the default mix.
+DEFAULT_MIX = {
+    "login": 1,
+    "list_jobs": 4,
+    "pipeline": 6,
+    "autocomplete": 8,
+    "upload": 1,
+    "reports": 2,
+}
+
+
+class RequestFailed(Exception):
+    pass
+
+
+class Fixtures:
+    """
+    IDs and names the scenarios pick from, loaded once from the database.
+    """
+
+    def __init__(self, sample_size: int):
+        db = SessionLocal()
+        try:
+            users = db.query(User.Email, User.Role).filter(
+                User.Email.like(f"{USER_EMAIL_PREFIX}%"), User.IsActive == True
+            ).all()
+            if not users:
+                raise SystemExit("No load-test users found. Run generate_load_data.py first.")
+            self.login_emails = [email for email, _ in users]
+            # Uploads and pipeline changes need Admin/HR, so every virtual user acts as one.
+            self.tokens = [
+                security.create_access_token({"sub": email, "role": role}) for email, role in users if role in ("Admin", "HR")
+            ]
+            self.job_ids = [row.JobID for row in db.query(JobPosting.JobID).order_by(JobPosting.JobID.desc()).limit(sample_size)]
+            self.skill_prefixes = sorted({row.SkillName[:3] for row in db.query(Skill.SkillName).limit(sample_size)})
+            self.name_terms = sorted({
+                part for row in db.query(Candidate.FullName).limit(sample_size) for part in row.FullName.split()[:2]
+            })
+        finally:
+            db.close()
+        if not self.tokens or not self.job_ids:
+            raise SystemExit("The database needs Admin/HR users and jobs. Run generate_load_data.py first.")
+
+    @staticmethod
+    def current_otp(email: str) -> Optional[str]:
+        db = SessionLocal()
+        try:
+            return db.query(User.OtpCode).filter(User.Email == email).scalar()
+        finally:
+            db.close()
+
+
+class VirtualUser:
+    """
+    One simulated client: a keep-alive connection and an access token.
+    """
+
+    def __init__(self, base_url: str, token: str, login_email: str, fixtures: Fixtures, rng: random.Random):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.https = parts.scheme == "https"
+        self.token = token
+        self.login_email = login_email
+        self.fixtures = fixtures
+        self.rng = rng
+        self.connection: Optional[http.client.HTTPConnection] = None
+
+    def request(self, method: str, path: str, body: bytes = None, content_type: str = None, auth: bool = True) -> bytes:
+        headers = {}
+        if auth:
+            headers["Authorization"] = f"Bearer {self.token}"
+        if content_type:
+            headers["Content-Type"] = content_type
+        for attempt in range(2):
+            if self.connection is None:
+                connection_class = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+                self.connection = connection_class(self.host, self.port, timeout=60)
+            try:
+                self.connection.request(method, path, body=body, headers=headers)
+                response = self.connection.getresponse()
+                payload = response.read()
+                break
+            except (http.client.HTTPException, ConnectionError):
+                # The server closed an idle keep-alive connection; retry once on a fresh one.
+                self.connection.close()
+                self.connection = None
+                if attempt:
+                    raise
+        if response.status >= 400:
+            raise RequestFailed(f"{method} {path.split('?')[0]} -> {response.status}")
+        return payload
+
+    def get(self, path: str, **params) -> bytes:
+        return self.request("GET", f"{path}?{urlencode(params)}" if params else path)
+
+    def post_json(self, path: str, data: dict, auth: bool = True) -> dict:
+        return json.loads(self.request("POST", path, json.dumps(data).encode(), "application/json", auth=auth))
+
+    # --- scenarios ---
+
+    def login(self) -> None:
+        self.post_json("/users/login/request-otp", {"email": self.login_email}, auth=False)
+        otp = self.fixtures.current_otp(self.login_email)
+        self.post_json("/users/login/verify-otp", {"email": self.login_email, "otp": otp}, auth=False)
+
+    def list_jobs(self) -> None:
+        self.get("/jobs/")
+
+    def pipeline(self) -> None:
+        job_id = self.rng.choice(self.fixtures.job_ids)
+        self.get(f"/jobs/{job_id}/applications")
+        self.get(f"/jobs/{job_id}")
+
+    def autocomplete(self) -> None:
+        self.get("/skills/", q=self.rng.choice(self.fixtures.skill_prefixes))
+        if self.fixtures.name_terms:
+            self.get("/candidates/search", q=self.rng.choice(self.fixtures.name_terms))
+
+    def upload(self) -> None:
+        job_id = self.rng.choice(self.fixtures.job_ids)
+        body, content_type = multipart_file("file", "resume.docx", synthetic_resume(self.rng))
+        self.request("POST", f"/candidates/apply/{job_id}", body, content_type)
+
+    def reports(self) -> None:
+        self.get("/reports/dashboard-stats")
+
+    def close(self) -> None:
+        if self.connection is not None:
+            self.connection.close()
+
+
+def synthetic_resume(rng: random.Random) -> bytes:
+    """
+    A small DOCX resume with a unique email, so every upload creates a new candidate.
+    """
+    document = docx.Document()
+    document.add_paragraph(f"Load Test Candidate {rng.randrange(10 ** 6)}")
+    document.add_paragraph(f"loadtest-upload-{uuid.uuid4().hex[:12]}@example.com")
+    document.add_paragraph("Backend developer with 5 years of Python, SQL and Docker experience.")
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def multipart_file(field: str, filename: str, content: bytes):
+    boundary = uuid.uuid4().hex
+    body = (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+        "Content-Type: application/octet-stream\r\n\r\n"
+    ).encode() + content + f"\r\n--{boundary}--\r\n".encode()
+    return body, f"multipart/form-data; boundary={boundary}"
+
+
+class Results:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.error_samples: Dict[str, str] = {}
+
+    def record(self, scenario: str, seconds: float, error: Optional[Exception]) -> None:
+        with self._lock:
+            if error is None:
+                self.latencies.setdefault(scenario, []).append(seconds)
+            else:
+                self.errors[scenario] = self.errors.get(scenario, 0) + 1
+                self.error_samples.setdefault(scenario, str(error))
+
+    def summary(self, elapsed: float) -> List[dict]:
+        rows = []
+        for scenario in sorted(set(self.latencies) | set(self.errors)):
+            samples = sorted(self.latencies.get(scenario, []))
+            row = {
+                "scenario": scenario,
+                "ok": len(samples),
+                "errors": self.errors.get(scenario, 0),
+                "throughput_per_second": len(samples) / elapsed,
+            }
+            for label, quantile in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99)):
+                row[f"{label}_ms"] = samples[min(len(samples) - 1, int(len(samples) * quantile))] * 1000 if samples else None
+            row["max_ms"] = samples[-1] * 1000 if samples else None
+            if scenario in self.error_samples:
+                row["first_error"] = self.error_samples[scenario]
+            rows.append(row)
+        return rows
+
+
+def run_worker(user: VirtualUser, mix: Dict[str, int], deadline: float, warmup_until: float, think_seconds: float, results: Results) -> None:
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    scenarios: Dict[str, Callable[[], None]] = {name: getattr(user, name) for name in names}
+    try:
+        while time.monotonic() < deadline:
+            name = user.rng.choices(names, weights)[0]
+            started = time.monotonic()
+            error = None
+            try:
+                scenarios[name]()
+            except Exception as e:
+                error = e
+            if started >= warmup_until:
+                results.record(name, time.monotonic() - started, error)
+            if think_seconds:
+                time.sleep(user.rng.expovariate(1.0 / think_seconds))
+    finally:
+        user.close()
+
+
+def print_table(rows: List[dict], elapsed: float) -> None:
+    header = f"{'scenario':<14}{'ok':>8}{'errors':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}"
+    print(f"\n--- Results over {elapsed:,.0f}s ---")
+    print(header)
+    print("-" * len(header))
+
+    def ms(value):
+        return f"{value:>9.1f}" if value is not None else f"{'-':>9}"
+
+    for row in rows:
+        print(f"{row['scenario']:<14}{row['ok']:>8}{row['errors']:>8}{row['throughput_per_second']:>9.1f}"
+              f"{ms(row['p50_ms'])}{ms(row['p95_ms'])}{ms(row['p99_ms'])}{ms(row['max_ms'])}")
+    for row in rows:
+        if "first_error" in row:
+            print(f"  {row['scenario']}: first error: {row['first_error']}")
+
+
+def parse_mix(value: str) -> Dict[str, int]:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"Unknown scenario '{name}'. Choose from: {', '.join(DEFAULT_MIX)}")
+        mix[name] = int(weight or 1)
+    return mix
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a scripted load test against the API.")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--workers", type=int, default=16, help="Concurrent virtual users.")
+    parser.add_argument("--duration", type=float, default=60, help="Seconds to run, including warm-up.")
+    parser.add_argument("--warmup", type=float, default=5, help="Seconds at the start that are not measured.")
+    parser.add_argument("--think-time", type=float, default=0, help="Mean pause between a user's scenarios, in seconds.")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help="e.g. pipeline=5,autocomplete=3")
+    parser.add_argument("--sample-size", type=int, default=1000, help="How many jobs/skills/names to draw requests from.")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", help="Also write the results to this file.")
+    args = parser.parse_args()
+
+    fixtures = Fixtures(args.sample_size)
+    if "login" in args.mix and args.workers > len(fixtures.login_emails):
+        # Two users logging in as the same account would overwrite each other's OTP.
+        raise SystemExit("The login scenario needs at least as many load-test users as --workers.")
+
+    results = Results()
+    started = time.monotonic()
+    deadline = started + args.duration
+    threads = []
+    for n in range(args.workers):
+        user = VirtualUser(
+            args.base_url,
+            fixtures.tokens[n % len(fixtures.tokens)],
+            fixtures.login_emails[n % len(fixtures.login_emails)],
+            fixtures,
+            random.Random(args.seed + n)
+        )
+        thread = threading.Thread(
+            target=run_worker,
+            args=(user, args.mix, deadline, started + args.warmup, args.think_time, results),
+            daemon=True
+        )
+        thread.start()
+        threads.append(thread)
+
+    print(f"Running {args.workers} virtual users for {args.duration:,.0f}s against {args.base_url} ...")
+    for thread in threads:
+        thread.join()
+
+    measured = max(time.monotonic() - started - args.warmup, 1e-9)
+    rows = results.summary(measured)
+    print_table(rows, measured)
+    if args.json:
+        with open(args.json, "w") as output:
+            json.dump({"workers": args.workers, "duration_seconds": measured, "scenarios": rows}, output, indent=2)
+
+
+if __name__ == "__main__":
+    main()
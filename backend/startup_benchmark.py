@@ -0,0 +1,116 @@
+# startup_benchmark.py
+"""
+Measures how long a fresh worker takes to import the API, and which modules
+that time goes to, using Python's -X importtime in clean subprocesses.
+
+    python startup_benchmark.py                    # report
+    python startup_benchmark.py --max-seconds 1.5  # also fail if slower (for CI)
+
+It also fails if a dependency that is meant to load lazily (see LAZY_MODULES)
+is imported by `import app.main`, which is the usual way cold start regresses.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+TARGET = "app.main"
+
+# Heavy dependencies that must only be imported on first use or by the warm-up hooks.
+LAZY_MODULES = ["google.generativeai", "PyPDF2", "docx", "jinja2"]
+
+_CHILD_CODE = (
+    "import json, sys, time\n"
+    "started = time.perf_counter()\n"
+    f"import {TARGET}\n"
+    "elapsed = time.perf_counter() - started\n"
+    "print(json.dumps({'seconds': elapsed, 'modules': sorted(sys.modules)}))\n"
+)
+
+
+def run_once() -> Tuple[float, Dict[str, int], List[str]]:
+    """
+    Imports the app in a new interpreter. Returns (seconds, cumulative
+    microseconds per module, modules loaded).
+    """
+    env = dict(os.environ)
+    # The engine is created at import time but nothing connects, so any URL will do.
+    env.setdefault("DATABASE_URL", "sqlite://")
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _CHILD_CODE],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        raise SystemExit(f"Importing {TARGET} failed:\n{completed.stderr}")
+
+    cumulative = {}
+    for line in completed.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, _, cumulative_us, name = (part.strip() for part in line.replace("import time:", "|", 1).split("|"))
+        cumulative[name] = int(cumulative_us)
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    return result["seconds"], cumulative, result["modules"]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=f"Benchmark the import time of {TARGET}.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="How many of the slowest imports to list.")
+    parser.add_argument("--max-seconds", type=float, help="Fail if the median import time is above this.")
+    parser.add_argument("--json", help="Also write the results to this file.")
+    args = parser.parse_args()
+
+    # The first run fills the bytecode caches and is not counted.
+    run_once()
+    timings, per_module = [], {}
+    loaded = []
+    for _ in range(args.runs):
+        seconds, cumulative, loaded = run_once()
+        timings.append(seconds)
+        for name, micros in cumulative.items():
+            per_module.setdefault(name, []).append(micros)
+
+    median_seconds = statistics.median(timings)
+    top_level = {
+        name: statistics.median(samples) / 1e6
+        for name, samples in per_module.items()
+        if "." not in name or name.startswith("app.")
+    }
+    slowest = sorted(top_level.items(), key=lambda item: item[1], reverse=True)[:args.top]
+    eager_lazy_modules = [name for name in LAZY_MODULES if name in loaded]
+
+    print(f"import {TARGET}: median {median_seconds:.3f}s, min {min(timings):.3f}s, max {max(timings):.3f}s over {args.runs} runs")
+    print(f"\n{'module':<45}{'cumulative s':>14}")
+    for name, seconds in slowest:
+        print(f"{name:<45}{seconds:>14.3f}")
+
+    if args.json:
+        with open(args.json, "w") as output:
+            json.dump({
+                "median_seconds": median_seconds,
+                "runs": timings,
+                "slowest_modules": dict(slowest),
+                "eager_lazy_modules": eager_lazy_modules,
+            }, output, indent=2)
+
+    failed = False
+    if eager_lazy_modules:
+        print(f"\nFAIL: imported at startup but meant to be lazy: {', '.join(eager_lazy_modules)}")
+        failed = True
+    if args.max_seconds is not None and median_seconds > args.max_seconds:
+        print(f"\nFAIL: median import time {median_seconds:.3f}s is above the {args.max_seconds:.3f}s budget")
+        failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+# tests/conftest.py
+"""
+Shared fixtures. The suite runs against real PostgreSQL databases (the schema
+uses tsvector columns and SELECT ... SKIP LOCKED):
+
+    createdb staffing_test
+    createdb staffing_test_replica    # optional, for test_read_replica.py
+    pip install -r requirements-dev.txt
+    TEST_DATABASE_URL=postgresql+psycopg2://localhost/staffing_test \
+    TEST_DATABASE_REPLICA_URL=postgresql+psycopg2://localhost/staffing_test_replica \
+    pytest
+
+Every table in these databases is dropped and recreated. Without
+TEST_DATABASE_URL the database tests are skipped.
+"""
+import os
+import socket
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+TEST_DATABASE_REPLICA_URL = os.getenv("TEST_DATABASE_REPLICA_URL", "")
+
+# app.core.config reads the environment once, on import, so it is set up before
+# any app module is loaded. The URL below is only used when no test database is
+# configured; nothing connects to it because every test is skipped.
+os.environ["DATABASE_URL"] = TEST_DATABASE_URL or "postgresql+psycopg2://localhost/staffing_test"
+os.environ["DATABASE_REPLICA_URL"] = TEST_DATABASE_REPLICA_URL
+os.environ.update(
+    APP_ENV="test",
+    SECRET_KEY="test-secret-key",
+    ALGORITHM="HS256",
+    AI_BACKEND="fake",
+    AI_FAKE_LATENCY_SECONDS="0",
+    STARTUP_WARMUP="off",
+    EMAIL_OUTBOX_SENDER_ENABLED="false", # Tests drive the outbox sender themselves
+    SMTP_SERVER="127.0.0.1",
+    SMTP_USE_TLS="false",
+    EMAIL_SENDER_ADDRESS="noreply@example.com",
+    DIGEST_ENABLED="false",
+    REDISCOVERY_WORKER_ENABLED="false",
+    QUERY_BUDGET_MODE="warn", # Responses carry X-DB-Query-Count
+    LOG_FORMAT="text",
+    LOG_LEVEL="WARNING",
+)
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.core import security  # noqa: E402
+from app.database.base import Base  # noqa: E402
+from app.database.session import engine, replica_engine, SessionLocal, ReadSessionLocal  # noqa: E402
+from app.main import app  # noqa: E402
+from app.database.models.user import User  # noqa: E402
+from app.database.models.portfolio_department import Department, Portfolio  # noqa: E402
+from app.database.models.skill import Skill, CandidateSkill  # noqa: E402
+from app.database.models.job import JobPosting  # noqa: E402
+from app.database.models.candidate import Candidate, JobApplication  # noqa: E402
+from app.database.models.workflow_feedback import InterviewStageTemplate  # noqa: E402
+from app.services import talent_rediscovery_service  # noqa: E402
+
+ADMIN_EMAIL = "admin@example.com"
+
+
+def seed(session_factory) -> SimpleNamespace:
+    """
+    A small, fixed data set. Seeding an empty database always gives the same
+    IDs, so the primary and the replica hold identical rows.
+    """
+    db = session_factory()
+    try:
+        admin = User(UserName="Admin", Email=ADMIN_EMAIL, Role="Admin", IsActive=True)
+        db.add(admin)
+        db.flush()
+
+        portfolio = Portfolio(PortfolioName="Engineering", CreatedBy=admin.UserID)
+        db.add(portfolio)
+        db.flush()
+        department = Department(DepartmentName="Platform", PortfolioID=portfolio.PortfolioID, CreatedBy=admin.UserID)
+        db.add(department)
+
+        python, sql, react = (Skill(SkillName=name, CreatedBy=admin.UserID) for name in ("Python", "SQL", "React"))
+        db.add_all([python, sql, react])
+        db.flush()
+
+        job = JobPosting(
+            JobTitle="Backend Engineer", Description="Python and SQL backend work on our APIs.",
+            DepartmentID=department.DepartmentID, PortfolioID=portfolio.PortfolioID, Status="Open",
+            ExperienceRequired="3 years", JobType="Full-time", CreatedBy=admin.UserID,
+        )
+        job.required_skills.extend([python, sql])
+        db.add(job)
+        db.flush()
+        db.add_all([
+            InterviewStageTemplate(JobID=job.JobID, StageName="HR Screening", Sequence=1),
+            InterviewStageTemplate(JobID=job.JobID, StageName="Technical Round", Sequence=2),
+        ])
+
+        priya = Candidate(
+            FullName="Priya Sharma", Email="priya.sharma@example.com", Phone="+91 98765 43210",
+            ResumeSummary="Backend developer with five years of Python and PostgreSQL.",
+            TechnicalSkillsSummary="Python, SQL, FastAPI", CreatedBy=admin.UserID,
+        )
+        # The same person under another email: same phone, same name.
+        priya_duplicate = Candidate(
+            FullName="Priya Sharma", Email="priya.s@example.org", Phone="9876543210",
+            ResumeSummary="Python developer.", CreatedBy=admin.UserID,
+        )
+        rahul = Candidate(
+            FullName="Rahul Verma", Email="rahul.verma@example.com", Phone="+91 91234 56789",
+            ResumeSummary="Frontend developer working with React.",
+            TechnicalSkillsSummary="React, JavaScript", CreatedBy=admin.UserID,
+        )
+        db.add_all([priya, priya_duplicate, rahul])
+        db.flush()
+        db.add_all([
+            CandidateSkill(CandidateID=priya.CandidateID, SkillID=python.SkillID),
+            CandidateSkill(CandidateID=priya.CandidateID, SkillID=sql.SkillID),
+            CandidateSkill(CandidateID=rahul.CandidateID, SkillID=react.SkillID),
+        ])
+
+        applications = [
+            JobApplication(CandidateID=candidate.CandidateID, JobID=job.JobID, MatchScore=score,
+                           ScoreDetails={"skills_match": score}, Stage="Applied", CreatedBy=admin.UserID)
+            for candidate, score in ((priya, 82), (rahul, 41))
+        ]
+        db.add_all(applications)
+        talent_rediscovery_service.queue_run(db, job.JobID, talent_rediscovery_service.TRIGGER_JOB_CREATED)
+        db.commit()
+
+        return SimpleNamespace(
+            admin_id=admin.UserID,
+            portfolio_id=portfolio.PortfolioID,
+            department_id=department.DepartmentID,
+            job_id=job.JobID,
+            candidate_id=priya.CandidateID,
+            duplicate_id=priya_duplicate.CandidateID,
+            other_candidate_id=rahul.CandidateID,
+            application_id=applications[0].ApplicationID,
+            other_application_id=applications[1].ApplicationID,
+        )
+    finally:
+        db.close()
+
+
+def _reset(bind) -> None:
+    Base.metadata.drop_all(bind=bind)
+    Base.metadata.create_all(bind=bind)
+
+
+@pytest.fixture(scope="session")
+def data():
+    """
+    Recreates the schema and seeds it, on the primary and (when configured) the replica.
+    """
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    _reset(engine)
+    seeded = seed(SessionLocal)
+    if replica_engine is not engine:
+        _reset(replica_engine)
+        seed(ReadSessionLocal)
+    return seeded
+
+
+@pytest.fixture(scope="session")
+def client(data):
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(scope="session")
+def admin_headers(data):
+    token = security.create_access_token({"sub": ADMIN_EMAIL, "role": "Admin"})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture(scope="session")
+def live_server(client):
+    """
+    The app served by uvicorn on a local port, for streaming responses, which
+    TestClient only returns once they are complete.
+    """
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=free_port(), log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started:
+        if time.monotonic() > deadline:
+            raise RuntimeError("uvicorn did not start")
+        time.sleep(0.05)
+    yield f"http://127.0.0.1:{server.config.port}"
+    server.should_exit = True
+    thread.join(10)
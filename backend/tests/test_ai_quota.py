@@ -0,0 +1,98 @@
+# tests/test_ai_quota.py
+import threading
+import time
+
+import pytest
+
+from app.core.ai_quota import FairGate, QueueFull
+
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_gate_turns_away_requests_beyond_the_queue_cap():
+    gate = FairGate(capacity=1, max_waiting=1)
+    assert gate.acquire("alice", timeout=1)
+
+    admitted = []
+    waiter = threading.Thread(target=lambda: admitted.append(gate.acquire("bob", timeout=5)))
+    waiter.start()
+    wait_until(lambda: gate.waiting == 1)
+
+    # The queue is full: no waiting, no thread held.
+    started = time.monotonic()
+    with pytest.raises(QueueFull):
+        gate.acquire("carol", timeout=5)
+    assert time.monotonic() - started < 1
+
+    gate.release()
+    waiter.join(5)
+    assert admitted == [True]
+    assert gate.waiting == 0
+    gate.release()
+    assert gate.acquire("carol", timeout=1)
+
+
+def test_gate_serves_waiting_users_round_robin():
+    gate = FairGate(capacity=1, max_waiting=10)
+    assert gate.acquire("alice", timeout=1)
+    order = []
+
+    def request(user):
+        assert gate.acquire(user, timeout=5)
+        order.append(user)
+        gate.release()
+
+    threads = []
+    for user in ("alice", "alice", "bob"):
+        thread = threading.Thread(target=request, args=(user,))
+        thread.start()
+        threads.append(thread)
+        wait_until(lambda: gate.waiting == len(threads))
+    gate.release()
+    for thread in threads:
+        thread.join(5)
+    assert order == ["alice", "bob", "alice"]
+
+
+def test_gate_gives_up_after_the_timeout():
+    gate = FairGate(capacity=1, max_waiting=1)
+    assert gate.acquire("alice", timeout=1)
+    assert gate.acquire("bob", timeout=0.05) is False
+    assert gate.waiting == 0
+
+
+def test_resume_upload_does_not_block_the_event_loop(live_server, admin_headers, data, monkeypatch):
+    import httpx
+
+    from app.services import gemini_service
+    from test_query_budgets import resume_docx
+
+    in_ai_call, finish_ai_call = threading.Event(), threading.Event()
+    analyze = gemini_service.analyze_resume_with_job_desc
+
+    def slow_analyze(**kwargs):
+        in_ai_call.set()
+        assert finish_ai_call.wait(10)
+        return analyze(**kwargs)
+
+    monkeypatch.setattr(gemini_service, "analyze_resume_with_job_desc", slow_analyze)
+    files = {"file": ("resume.docx", resume_docx("Ravi Kumar", "ravi.kumar@example.com", "Python"),
+                      "application/vnd.openxmlformats-officedocument.wordprocessingml.document")}
+    uploads = []
+    upload = threading.Thread(target=lambda: uploads.append(
+        httpx.post(f"{live_server}/candidates/apply/{data.job_id}", headers=admin_headers, files=files, timeout=15)
+    ))
+    upload.start()
+    try:
+        assert in_ai_call.wait(5)
+        # The worker keeps serving while the AI call is in progress.
+        assert httpx.get(f"{live_server}/skills/", headers=admin_headers, timeout=2).status_code == 200
+    finally:
+        finish_ai_call.set()
+        upload.join(15)
+    assert uploads[0].status_code == 201, uploads[0].text
@@ -0,0 +1,50 @@
+# tests/test_candidate_dedup.py
+import pytest
+
+from app.database.session import SessionLocal
+from app.database.models.candidate import Candidate
+from app.services import candidate_dedup_service
+from app.services.candidate_dedup_service import Identity, compare, normalize_email
+
+
+@pytest.mark.parametrize("email, normalized", [
+    ("John.Doe+jobs@GoogleMail.com", "johndoe@gmail.com"),
+    ("j.o.h.n.doe@gmail.com", "johndoe@gmail.com"),
+    ("John.Doe@Example.com", "john.doe@example.com"),
+    ("john.doe+jobs@example.com", "john.doe+jobs@example.com"),
+    ("john_doe@example.com", "john_doe@example.com"),
+    ("not an email", None),
+])
+def test_normalize_email(email, normalized):
+    assert normalize_email(email) == normalized
+
+
+def test_same_email_needs_the_same_mailbox():
+    # Only Gmail ignores dots; on other domains these are two mailboxes.
+    assert compare(Identity.of("Jane Doe", "j.doe@example.com", None), Identity.of("Jim Doe", "jdoe@example.com", None)) is None
+    reason, _ = compare(Identity.of("Jane Doe", "j.doe@gmail.com", None), Identity.of("J Doe", "jdoe+cv@gmail.com", None))
+    assert reason == candidate_dedup_service.REASON_SAME_EMAIL
+
+
+def test_sweep_merges_only_direct_matches_of_the_survivor(data):
+    db = SessionLocal()
+    try:
+        # first and second share a phone, second and third an email local part;
+        # first and third have nothing in common but the name.
+        first, second, third = (
+            Candidate(FullName="Arjun Mehta", Email=email, Phone=phone, CreatedBy=data.admin_id)
+            for email, phone in (
+                ("arjun.m@example.com", "+91 90000 11111"),
+                ("arjunworks@example.org", "9000011111"),
+                ("arjunworks@example.net", "+91 90000 22222"),
+            )
+        )
+        db.add_all([first, second, third])
+        db.flush()
+
+        report = candidate_dedup_service.sweep(db)
+        assert [first.CandidateID, second.CandidateID] in report.clusters
+        assert not any(third.CandidateID in cluster for cluster in report.clusters)
+    finally:
+        db.rollback()
+        db.close()
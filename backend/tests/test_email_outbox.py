@@ -0,0 +1,228 @@
+# tests/test_email_outbox.py
+"""
+The outbox sender against a local SMTP sink (aiosmtpd), over plain SMTP
+(SMTP_USE_TLS=false in conftest.py).
+"""
+from datetime import timedelta
+
+import pytest
+from aiosmtpd.controller import Controller
+from sqlalchemy import func
+
+from app.core import config
+from app.database.session import SessionLocal
+from app.database.models.email_outbox import EmailOutbox
+from app.services import email_service
+from app.services.email_service import OutboxSender, SMTPConnectionPool
+
+from conftest import free_port
+
+BOUNCE = "bounce@example.com" # The sink refuses this recipient
+
+
+class SinkHandler:
+    def __init__(self):
+        self.messages = [] # (connection, recipient)
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address == BOUNCE:
+            return "550 No such user"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        # session.peer is the client's address, one per connection.
+        self.messages.extend((session.peer, recipient) for recipient in envelope.rcpt_tos)
+        return "250 Message accepted"
+
+    @property
+    def connections(self):
+        return {peer for peer, _ in self.messages}
+
+
+@pytest.fixture
+def smtp_sink(monkeypatch):
+    handler = SinkHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    monkeypatch.setattr(config, "SMTP_PORT", controller.port)
+    monkeypatch.setattr(config, "EMAIL_RETRY_BASE_SECONDS", 30)
+    monkeypatch.setattr(config, "EMAIL_MAX_ATTEMPTS", 3)
+    yield handler
+    controller.stop()
+
+
+@pytest.fixture
+def sender(data):
+    db = SessionLocal()
+    try:
+        db.query(EmailOutbox).delete()
+        db.commit()
+    finally:
+        db.close()
+    outbox_sender = OutboxSender(SMTPConnectionPool(1, 60))
+    yield outbox_sender
+    outbox_sender.pool.close_all()
+
+
+def enqueue(*recipients, attempts=0, kind="test"):
+    db = SessionLocal()
+    try:
+        rows = email_service.enqueue_bulk(db, [(recipient, "Hello", "<p>Hello</p>") for recipient in recipients], kind)
+        for row in rows:
+            row.Attempts = attempts
+        db.commit()
+        return [row.OutboxID for row in rows]
+    finally:
+        db.close()
+
+
+def outbox_rows():
+    """
+    {recipient: (status, attempts, seconds until the next attempt)}
+    """
+    db = SessionLocal()
+    try:
+        rows = db.query(
+            EmailOutbox.Recipient, EmailOutbox.Status, EmailOutbox.Attempts,
+            func.extract("epoch", EmailOutbox.NextAttemptAt - func.now())
+        ).all()
+        return {recipient: (status, attempts, float(delay)) for recipient, status, attempts, delay in rows}
+    finally:
+        db.close()
+
+
+def test_one_connection_carries_the_batch(smtp_sink, sender):
+    enqueue("a@example.com", "b@example.com", "c@example.com")
+    assert sender.process_batch() == 3
+    assert sorted(recipient for _, recipient in smtp_sink.messages) == ["a@example.com", "b@example.com", "c@example.com"]
+    assert len(smtp_sink.connections) == 1
+    assert {status for status, _, _ in outbox_rows().values()} == {email_service.STATUS_SENT}
+
+
+def test_pooled_connection_is_reused_by_the_next_batch(smtp_sink, sender):
+    enqueue("a@example.com")
+    sender.process_batch()
+    enqueue("b@example.com")
+    sender.process_batch()
+    assert len(smtp_sink.messages) == 2
+    assert len(smtp_sink.connections) == 1
+
+
+def test_dropped_pooled_connection_is_replaced(smtp_sink, sender):
+    sender.pool.max_idle_seconds = 0 # Probe every idle connection before reuse
+    enqueue("a@example.com")
+    sender.process_batch()
+    (server, _), = sender.pool._idle
+
+    def reset():
+        # What a probe on a socket the server already dropped can raise.
+        raise ConnectionResetError(104, "Connection reset by peer")
+
+    server.noop = reset
+    enqueue("b@example.com")
+    assert sender.process_batch() == 1
+    assert outbox_rows()["b@example.com"][0] == email_service.STATUS_SENT
+    assert len(smtp_sink.connections) == 2
+    assert server.sock is None # The dropped connection was closed, not leaked
+
+
+def test_refused_recipient_is_retried_with_backoff(smtp_sink, sender):
+    enqueue("a@example.com", BOUNCE, "c@example.com")
+    assert sender.process_batch() == 3
+    rows = outbox_rows()
+    status, attempts, delay = rows[BOUNCE]
+    assert (status, attempts) == (email_service.STATUS_PENDING, 1)
+    assert 25 <= delay <= 30
+    # The other messages on the same connection still went out.
+    assert rows["a@example.com"][0] == rows["c@example.com"][0] == email_service.STATUS_SENT
+    assert len(smtp_sink.connections) == 1
+    # Not due yet, so the next batch leaves it alone.
+    assert sender.process_batch() == 0
+
+
+def test_backoff_doubles_per_attempt(smtp_sink, sender):
+    enqueue(BOUNCE, attempts=1)
+    sender.process_batch()
+    status, attempts, delay = outbox_rows()[BOUNCE]
+    assert (status, attempts) == (email_service.STATUS_PENDING, 2)
+    assert 55 <= delay <= 60
+
+
+def test_gives_up_after_max_attempts(smtp_sink, sender):
+    enqueue(BOUNCE, attempts=config.EMAIL_MAX_ATTEMPTS - 1)
+    sender.process_batch()
+    status, attempts, _ = outbox_rows()[BOUNCE]
+    assert (status, attempts) == (email_service.STATUS_FAILED, config.EMAIL_MAX_ATTEMPTS)
+    assert sender.failed_total == 1
+
+
+def test_connection_failure_retries_the_whole_batch(smtp_sink, sender, monkeypatch):
+    monkeypatch.setattr(config, "SMTP_PORT", free_port()) # Nothing listens there
+    enqueue("a@example.com", "b@example.com")
+    assert sender.process_batch() == 2
+    assert {(status, attempts) for status, attempts, _ in outbox_rows().values()} == {(email_service.STATUS_PENDING, 1)}
+    assert smtp_sink.messages == []
+
+
+def test_rows_locked_by_another_sender_are_skipped(smtp_sink, sender):
+    locked_id, _ = enqueue("locked@example.com", "free@example.com")
+    other_sender = SessionLocal()
+    try:
+        # Another worker's sender has claimed the first row and is still sending it.
+        other_sender.query(EmailOutbox).filter(EmailOutbox.OutboxID == locked_id).with_for_update().one()
+        assert sender.process_batch() == 1
+        assert [recipient for _, recipient in smtp_sink.messages] == ["free@example.com"]
+    finally:
+        other_sender.rollback()
+        other_sender.close()
+
+    rows = outbox_rows()
+    assert rows["locked@example.com"][:2] == (email_service.STATUS_PENDING, 0)
+    assert rows["free@example.com"][0] == email_service.STATUS_SENT
+
+
+def outbox_content():
+    db = SessionLocal()
+    try:
+        return {recipient: (subject, body) for recipient, subject, body in db.query(
+            EmailOutbox.Recipient, EmailOutbox.Subject, EmailOutbox.HtmlBody
+        ).all()}
+    finally:
+        db.close()
+
+
+def test_login_codes_are_blanked_once_sent_or_failed(smtp_sink, sender):
+    enqueue("a@example.com", kind="otp")
+    enqueue(BOUNCE, attempts=config.EMAIL_MAX_ATTEMPTS - 1, kind="otp")
+    enqueue("b@example.com")
+    sender.process_batch()
+    content = outbox_content()
+    assert content["a@example.com"] == content[BOUNCE] == (email_service.REDACTED_SUBJECT, "")
+    assert content["b@example.com"] == ("Hello", "<p>Hello</p>")
+    # The code itself was delivered.
+    assert [recipient for _, recipient in smtp_sink.messages] == ["a@example.com", "b@example.com"]
+
+
+def test_cleanup_redacts_old_codes_and_deletes_expired_sent_rows(data):
+    db = SessionLocal()
+    try:
+        db.query(EmailOutbox).delete()
+        db.add_all([
+            EmailOutbox(Kind="otp", Recipient="old-code@example.com", Subject="Your code is 123456", HtmlBody="123456",
+                        Status=email_service.STATUS_FAILED, Attempts=5),
+            EmailOutbox(Kind="welcome", Recipient="expired@example.com", Subject="Welcome", HtmlBody="<p>Hi</p>",
+                        Status=email_service.STATUS_SENT, Attempts=1,
+                        SentAt=func.now() - timedelta(days=config.EMAIL_OUTBOX_RETENTION_DAYS + 1)),
+            EmailOutbox(Kind="welcome", Recipient="recent@example.com", Subject="Welcome", HtmlBody="<p>Hi</p>",
+                        Status=email_service.STATUS_SENT, Attempts=1, SentAt=func.now()),
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+    assert OutboxSender(SMTPConnectionPool(1, 60)).cleanup() == (1, 1)
+    assert outbox_content() == {
+        "old-code@example.com": (email_service.REDACTED_SUBJECT, ""),
+        "recent@example.com": ("Welcome", "<p>Hi</p>"),
+    }
@@ -0,0 +1,83 @@
+# tests/test_insights.py
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager, nullcontext
+
+from fastapi import HTTPException
+
+from app.database.session import SessionLocal
+from app.database.models.application_insight import ApplicationInsight
+from app.database.models.candidate import Candidate, JobApplication
+from app.services import insights_service
+
+
+def test_missing_application_is_404(client, admin_headers):
+    response = client.get("/candidates/application/999999/insights", headers=admin_headers)
+    assert response.status_code == 404
+
+
+def test_application_without_resume_summary_is_400(client, admin_headers, data):
+    db = SessionLocal()
+    try:
+        candidate = Candidate(FullName="Kiran Rao", Email="kiran.rao@example.com", CreatedBy=data.admin_id)
+        db.add(candidate)
+        db.flush()
+        application = JobApplication(CandidateID=candidate.CandidateID, JobID=data.job_id, Stage="Applied", CreatedBy=data.admin_id)
+        db.add(application)
+        db.commit()
+        application_id = application.ApplicationID
+    finally:
+        db.close()
+    response = client.get(f"/candidates/application/{application_id}/insights", headers=admin_headers)
+    assert response.status_code == 400
+
+
+def test_follower_takes_over_when_the_leader_is_rate_limited(data, monkeypatch):
+    follower_waiting = threading.Event()
+
+    class WatchedFuture(Future):
+        def result(self, timeout=None):
+            follower_waiting.set()
+            return super().result(timeout)
+
+    monkeypatch.setattr(insights_service, "Future", WatchedFuture)
+
+    @contextmanager
+    def rate_limited_slot():
+        assert follower_waiting.wait(5)
+        raise HTTPException(status_code=429, detail="Too many AI requests")
+        yield
+
+    summary, description = "Go developer, eight years.", "Backend work in Go."
+    inputs = insights_service.insight_inputs(summary, description)
+    outcomes = {}
+
+    def view(name, slot):
+        try:
+            outcomes[name] = insights_service.generate_insights(data.other_application_id, summary, description, inputs, slot)
+        except HTTPException as e:
+            outcomes[name] = e.status_code
+
+    leader = threading.Thread(target=view, args=("leader", rate_limited_slot))
+    leader.start()
+    deadline = time.monotonic() + 5
+    while not insights_service._in_flight:
+        assert time.monotonic() < deadline, "the leader did not start"
+        time.sleep(0.01)
+    follower = threading.Thread(target=view, args=("follower", nullcontext))
+    follower.start()
+    leader.join(5)
+    follower.join(5)
+    try:
+        assert outcomes["leader"] == 429
+        # The follower generated the insights under its own quota.
+        assert isinstance(outcomes["follower"], dict)
+        assert insights_service._in_flight == {}
+    finally:
+        db = SessionLocal()
+        try:
+            db.query(ApplicationInsight).filter(ApplicationInsight.ApplicationID == data.other_application_id).delete()
+            db.commit()
+        finally:
+            db.close()
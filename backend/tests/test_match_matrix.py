@@ -0,0 +1,33 @@
+# tests/test_match_matrix.py
+from app.database.session import SessionLocal
+from app.services import gemini_service, match_matrix_service
+
+from test_query_budgets import upload
+
+
+def test_matrix_score_is_required_skill_coverage(data):
+    db = SessionLocal()
+    try:
+        match_matrix_service.rescore_job(data.job_id, db)
+        matches = {row["CandidateID"]: row for row in match_matrix_service.top_matches_for_job(data.job_id, db)}
+    finally:
+        db.close()
+    priya = matches[data.candidate_id]
+    assert (priya["MatchedSkills"], priya["RequiredSkills"], float(priya["Score"])) == (2, 2, 100.0)
+
+
+def test_only_skill_changes_rescore_a_candidate(client, admin_headers, data, monkeypatch):
+    rescored = []
+    monkeypatch.setattr(match_matrix_service, "rescore_candidate_in_background", rescored.append)
+
+    response = upload(client, admin_headers, data.job_id, "Dev Malhotra", "dev.malhotra@example.com", "Python")
+    assert response.status_code == 201, response.text
+    candidate_id = response.json()["CandidateID"]
+    assert rescored == [candidate_id]
+
+    analyze = gemini_service.analyze_resume_with_job_desc
+    monkeypatch.setattr(gemini_service, "analyze_resume_with_job_desc",
+                        lambda **kwargs: {**analyze(**kwargs), "extracted_skills": []})
+    response = upload(client, admin_headers, data.job_id, "Dev Malhotra", "dev.malhotra@example.com", "Team lead")
+    assert response.status_code == 201, response.text
+    assert rescored == [candidate_id]
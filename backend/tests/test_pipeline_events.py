@@ -0,0 +1,100 @@
+# tests/test_pipeline_events.py
+import threading
+import time
+from datetime import datetime, timedelta
+
+import httpx
+
+from app.database.session import SessionLocal
+from app.database.models.candidate import Candidate, JobApplication
+from app.services.pipeline_events_service import broker
+
+
+class Watcher:
+    """
+    Reads a job's event stream on a thread until `until` shows up in it.
+    """
+    def __init__(self, live_server, headers, job_id, until):
+        self.received = []
+        self._until = until
+        watchers_before = broker.watcher_count
+        self._thread = threading.Thread(target=self._watch, args=(f"{live_server}/jobs/{job_id}/applications/events", headers), daemon=True)
+        self._thread.start()
+        deadline = time.monotonic() + 5
+        while broker.watcher_count == watchers_before:
+            assert time.monotonic() < deadline, "the stream did not subscribe"
+            time.sleep(0.05)
+
+    def _watch(self, url, headers):
+        with httpx.stream("GET", url, headers=headers, timeout=10) as response:
+            for chunk in response.iter_text():
+                self.received.append(chunk)
+                if self._until in "".join(self.received):
+                    return
+
+    def events(self) -> str:
+        self._thread.join(10)
+        return "".join(self.received)
+
+
+def test_stage_change_reaches_watchers_through_notify(live_server, client, admin_headers, data):
+    watcher = Watcher(live_server, admin_headers, data.job_id, "application.stage_changed")
+    response = client.patch(f"/candidates/application/{data.application_id}/stage", headers=admin_headers, json={"stage": "Offer"})
+    assert response.status_code == 200
+    events = watcher.events()
+    assert "event: ready" in events
+    assert "event: application.stage_changed" in events
+    assert '"Stage":"Offer"' in events
+
+
+def test_events_of_large_applications_fit_in_a_notify(live_server, client, admin_headers, data):
+    # NOTIFY payloads are capped at 8000 bytes; the application itself is loaded by the listener.
+    db = SessionLocal()
+    try:
+        candidate = Candidate(FullName="Isha Kapoor", Email="isha.kapoor@example.com", CreatedBy=data.admin_id)
+        db.add(candidate)
+        db.flush()
+        application = JobApplication(
+            CandidateID=candidate.CandidateID, JobID=data.job_id, Stage="Applied", CreatedBy=data.admin_id,
+            ScoreDetails={f"criterion_{i}": 50.0 for i in range(600)}, # About 13 kB as JSON
+        )
+        db.add(application)
+        db.commit()
+        application_id = application.ApplicationID
+    finally:
+        db.close()
+    watcher = Watcher(live_server, admin_headers, data.job_id, "application.stage_changed")
+    response = client.patch(f"/candidates/application/{application_id}/stage", headers=admin_headers, json={"stage": "Interview"})
+    assert response.status_code == 200, response.text
+    events = watcher.events()
+    assert '"Stage":"Interview"' in events
+    assert '"criterion_599":50.0' in events
+
+
+def test_merge_tells_watchers_about_the_kept_application(live_server, client, admin_headers, data):
+    db = SessionLocal()
+    try:
+        survivor, duplicate = (
+            Candidate(FullName="Farhan Ali", Email=email, ResumeSummary="Data engineer.", CreatedBy=data.admin_id)
+            for email in ("farhan.ali@example.com", "farhan.a@example.org")
+        )
+        db.add_all([survivor, duplicate])
+        db.flush()
+        now = datetime.utcnow()
+        kept, dropped = (
+            JobApplication(CandidateID=candidate.CandidateID, JobID=data.job_id, Stage="Applied", AppliedAt=applied_at, CreatedBy=data.admin_id)
+            for candidate, applied_at in ((survivor, now), (duplicate, now - timedelta(days=3)))
+        )
+        db.add_all([kept, dropped])
+        db.commit()
+        survivor_id, duplicate_id, kept_id, dropped_id = survivor.CandidateID, duplicate.CandidateID, kept.ApplicationID, dropped.ApplicationID
+    finally:
+        db.close()
+
+    watcher = Watcher(live_server, admin_headers, data.job_id, "application.updated")
+    response = client.post(f"/candidates/{survivor_id}/merge/{duplicate_id}", headers=admin_headers)
+    assert response.status_code == 200, response.text
+    events = watcher.events()
+    # The kept application only changed through bulk updates (its merged history).
+    assert f'event: application.updated\ndata: {{"ApplicationID":{kept_id},' in events
+    assert f'event: application.deleted\ndata: {{"ApplicationID":{dropped_id},' in events
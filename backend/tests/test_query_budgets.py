@@ -0,0 +1,133 @@
+# tests/test_query_budgets.py
+"""
+Every route in QUERY_BUDGETS is called against the seeded database, and the
+number of queries it issued must stay within its budget. The count is the
+metrics middleware's own (X-DB-Query-Count), the same number QUERY_BUDGET_MODE
+logs in development; background tasks that run after the response are not
+part of it.
+
+A budget without a case below fails test_every_budget_has_a_case, and a budget
+for a route the app does not serve fails test_every_budget_names_a_route.
+"""
+import io
+
+import httpx
+import pytest
+from docx import Document
+
+from app.core.query_budget import QUERY_BUDGETS, budget_for
+from app.database.session import SessionLocal
+from app.database.models.application_insight import ApplicationInsight
+from app.database.models.user import User
+from app.main import app
+
+from conftest import ADMIN_EMAIL
+
+
+def resume_docx(*lines: str) -> bytes:
+    document = Document()
+    for line in lines:
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def upload(client, headers, job_id, *lines):
+    files = {"file": ("resume.docx", resume_docx(*lines), "application/vnd.openxmlformats-officedocument.wordprocessingml.document")}
+    return client.post(f"/candidates/apply/{job_id}", headers=headers, files=files)
+
+
+def insights_generated(client, headers, data):
+    db = SessionLocal()
+    try:
+        db.query(ApplicationInsight).filter(ApplicationInsight.ApplicationID == data.application_id).delete()
+        db.commit()
+    finally:
+        db.close()
+    return client.get(f"/candidates/application/{data.application_id}/insights", headers=headers)
+
+
+def verify_otp(client, headers, data):
+    client.post("/users/login/request-otp", json={"email": ADMIN_EMAIL})
+    db = SessionLocal()
+    try:
+        otp = db.query(User.OtpCode).filter(User.Email == ADMIN_EMAIL).scalar()
+    finally:
+        db.close()
+    return client.post("/users/login/verify-otp", json={"email": ADMIN_EMAIL, "otp": otp})
+
+
+NEW_JOB = {
+    "JobTitle": "Data Engineer", "Description": "Build batch pipelines in Python and SQL.",
+    "DepartmentID": 1, "PortfolioID": 1, "ExperienceRequired": "2 years", "JobType": "Full-time",
+    "required_skills": ["Python", "SQL", "Airflow"],
+    "interview_stages": [{"StageName": "Screening", "Sequence": 1}, {"StageName": "Technical", "Sequence": 2}],
+}
+
+# (method, route template, description, request). Several cases may cover one
+# route, e.g. its most expensive paths. They run in this order.
+CASES = [
+    ("GET", "/jobs/", "list", lambda c, h, d: c.get("/jobs/", headers=h)),
+    ("GET", "/jobs/{job_id}", "detail", lambda c, h, d: c.get(f"/jobs/{d.job_id}", headers=h)),
+    ("GET", "/jobs/{job_id}/applications", "by score", lambda c, h, d: c.get(f"/jobs/{d.job_id}/applications", headers=h)),
+    ("GET", "/jobs/{job_id}/applications", "by skill coverage",
+     lambda c, h, d: c.get(f"/jobs/{d.job_id}/applications?sort_by=skill_coverage", headers=h)),
+    ("GET", "/jobs/{job_id}/matches", "matrix", lambda c, h, d: c.get(f"/jobs/{d.job_id}/matches", headers=h)),
+    ("GET", "/jobs/{job_id}/skill-matches", "index", lambda c, h, d: c.get(f"/jobs/{d.job_id}/skill-matches", headers=h)),
+    ("POST", "/jobs/", "with skills and stages", lambda c, h, d: c.post("/jobs/", headers=h, json=NEW_JOB)),
+    ("GET", "/skills/", "all", lambda c, h, d: c.get("/skills/", headers=h)),
+    ("POST", "/skills/", "new", lambda c, h, d: c.post("/skills/", headers=h, json={"SkillName": "Kotlin"})),
+    ("GET", "/portfolios/", "list", lambda c, h, d: c.get("/portfolios/", headers=h)),
+    ("GET", "/portfolios/{portfolio_id}", "detail", lambda c, h, d: c.get(f"/portfolios/{d.portfolio_id}", headers=h)),
+    ("GET", "/departments/", "list", lambda c, h, d: c.get("/departments/", headers=h)),
+    ("GET", "/reports/dashboard-stats", "uncached", lambda c, h, d: c.get("/reports/dashboard-stats", headers=h)),
+    ("GET", "/candidates/search", "ranked", lambda c, h, d: c.get("/candidates/search?q=python", headers=h)),
+    ("GET", "/candidates/{candidate_id}/matches", "matrix", lambda c, h, d: c.get(f"/candidates/{d.candidate_id}/matches", headers=h)),
+    ("GET", "/candidates/{candidate_id}/duplicates", "blocks",
+     lambda c, h, d: c.get(f"/candidates/{d.candidate_id}/duplicates", headers=h)),
+    ("GET", "/jobs/{job_id}/rediscovery", "results", lambda c, h, d: c.get(f"/jobs/{d.job_id}/rediscovery", headers=h)),
+    ("GET", "/jobs/{job_id}/rediscovery/status", "queued run", lambda c, h, d: c.get(f"/jobs/{d.job_id}/rediscovery/status", headers=h)),
+    ("GET", "/candidates/application/{application_id}/insights", "generated", insights_generated),
+    ("GET", "/candidates/application/{application_id}/insights", "stored",
+     lambda c, h, d: c.get(f"/candidates/application/{d.application_id}/insights", headers=h)),
+    ("POST", "/candidates/apply/{job_id}", "new candidate",
+     lambda c, h, d: upload(c, h, d.job_id, "Anita Desai", "anita.desai@example.com", "+91 99887 76655", "Python, SQL")),
+    ("POST", "/candidates/apply/{job_id}", "known person, new email",
+     lambda c, h, d: upload(c, h, d.job_id, "Rahul Verma", "rahul.v@example.net", "+91 91234 56789", "React")),
+    ("POST", "/candidates/{candidate_id}/merge/{duplicate_id}", "manual",
+     lambda c, h, d: c.post(f"/candidates/{d.candidate_id}/merge/{d.duplicate_id}", headers=h)),
+    ("PATCH", "/candidates/application/{application_id}/stage", "stage change",
+     lambda c, h, d: c.patch(f"/candidates/application/{d.application_id}/stage", headers=h, json={"stage": "Interview"})),
+    ("POST", "/users/login/request-otp", "queued email",
+     lambda c, h, d: c.post("/users/login/request-otp", json={"email": ADMIN_EMAIL})),
+    ("POST", "/users/login/verify-otp", "valid code", verify_otp),
+]
+
+
+@pytest.mark.parametrize("method, route, description, send", CASES, ids=[f"{m} {r} ({d})" for m, r, d, _ in CASES])
+def test_route_stays_within_query_budget(client, admin_headers, data, method, route, description, send):
+    response = send(client, admin_headers, data)
+    assert response.status_code < 400, response.text
+    query_count = int(response.headers["X-DB-Query-Count"])
+    assert query_count <= budget_for(method, route), f"{method} {route} issued {query_count} queries (budget {budget_for(method, route)})"
+
+
+def test_event_stream_stays_within_query_budget(live_server, admin_headers, data):
+    # The stream never ends; its queries all happen before the first event.
+    route = "/jobs/{job_id}/applications/events"
+    with httpx.stream("GET", f"{live_server}/jobs/{data.job_id}/applications/events", headers=admin_headers, timeout=10) as response:
+        assert response.status_code == 200
+        query_count = int(response.headers["X-DB-Query-Count"])
+        assert "event: ready" in next(response.iter_text())
+    assert query_count <= budget_for("GET", route)
+
+
+def test_every_budget_has_a_case():
+    covered = {(method, route) for method, route, _, _ in CASES} | {("GET", "/jobs/{job_id}/applications/events")}
+    assert set(QUERY_BUDGETS) - covered == set()
+
+
+def test_every_budget_names_a_route():
+    served = {(method.upper(), path) for path, operations in app.openapi()["paths"].items() for method in operations}
+    assert set(QUERY_BUDGETS) - served == set()
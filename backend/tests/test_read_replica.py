@@ -0,0 +1,75 @@
+# tests/test_read_replica.py
+"""
+Routing of reads between the primary and the read replica. Needs
+TEST_DATABASE_REPLICA_URL: a second database, which the tests seed like the
+primary but do not replicate to, so a row written through the API exists on
+the primary only.
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.dependencies import PIN_PRIMARY_COOKIE, PIN_PRIMARY_HEADER
+from app.core.query_budget import count_queries
+from app.database.session import engine, replica_engine
+from app.main import app
+
+from conftest import TEST_DATABASE_REPLICA_URL
+
+pytestmark = pytest.mark.skipif(not TEST_DATABASE_REPLICA_URL, reason="TEST_DATABASE_REPLICA_URL is not set")
+
+NEW_JOB = {
+    "JobTitle": "Site Reliability Engineer", "Description": "On-call for the platform.",
+    "DepartmentID": 1, "PortfolioID": 1, "ExperienceRequired": "4 years", "JobType": "Full-time",
+    "required_skills": ["Python"], "interview_stages": [],
+}
+
+
+@pytest.fixture
+def fresh_client(data):
+    # No cookies from other tests, so nothing is pinned to the primary yet.
+    return TestClient(app)
+
+
+def get_counting(client, url, **kwargs):
+    with count_queries(target=engine) as primary, count_queries(target=replica_engine) as replica:
+        response = client.get(url, **kwargs)
+    return response, primary.count, replica.count
+
+
+def test_reads_are_served_by_the_replica(fresh_client, admin_headers, data):
+    response, primary, replica = get_counting(fresh_client, f"/jobs/{data.job_id}/applications", headers=admin_headers)
+    assert response.status_code == 200
+    assert primary == 1 # The current user lookup of the auth dependency
+    assert replica >= 2 # The job and its applications
+
+
+def test_writer_reads_its_write_from_the_primary(fresh_client, admin_headers):
+    response = fresh_client.post("/jobs/", headers=admin_headers, json=NEW_JOB)
+    assert response.status_code == 201, response.text
+    assert fresh_client.cookies.get(PIN_PRIMARY_COOKIE)
+    job_id = response.json()["JobID"]
+
+    response, primary, replica = get_counting(fresh_client, f"/jobs/{job_id}", headers=admin_headers)
+    assert response.status_code == 200
+    assert primary > 1
+    assert replica == 0
+
+    # Anyone else reads the replica, which never received the job.
+    response, _, replica = get_counting(TestClient(app), f"/jobs/{job_id}", headers=admin_headers)
+    assert response.status_code == 404
+    assert replica > 0
+
+
+def test_read_primary_header_pins_the_request(fresh_client, admin_headers, data):
+    response, primary, replica = get_counting(
+        fresh_client, f"/jobs/{data.job_id}/applications", headers={**admin_headers, PIN_PRIMARY_HEADER: "1"}
+    )
+    assert response.status_code == 200
+    assert primary >= 3
+    assert replica == 0
+
+
+def test_failed_write_does_not_pin(fresh_client, admin_headers):
+    response = fresh_client.post("/jobs/", headers=admin_headers, json={"JobTitle": "Incomplete"})
+    assert response.status_code == 422
+    assert fresh_client.cookies.get(PIN_PRIMARY_COOKIE) is None
@@ -0,0 +1,102 @@
+# tests/test_rediscovery.py
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core import config
+from app.database.session import SessionLocal
+from app.database.models.rediscovery import RediscoveryRun
+from app.services import talent_rediscovery_service
+from app.services.talent_rediscovery_service import ClaimLost, RediscoveryWorker
+
+NEW_JOB = {
+    "JobTitle": "Analytics Engineer", "Description": "Model warehouse data with SQL.",
+    "DepartmentID": 1, "PortfolioID": 1, "ExperienceRequired": "2 years", "JobType": "Full-time",
+    "required_skills": ["SQL"], "interview_stages": [],
+}
+
+
+def test_new_job_gets_a_queued_run(client, admin_headers):
+    response = client.post("/jobs/", headers=admin_headers, json=NEW_JOB)
+    assert response.status_code == 201, response.text
+    job_id = response.json()["JobID"]
+
+    run = client.get(f"/jobs/{job_id}/rediscovery/status", headers=admin_headers).json()
+    assert (run["Status"], run["Trigger"]) == ("Queued", "job_created")
+
+    # A manual request while that run is waiting reuses it.
+    response = client.post(f"/jobs/{job_id}/rediscovery", headers=admin_headers)
+    assert response.status_code == 202
+    assert response.json()["RunID"] == run["RunID"]
+
+
+def queued_run_for_new_job(client, admin_headers, title):
+    response = client.post("/jobs/", headers=admin_headers, json={**NEW_JOB, "JobTitle": title})
+    assert response.status_code == 201, response.text
+    return client.get(f"/jobs/{response.json()['JobID']}/rediscovery/status", headers=admin_headers).json()["RunID"]
+
+
+def mark_running(run_id, started_at):
+    db = SessionLocal()
+    try:
+        run = db.get(RediscoveryRun, run_id)
+        run.Status = talent_rediscovery_service.STATUS_RUNNING
+        run.StartedAt = run.HeartbeatAt = started_at
+        db.commit()
+    finally:
+        db.close()
+
+
+def heartbeat_of(run_id):
+    db = SessionLocal()
+    try:
+        return db.query(RediscoveryRun.HeartbeatAt).filter(RediscoveryRun.RunID == run_id).scalar()
+    finally:
+        db.close()
+
+
+def test_run_reports_progress_between_ai_calls(client, admin_headers, monkeypatch):
+    run_id = queued_run_for_new_job(client, admin_headers, "Analytics Engineer II")
+    mark_running(run_id, datetime.utcnow())
+    monkeypatch.setattr(config, "REDISCOVERY_HEARTBEAT_SECONDS", 0)
+    heartbeats = []
+
+    def score(job_description, candidate, debug_item):
+        heartbeats.append(heartbeat_of(run_id))
+        return 70.0, "Good fit."
+
+    monkeypatch.setattr(talent_rediscovery_service, "score_candidate", score)
+    db = SessionLocal()
+    try:
+        RediscoveryWorker().execute(db, db.get(RediscoveryRun, run_id))
+    finally:
+        db.close()
+    # Every call sees a fresher heartbeat, not just one per batch.
+    assert len(heartbeats) >= 2
+    assert heartbeats == sorted(set(heartbeats))
+
+
+def test_worker_stops_when_its_stale_run_was_taken_over(client, admin_headers, monkeypatch):
+    run_id = queued_run_for_new_job(client, admin_headers, "Analytics Engineer III")
+    mark_running(run_id, datetime.utcnow() - timedelta(hours=1))
+    calls = []
+    monkeypatch.setattr(talent_rediscovery_service, "score_candidate", lambda *args: calls.append(args))
+
+    db = SessionLocal()
+    try:
+        run = db.get(RediscoveryRun, run_id)
+        # Meanwhile another worker requeued the stale run and claimed it; nothing of
+        # this worker's is written after that.
+        taken_over_at = datetime.utcnow()
+        mark_running(run_id, taken_over_at)
+        with pytest.raises(ClaimLost):
+            RediscoveryWorker().execute(db, run)
+    finally:
+        db.close()
+    assert calls == []
+    db = SessionLocal()
+    try:
+        run = db.get(RediscoveryRun, run_id)
+        assert (run.Status, run.StartedAt, run.CandidatesTotal) == ("Running", taken_over_at, None)
+    finally:
+        db.close()
@@ -0,0 +1,34 @@
+# tests/test_skill_index.py
+from app.database.session import SessionLocal
+from app.database.models.candidate import Candidate
+from app.database.models.skill import CandidateSkill
+from app.services.skill_index_service import SkillBitmapIndex, SkillIndexRefresher, get_job_skill_ids
+
+
+def test_refresher_reloads_after_another_process_changes_skills(data):
+    db = SessionLocal()
+    try:
+        candidate = Candidate(FullName="Neha Gupta", Email="neha.gupta@example.com", CreatedBy=data.admin_id)
+        db.add(candidate)
+        db.commit()
+        job_skill_ids = get_job_skill_ids(data.job_id, db)
+        index = SkillBitmapIndex()
+        index.load(db)
+        refresher = SkillIndexRefresher(index)
+        assert refresher.refresh_if_stale() is False
+        assert index.score(candidate.CandidateID, job_skill_ids) is None
+
+        # Another worker links a skill; this index never hears about it directly.
+        link = CandidateSkill(CandidateID=candidate.CandidateID, SkillID=job_skill_ids[0])
+        db.add(link)
+        db.commit()
+        assert refresher.refresh_if_stale() is True
+        assert index.score(candidate.CandidateID, job_skill_ids) == 0.5
+        assert refresher.refresh_if_stale() is False
+
+        db.delete(link)
+        db.commit()
+        assert refresher.refresh_if_stale() is True
+        assert index.score(candidate.CandidateID, job_skill_ids) is None
+    finally:
+        db.close()
@@ -0,0 +1,60 @@
+# tests/test_stage_assignment.py
+import pytest
+
+from app.core import config
+from app.database.session import SessionLocal
+from app.database.models.email_outbox import EmailOutbox
+from app.database.models.notification_event import StageNotificationEvent
+from app.database.models.user import User
+from app.services import digest_service
+from app.services.digest_service import digest_worker
+
+
+@pytest.fixture(scope="module")
+def interviewer_id(data):
+    db = SessionLocal()
+    try:
+        interviewer = User(UserName="Meera Iyer", Email="meera.iyer@example.com", Role="Interviewer", IsActive=True)
+        db.add(interviewer)
+        db.commit()
+        return interviewer.UserID
+    finally:
+        db.close()
+
+
+def test_assignment_is_logged_and_reaches_the_assignees_digest(client, admin_headers, data, interviewer_id, monkeypatch):
+    response = client.post(
+        f"/candidates/application/{data.other_application_id}/assign",
+        headers=admin_headers, json={"AssigneeUserID": interviewer_id, "Notes": "Technical round"}
+    )
+    assert response.status_code == 201, response.text
+    log = response.json()
+    assert (log["AssigneeUserID"], log["AssignorUserID"], log["Status"]) == (interviewer_id, data.admin_id, "Applied")
+
+    history = client.get(f"/candidates/application/{data.other_application_id}/history", headers=admin_headers).json()
+    assert log["LogID"] in [entry["LogID"] for entry in history]
+
+    db = SessionLocal()
+    try:
+        events = db.query(StageNotificationEvent).filter(StageNotificationEvent.LogID == log["LogID"]).all()
+        # Only the assignee: the stage did not change, and the admin made the assignment.
+        assert [(event.RecipientUserID, event.EventType) for event in events] == [(interviewer_id, digest_service.EVENT_ASSIGNMENT)]
+
+        monkeypatch.setattr(config, "DIGEST_WINDOW_SECONDS", 0)
+        assert digest_worker.run_cycle() >= 1
+        digest = db.query(EmailOutbox).filter(EmailOutbox.Recipient == "meera.iyer@example.com").one()
+        assert "Rahul Verma (Backend Engineer) was assigned to you for &#39;Applied&#39;." in digest.HtmlBody
+    finally:
+        db.close()
+
+
+def test_assignee_must_be_an_active_user(client, admin_headers, data):
+    response = client.post(
+        f"/candidates/application/{data.application_id}/assign", headers=admin_headers, json={"AssigneeUserID": 999999}
+    )
+    assert response.status_code == 400
+
+
+def test_assigning_a_missing_application_is_404(client, admin_headers, interviewer_id):
+    response = client.post("/candidates/application/999999/assign", headers=admin_headers, json={"AssigneeUserID": interviewer_id})
+    assert response.status_code == 404
@@ -0,0 +1,44 @@
+# tests/test_user_roles.py
+from app.database.session import SessionLocal
+from app.database.models.email_outbox import EmailOutbox
+from app.database.models.user import User
+
+
+def add_users(*users):
+    db = SessionLocal()
+    try:
+        rows = [User(UserName=name, Email=email, Role=role, IsActive=True) for name, email, role in users]
+        db.add_all(rows)
+        db.commit()
+        return [row.UserID for row in rows]
+    finally:
+        db.close()
+
+
+def test_bulk_role_update_queues_one_email_per_changed_user(client, admin_headers):
+    user_ids = add_users(
+        ("Kavya Nair", "kavya.nair@example.com", "HR"),
+        ("Vikram Rao", "vikram.rao@example.com", "HR"),
+        ("Sana Khan", "sana.khan@example.com", "Interviewer"),
+    )
+    response = client.patch("/users/roles", headers=admin_headers, json={"user_ids": user_ids, "role": "Interviewer"})
+    assert response.status_code == 200, response.text
+    assert [user["Role"] for user in response.json()] == ["Interviewer"] * 3
+
+    db = SessionLocal()
+    try:
+        emails = db.query(EmailOutbox.Recipient, EmailOutbox.HtmlBody).filter(
+            EmailOutbox.Kind == "role_update", EmailOutbox.Recipient.like("%@example.com")
+        ).order_by(EmailOutbox.OutboxID).all()
+    finally:
+        db.close()
+    # Sana already was an interviewer.
+    assert [recipient for recipient, _ in emails] == ["kavya.nair@example.com", "vikram.rao@example.com"]
+    for (recipient, body), name in zip(emails, ("Kavya Nair", "Vikram Rao")):
+        assert f"Hello {name}," in body
+        assert "Interviewer" in body
+
+
+def test_bulk_role_update_rejects_unknown_users(client, admin_headers):
+    response = client.patch("/users/roles", headers=admin_headers, json={"user_ids": [999999], "role": "HR"})
+    assert response.status_code == 404
@@ -8,6 +8,9 @@ const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
 
 const axiosInstance = axios.create({
     baseURL: API_URL,
+    // API alag origin par hai: bina iske browser pin_primary cookie na save karta hai na bhejta hai,
+    // aur write ke baad ki reads replica se aa sakti hain (read-your-writes).
+    withCredentials: true,
 });
 
 // Yeh interceptor har request ke saath token add kar dega
@@ -0,0 +1,66 @@
+// frontend/src/api/pipelineEvents.js
+
+import axiosInstance from './axiosInstance';
+
+// Server-sent events of GET /jobs/{jobId}/applications/events.
+// EventSource cannot send the Authorization header (the token would have to go
+// in the URL), so the stream is read with fetch instead.
+// Returns a function that closes the stream.
+//
+// Reconnects after network errors and server restarts. It gives up, and calls
+// onEvent('unavailable', { status }), when the stream is refused (4xx, or 503
+// for too many open streams) or answered with something other than an event
+// stream, e.g. by a proxy that does not pass streams through. The caller's
+// list then simply stops updating live.
+export function subscribeToPipeline(jobId, onEvent) {
+    const controller = new AbortController();
+    let retryMs = 3000;
+
+    const connect = async () => {
+        try {
+            const token = localStorage.getItem('authToken');
+            const response = await fetch(`${axiosInstance.defaults.baseURL}/jobs/${jobId}/applications/events`, {
+                headers: token ? { Authorization: `Bearer ${token}` } : {},
+                credentials: 'include', // The pin_primary cookie, like axiosInstance's requests
+                signal: controller.signal,
+            });
+            const isEventStream = (response.headers.get('Content-Type') || '').startsWith('text/event-stream');
+            if ((response.status >= 400 && response.status < 500) || response.status === 503 || (response.ok && !isEventStream)) {
+                onEvent('unavailable', { status: response.status });
+                return;
+            }
+            if (!response.ok) {
+                throw new Error(`Pipeline events failed with ${response.status}`);
+            }
+            const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+            let buffer = '';
+            for (;;) {
+                const { value, done } = await reader.read();
+                if (done) break;
+                buffer += value;
+                let end;
+                while ((end = buffer.indexOf('\n\n')) !== -1) {
+                    const block = buffer.slice(0, end);
+                    buffer = buffer.slice(end + 2);
+                    let type = 'message';
+                    let data = '';
+                    for (const line of block.split('\n')) {
+                        if (line.startsWith('event: ')) type = line.slice(7);
+                        else if (line.startsWith('data: ')) data += line.slice(6);
+                        else if (line.startsWith('retry: ')) retryMs = Number(line.slice(7)) || retryMs;
+                    }
+                    if (data) onEvent(type, JSON.parse(data));
+                }
+            }
+        } catch (err) {
+            if (controller.signal.aborted) return;
+        }
+        // Closed by the server or the network: reconnect. "ready" follows, and the caller refetches.
+        if (!controller.signal.aborted) {
+            setTimeout(connect, retryMs);
+        }
+    };
+
+    connect();
+    return () => controller.abort();
+}
@@ -3,6 +3,19 @@
 import React, { useEffect, useState } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
 import axiosInstance from '../api/axiosInstance';
+import { subscribeToPipeline } from '../api/pipelineEvents';
+
+// Applies one event of the live pipeline stream to the list of applications.
+function applyPipelineEvent(candidates, type, application) {
+    const others = candidates.filter((a) => a.ApplicationID !== application.ApplicationID);
+    if (type === 'application.deleted') {
+        return others;
+    }
+    if (others.length === candidates.length) {
+        return [...candidates, application];
+    }
+    return candidates.map((a) => (a.ApplicationID === application.ApplicationID ? application : a));
+}
 
 function CandidatePipelinePage() {
     const { jobId } = useParams();
@@ -25,9 +38,20 @@ function CandidatePipelinePage() {
             }
         };
 
-        if (jobId) {
-            fetchCandidates();
+        if (!jobId) {
+            return undefined;
         }
+        fetchCandidates();
+        // Live updates: the list is fetched again once the stream is "ready" (so
+        // nothing changed in between is missed) and on "resync"; after that only
+        // the changed applications arrive. Without the stream the list above stays.
+        return subscribeToPipeline(jobId, (type, data) => {
+            if (type === 'ready' || type === 'resync') {
+                fetchCandidates();
+            } else if (type.startsWith('application.')) {
+                setCandidates((current) => applyPipelineEvent(current, type, data));
+            }
+        });
     }, [jobId]);
     
     return (